@@ -4,26 +4,89 @@ Automatic Pronunciation Mistake Detector
 A Flask web application for grammar checking and pronunciation practice using NLP
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, Response
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField, BooleanField, DateField, TextAreaField
 from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import os
 import json
 import secrets
+import select
+import socket
+from sqlalchemy import event
 
 # Initialize Flask app
 app = Flask(__name__)
 
 # Configuration
 app.config['SECRET_KEY'] = secrets.token_hex(16)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pronunciation_detector.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///pronunciation_detector.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Grammar checker configuration
+app.config['GRAMMAR_LANGUAGE'] = os.environ.get('GRAMMAR_LANGUAGE', 'en-US')
+app.config['GRAMMAR_DISABLED_RULES'] = [r for r in os.environ.get('GRAMMAR_DISABLED_RULES', '').split(',') if r]
+app.config['GRAMMAR_SPACY_MODE'] = os.environ.get('GRAMMAR_SPACY_MODE', 'full')  # full, sentences or off
+app.config['GRAMMAR_SPACY_BATCH_SIZE'] = int(os.environ.get('GRAMMAR_SPACY_BATCH_SIZE', 64))
+app.config['GRAMMAR_CACHE_SIZE'] = int(os.environ.get('GRAMMAR_CACHE_SIZE', 1024))
+app.config['GRAMMAR_CACHE_TTL'] = float(os.environ.get('GRAMMAR_CACHE_TTL', 3600))
+app.config['GRAMMAR_CACHE_PATH'] = os.environ.get('GRAMMAR_CACHE_PATH')  # e.g. database/grammar_cache.db
+app.config['GRAMMAR_POOL_SIZE'] = int(os.environ.get('GRAMMAR_POOL_SIZE', 1))
+app.config['GRAMMAR_POOL_HEALTH_INTERVAL'] = float(os.environ.get('GRAMMAR_POOL_HEALTH_INTERVAL', 30))
+app.config['GRAMMAR_JOB_WORKERS'] = int(os.environ.get('GRAMMAR_JOB_WORKERS', 2))
+app.config['GRAMMAR_JOB_MAX_QUEUED'] = int(os.environ.get('GRAMMAR_JOB_MAX_QUEUED', 20))
+app.config['GRAMMAR_JOB_RESULT_TTL'] = float(os.environ.get('GRAMMAR_JOB_RESULT_TTL', 600))
+app.config['GRAMMAR_BATCH_MAX_TEXTS'] = int(os.environ.get('GRAMMAR_BATCH_MAX_TEXTS', 500))
+
+# Speech recognition configuration (see "Speech recognition backends" in README.md)
+app.config['SPEECH_BACKENDS'] = [b for b in os.environ.get('SPEECH_BACKENDS', 'google,sphinx').split(',') if b]
+app.config['SPEECH_OFFLINE'] = os.environ.get('SPEECH_OFFLINE', '').lower() in ('1', 'true', 'yes')
+app.config['SPEECH_LANGUAGE'] = os.environ.get('SPEECH_LANGUAGE', 'en-US')
+app.config['SPEECH_TIMEOUT'] = float(os.environ.get('SPEECH_TIMEOUT', 15))
+app.config['SPEECH_VOSK_MODEL_PATH'] = os.environ.get('SPEECH_VOSK_MODEL_PATH', 'model')
+app.config['SPEECH_WHISPER_MODEL'] = os.environ.get('SPEECH_WHISPER_MODEL', 'base')
+app.config['SPEECH_STUB_TRANSCRIPT'] = os.environ.get('SPEECH_STUB_TRANSCRIPT')  # stub echoes the expected text when unset
+app.config['SPEECH_CACHE_SIZE'] = int(os.environ.get('SPEECH_CACHE_SIZE', 512))
+app.config['SPEECH_CACHE_TTL'] = float(os.environ.get('SPEECH_CACHE_TTL', 3600))
+app.config['SPEECH_CACHE_PATH'] = os.environ.get('SPEECH_CACHE_PATH')  # e.g. database/transcription_cache.db
+app.config['PHONEME_LEXICON_PATH'] = os.environ.get('PHONEME_LEXICON_PATH')  # bundled practice lexicon when unset
+
+# Audio preprocessing: uploads are downmixed, resampled and trimmed before recognition
+app.config['AUDIO_SAMPLE_RATE'] = int(os.environ.get('AUDIO_SAMPLE_RATE', 16000)) or None  # 0 keeps the source rate
+app.config['AUDIO_MAX_BYTES'] = int(os.environ.get('AUDIO_MAX_BYTES', 10 * 1024 * 1024))
+app.config['AUDIO_MAX_DURATION'] = float(os.environ.get('AUDIO_MAX_DURATION', 120))
+app.config['AUDIO_TRIM_SILENCE'] = os.environ.get('AUDIO_TRIM_SILENCE', '1').lower() in ('1', 'true', 'yes')
+
+# Audio worker pool: uploads are decoded in worker processes and recognized on worker threads
+app.config['AUDIO_WORKER_PROCESSES'] = int(os.environ.get('AUDIO_WORKER_PROCESSES', 2))  # 0 decodes on the worker threads
+app.config['AUDIO_WORKER_THREADS'] = int(os.environ.get('AUDIO_WORKER_THREADS', 4))
+app.config['AUDIO_WORKER_MAX_QUEUED'] = int(os.environ.get('AUDIO_WORKER_MAX_QUEUED', 8))
+app.config['AUDIO_WORKER_MAX_PER_USER'] = int(os.environ.get('AUDIO_WORKER_MAX_PER_USER', 2)) or None
+app.config['AUDIO_JOB_TIMEOUT'] = float(os.environ.get('AUDIO_JOB_TIMEOUT', 45))
+
+# Dashboard cache: /home and /profile data per user, dropped when the user's history changes
+app.config['DASHBOARD_CACHE_BACKEND'] = os.environ.get('DASHBOARD_CACHE_BACKEND', 'memory')  # memory, redis or off
+app.config['DASHBOARD_CACHE_SIZE'] = int(os.environ.get('DASHBOARD_CACHE_SIZE', 1024))
+app.config['DASHBOARD_CACHE_TTL'] = float(os.environ.get('DASHBOARD_CACHE_TTL', 300))
+app.config['DASHBOARD_CACHE_REDIS_URL'] = os.environ.get('DASHBOARD_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+# Largest page /api/activities returns
+app.config['ACTIVITY_PAGE_MAX'] = int(os.environ.get('ACTIVITY_PAGE_MAX', 100))
+
+# Streaming practice uploads
+app.config['SPEECH_STREAM_MAX_OPEN'] = int(os.environ.get('SPEECH_STREAM_MAX_OPEN', 50))
+app.config['SPEECH_STREAM_MAX_PER_USER'] = int(os.environ.get('SPEECH_STREAM_MAX_PER_USER', 2)) or None
+app.config['SPEECH_STREAM_IDLE_TIMEOUT'] = float(os.environ.get('SPEECH_STREAM_IDLE_TIMEOUT', 120))
+app.config['SPEECH_STREAM_MAX_BYTES'] = int(os.environ.get('SPEECH_STREAM_MAX_BYTES', 10 * 1024 * 1024))
+
+# Pronunciation scoring configuration
+app.config['PRONUNCIATION_BATCH_MAX_PAIRS'] = int(os.environ.get('PRONUNCIATION_BATCH_MAX_PAIRS', 5000))
+app.config['PRONUNCIATION_BATCH_WORKERS'] = int(os.environ.get('PRONUNCIATION_BATCH_WORKERS', 0)) or None  # None = CPU count
+
 # Initialize extensions
 db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
@@ -35,6 +98,84 @@ login_manager.login_message_category = 'info'
 # Create database directory if it doesn't exist
 os.makedirs('database', exist_ok=True)
 
+# Configure speech utilities
+from speech_utils.grammar_checker import configure_grammar_checker, start_language_tool_pool
+configure_grammar_checker(
+    language=app.config['GRAMMAR_LANGUAGE'],
+    disabled_rules=app.config['GRAMMAR_DISABLED_RULES'],
+    spacy_mode=app.config['GRAMMAR_SPACY_MODE'],
+    spacy_batch_size=app.config['GRAMMAR_SPACY_BATCH_SIZE'],
+    cache_size=app.config['GRAMMAR_CACHE_SIZE'],
+    cache_ttl=app.config['GRAMMAR_CACHE_TTL'],
+    cache_path=app.config['GRAMMAR_CACHE_PATH'],
+    pool_size=app.config['GRAMMAR_POOL_SIZE'],
+    pool_health_interval=app.config['GRAMMAR_POOL_HEALTH_INTERVAL']
+)
+
+from speech_utils.recognizers import configure_recognizers
+configure_recognizers(
+    backends=app.config['SPEECH_BACKENDS'],
+    offline=app.config['SPEECH_OFFLINE'],
+    language=app.config['SPEECH_LANGUAGE'],
+    timeout=app.config['SPEECH_TIMEOUT'],
+    vosk_model_path=app.config['SPEECH_VOSK_MODEL_PATH'],
+    whisper_model=app.config['SPEECH_WHISPER_MODEL'],
+    stub_transcript=app.config['SPEECH_STUB_TRANSCRIPT']
+)
+
+from speech_utils.audio_io import configure_audio
+configure_audio(
+    sample_rate=app.config['AUDIO_SAMPLE_RATE'],
+    max_bytes=app.config['AUDIO_MAX_BYTES'],
+    max_duration=app.config['AUDIO_MAX_DURATION'],
+    trim_silence=app.config['AUDIO_TRIM_SILENCE']
+)
+
+from speech_utils.pronunciation_analyzer import configure_transcription_cache
+configure_transcription_cache(
+    cache_size=app.config['SPEECH_CACHE_SIZE'],
+    cache_ttl=app.config['SPEECH_CACHE_TTL'],
+    cache_path=app.config['SPEECH_CACHE_PATH']
+)
+
+from speech_utils.phonemes import configure_phonemes
+configure_phonemes(lexicon_path=app.config['PHONEME_LEXICON_PATH'])
+
+# Recordings being uploaded chunk by chunk from the practice page
+from speech_utils.streaming import StreamingSessions, StreamError, StreamLimitError
+speech_streams = StreamingSessions(
+    max_streams=app.config['SPEECH_STREAM_MAX_OPEN'],
+    idle_timeout=app.config['SPEECH_STREAM_IDLE_TIMEOUT'],
+    max_per_owner=app.config['SPEECH_STREAM_MAX_PER_USER']
+)
+
+# Background workers for long grammar checks (job mode)
+from speech_utils.job_queue import JobQueue, OwnerLimitError, QueueFullError
+grammar_jobs = JobQueue(
+    max_workers=app.config['GRAMMAR_JOB_WORKERS'],
+    max_queued=app.config['GRAMMAR_JOB_MAX_QUEUED'],
+    result_ttl=app.config['GRAMMAR_JOB_RESULT_TTL'],
+    name='grammar-job'
+)
+
+# Bounded workers for uploaded audio, so a burst of uploads cannot tie up the request threads
+from speech_utils.audio_workers import AudioJobCancelled, AudioJobTimeout, AudioWorkerPool
+audio_workers = AudioWorkerPool(
+    processes=app.config['AUDIO_WORKER_PROCESSES'],
+    max_workers=app.config['AUDIO_WORKER_THREADS'],
+    max_queued=app.config['AUDIO_WORKER_MAX_QUEUED'],
+    max_per_user=app.config['AUDIO_WORKER_MAX_PER_USER'],
+    timeout=app.config['AUDIO_JOB_TIMEOUT']
+)
+
+from speech_utils.dashboard_cache import DashboardCache
+dashboard_cache = DashboardCache(
+    backend=app.config['DASHBOARD_CACHE_BACKEND'],
+    max_size=app.config['DASHBOARD_CACHE_SIZE'],
+    ttl=app.config['DASHBOARD_CACHE_TTL'],
+    redis_url=app.config['DASHBOARD_CACHE_REDIS_URL']
+)
+
 # User loader for Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
@@ -55,6 +196,9 @@ class User(db.Model, UserMixin):
     practice_sessions = db.relationship('PracticeSession', backref='user', lazy=True)
 
 class GrammarCheck(db.Model):
+    # Every history query filters on user_id and orders or ranges on created_at
+    __table_args__ = (db.Index('ix_grammar_check_user_id_created_at', 'user_id', 'created_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     original_text = db.Column(db.Text, nullable=False)
@@ -64,6 +208,8 @@ class GrammarCheck(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
 class PracticeSession(db.Model):
+    __table_args__ = (db.Index('ix_practice_session_user_id_created_at', 'user_id', 'created_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     expected_text = db.Column(db.Text, nullable=False)
@@ -74,6 +220,33 @@ class PracticeSession(db.Model):
     overall_score = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+class UserStats(db.Model):
+    """
+    Running dashboard totals for one user
+
+    Updated by record_user_activity in the same transaction as each history
+    insert, so the dashboard reads one row instead of aggregating history.
+    Scores of 0 or None are not counted in the sums, as in the history
+    averages. `flask rebuild-user-stats` recomputes every row from history.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    grammar_checks = db.Column(db.Integer, nullable=False, default=0)
+    grammar_accuracy_sum = db.Column(db.Float, nullable=False, default=0.0)
+    grammar_accuracy_count = db.Column(db.Integer, nullable=False, default=0)
+    practice_sessions = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    score_count = db.Column(db.Integer, nullable=False, default=0)
+    best_score = db.Column(db.Float, nullable=True)
+    # Activities per weekday, Sunday first
+    weekday_counts = db.Column(db.JSON, nullable=False, default=lambda: [0] * 7)
+    # {'YYYY-MM-DD': [score sum, score count]} for the last two weeks, for the improvement rate
+    daily_scores = db.Column(db.JSON, nullable=False, default=dict)
+    # Overall scores of the latest practice sessions, newest first
+    recent_scores = db.Column(db.JSON, nullable=False, default=list)
+    last_active_date = db.Column(db.Date, nullable=True)
+    # Consecutive active days ending on last_active_date
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+
 # Forms
 class RegistrationForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired(), Length(min=4, max=20)])
@@ -160,10 +333,10 @@ def logout():
 @login_required
 def home():
     # Get user statistics
-    user_stats = get_user_statistics(current_user.id)
-    recent_activities = get_recent_activities(current_user.id)
+    dashboard = get_dashboard(current_user.id)
     
-    return render_template('home.html', user_stats=user_stats, recent_activities=recent_activities)
+    return render_template('home.html', user_stats=dashboard['user_stats'],
+                           recent_activities=dashboard['recent_activities'])
 
 @app.route('/grammar')
 @login_required
@@ -178,7 +351,7 @@ def practice():
 @app.route('/profile')
 @login_required
 def profile():
-    user_stats = get_user_statistics(current_user.id)
+    user_stats = get_dashboard(current_user.id)['user_stats']
     return render_template('profile.html', user_stats=user_stats)
 
 # API Routes
@@ -199,6 +372,7 @@ def api_check_grammar():
         result = check_grammar_enhanced(text)
 
         # Save to database
+        record_user_activity(current_user.id, grammar_scores=[result.get('accuracy_score', 100.0)])
         grammar_check = GrammarCheck(
             user_id=current_user.id,
             original_text=text,
@@ -225,6 +399,137 @@ def api_check_grammar():
             print(f"Fallback grammar check error: {fallback_error}")
             return jsonify({'error': 'Grammar check failed'}), 500
 
+def run_grammar_job(user_id, text):
+    """Check text on a background worker and save the GrammarCheck row when done"""
+    from speech_utils.grammar_checker import check_grammar_enhanced
+
+    result = check_grammar_enhanced(text)
+
+    with app.app_context():
+        record_user_activity(user_id, grammar_scores=[result.get('accuracy_score', 100.0)])
+        grammar_check = GrammarCheck(
+            user_id=user_id,
+            original_text=text,
+            corrected_text=result.get('corrected_text'),
+            errors_found=len(result.get('errors', [])),
+            accuracy_score=result.get('accuracy_score', 100.0)
+        )
+        db.session.add(grammar_check)
+        db.session.commit()
+
+    return result
+
+@app.route('/api/check-grammar/jobs', methods=['POST'])
+@login_required
+def api_submit_grammar_job():
+    """Queue a grammar check and return its job id straight away"""
+    data = request.get_json() or {}
+    text = (data.get('text') or '').strip()
+
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+
+    try:
+        job = grammar_jobs.submit(run_grammar_job, current_user.id, text, owner=current_user.id)
+    except QueueFullError:
+        response = jsonify({'error': 'Too many grammar checks in progress. Please retry shortly.'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('api_grammar_job_status', job_id=job.id),
+        'stream_url': url_for('api_grammar_job_stream', job_id=job.id)
+    }), 202
+
+@app.route('/api/check-grammar/jobs/<job_id>', methods=['GET'])
+@login_required
+def api_grammar_job_status(job_id):
+    """Poll a grammar job; the result is included once it is done"""
+    job = grammar_jobs.get(job_id, owner=current_user.id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/check-grammar/jobs/<job_id>/stream', methods=['GET'])
+@login_required
+def api_grammar_job_stream(job_id):
+    """Stream job status changes and the final result as server-sent events"""
+    job = grammar_jobs.get(job_id, owner=current_user.id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        status = None
+        idle_seconds = 0
+        while not job.wait(timeout=1):
+            if job.status != status:
+                status = job.status
+                idle_seconds = 0
+                yield f"event: status\ndata: {json.dumps(job.to_dict(include_result=False))}\n\n"
+            else:
+                idle_seconds += 1
+                if idle_seconds % 15 == 0:
+                    yield ": keep-alive\n\n"
+        yield f"event: result\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/check-grammar/batch', methods=['POST'])
+@login_required
+def api_check_grammar_batch():
+    """Check many texts in one request; results are returned in input order"""
+    try:
+        data = request.get_json() or {}
+        texts = data.get('texts')
+
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'No texts provided'}), 400
+
+        max_texts = app.config['GRAMMAR_BATCH_MAX_TEXTS']
+        if len(texts) > max_texts:
+            return jsonify({'error': f'Too many texts (maximum {max_texts} per request)'}), 413
+
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'Every text must be a string'}), 400
+
+        texts = [text.strip() for text in texts]
+        enhanced = data.get('mode', 'enhanced') != 'basic'
+
+        from speech_utils.grammar_checker import check_grammar_batch, SPACY_MODES
+
+        # Basic mode can pick a cheaper spaCy stage per request ('sentences' or 'off')
+        spacy_mode = data.get('spacy')
+        if spacy_mode is not None and spacy_mode not in SPACY_MODES:
+            return jsonify({'error': f"Unknown spaCy mode (expected one of {', '.join(SPACY_MODES)})"}), 400
+
+        results = check_grammar_batch(texts, enhanced=enhanced, spacy_mode=spacy_mode)
+
+        # Save every non-empty check in a single commit
+        record_user_activity(current_user.id, grammar_scores=[
+            result.get('accuracy_score', 100.0) for text, result in zip(texts, results) if text
+        ])
+        db.session.add_all([
+            GrammarCheck(
+                user_id=current_user.id,
+                original_text=text,
+                corrected_text=result.get('corrected_text'),
+                errors_found=len(result.get('errors', [])),
+                accuracy_score=result.get('accuracy_score', 100.0)
+            )
+            for text, result in zip(texts, results) if text
+        ])
+        db.session.commit()
+
+        return jsonify({'results': results, 'count': len(results)})
+
+    except Exception as e:
+        print(f"Batch grammar check error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'Batch grammar check failed'}), 500
+
 @app.route('/api/analyze-pronunciation', methods=['POST'])
 @login_required
 def api_analyze_pronunciation():
@@ -241,17 +546,27 @@ def api_analyze_pronunciation():
             if not audio_file:
                 return jsonify({'error': 'Missing audio file'}), 400
 
+            # Import pronunciation analysis module
+            from speech_utils.audio_io import AudioLimitError, check_upload_size
+            from speech_utils.pronunciation_analyzer import analyze_pronunciation
+
+            # Oversized uploads are turned away before they are read
+            try:
+                check_upload_size(request.content_length)
+            except AudioLimitError as e:
+                return jsonify({'error': str(e)}), 413
+
             # Read audio data
             audio_data = audio_file.read()
 
-            # Import pronunciation analysis module
-            from speech_utils.pronunciation_analyzer import analyze_pronunciation, process_audio_file, process_webm_audio
-
-            # Process audio to get recognized text
-            if audio_file.filename.endswith('.webm'):
-                recognized_text = process_webm_audio(audio_data)
-            else:
-                recognized_text = process_audio_file(audio_data)
+            # Decode once (or not at all for a clip already transcribed) on the
+            # audio workers; the result feeds both the transcript and the timing analysis
+            upload, error_response = transcribe_upload_request(
+                audio_data, 'webm' if audio_file.filename.endswith('.webm') else None, expected_text
+            )
+            if error_response:
+                return error_response
+            recognized_text = upload['recognized_text']
 
             if not recognized_text:
                 return jsonify({
@@ -261,7 +576,7 @@ def api_analyze_pronunciation():
                 }), 400
 
             # Perform analysis with audio data
-            result = analyze_pronunciation(expected_text, recognized_text, audio_data)
+            result = analyze_pronunciation(expected_text, recognized_text, audio_measurements=upload['measurements'])
 
         else:
             # Handle JSON data (text-based analysis)
@@ -279,6 +594,7 @@ def api_analyze_pronunciation():
             result = analyze_pronunciation(expected_text, recognized_text)
 
         # Save to database
+        record_user_activity(current_user.id, practice_scores=[result.get('overall_score', 0)])
         practice_session = PracticeSession(
             user_id=current_user.id,
             expected_text=expected_text,
@@ -302,6 +618,235 @@ def api_analyze_pronunciation():
         traceback.print_exc()
         return jsonify({'error': 'Pronunciation analysis failed', 'details': str(e)}), 500
 
+def client_disconnected():
+    """
+    Whether the client of the current request has closed its connection
+
+    Only detectable on servers that expose the socket (the Werkzeug server);
+    elsewhere this always returns False.
+    """
+    connection = request.environ.get('werkzeug.socket')
+    if connection is None:
+        return False
+    try:
+        readable, _, _ = select.select([connection], [], [], 0)
+        # The request body has been read, so a readable socket is either the
+        # next pipelined request or end-of-file from a closed connection
+        return bool(readable) and connection.recv(1, socket.MSG_PEEK) == b''
+    except (OSError, ValueError):
+        return True
+
+def audio_job_request(run, *args):
+    """
+    Run one of the audio worker pool's methods for the current request
+
+    Returns:
+        (the method's result, None), or (None, error response) when the audio
+        is over the limits or the pool is overloaded
+    """
+    from speech_utils.audio_io import AudioLimitError
+
+    try:
+        return run(*args, owner=current_user.id, disconnected=client_disconnected), None
+    except AudioLimitError as e:
+        return None, (jsonify({'error': str(e)}), 413)
+    except OwnerLimitError:
+        response = jsonify({'error': 'You already have recordings being processed. Please retry shortly.'})
+        response.headers['Retry-After'] = '5'
+        return None, (response, 429)
+    except (QueueFullError, AudioJobTimeout) as e:
+        print(f"Audio worker pool overloaded: {e}")
+        response = jsonify({'error': 'Audio processing is busy. Please retry shortly.'})
+        response.headers['Retry-After'] = '10'
+        return None, (response, 503)
+    except AudioJobCancelled:
+        # Nobody is left to read the response; 499 as nginx logs it
+        return None, (jsonify({'error': 'Client disconnected'}), 499)
+
+def transcribe_upload_request(audio_data, audio_format, expected_text):
+    """
+    Transcribe an upload of the current request on the audio worker pool
+
+    Returns:
+        (recognize_upload result, None), or (None, error response) when the
+        upload is over the limits or the pool is overloaded
+    """
+    return audio_job_request(audio_workers.transcribe_upload, audio_data, audio_format, expected_text)
+
+def practice_session_row(user_id, expected_text, recognized_text, result):
+    """Column values for a PracticeSession built from an analysis result"""
+    return {
+        'user_id': user_id,
+        'expected_text': expected_text,
+        'recognized_text': recognized_text,
+        'pronunciation_score': result.get('pronunciation_score', 0),
+        'fluency_score': result.get('fluency_score', 0),
+        'completeness_score': result.get('completeness_score', 0),
+        'overall_score': result.get('overall_score', 0)
+    }
+
+@app.route('/api/analyze-pronunciation/batch', methods=['POST'])
+@login_required
+def api_analyze_pronunciation_batch():
+    """Score many (expected, recognized) text pairs in one request; results keep input order"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('pairs')
+
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'No pairs provided'}), 400
+
+        max_pairs = app.config['PRONUNCIATION_BATCH_MAX_PAIRS']
+        if len(items) > max_pairs:
+            return jsonify({'error': f'Too many pairs (maximum {max_pairs} per request)'}), 413
+
+        # Each pair is {"expected_text": ..., "recognized_text": ...} or [expected, recognized]
+        pairs = []
+        for item in items:
+            if isinstance(item, dict):
+                item = (item.get('expected_text'), item.get('recognized_text'))
+            if (not isinstance(item, (list, tuple)) or len(item) != 2
+                    or not all(isinstance(value, str) for value in item)):
+                return jsonify({'error': 'Every pair needs expected_text and recognized_text strings'}), 400
+            pairs.append((item[0].strip(), item[1].strip()))
+
+        from speech_utils.pronunciation_analyzer import analyze_pronunciation_batch
+
+        results = analyze_pronunciation_batch(pairs, workers=app.config['PRONUNCIATION_BATCH_WORKERS'])
+
+        # Save every scored pair with one bulk insert
+        if data.get('save', True):
+            rows = [
+                practice_session_row(current_user.id, expected_text, recognized_text, result)
+                for (expected_text, recognized_text), result in zip(pairs, results)
+                if expected_text and recognized_text
+            ]
+            record_user_activity(current_user.id, practice_scores=[row['overall_score'] for row in rows])
+            db.session.bulk_insert_mappings(PracticeSession, rows)
+            db.session.commit()
+
+        # Scores only, unless the caller asks for the full word-level analysis
+        if not data.get('details', True):
+            score_keys = ('pronunciation_score', 'fluency_score', 'completeness_score',
+                          'overall_score', 'wer', 'accuracy_percentage')
+            results = [{key: result.get(key) for key in score_keys} for result in results]
+
+        return jsonify({'results': results, 'count': len(results)})
+
+    except Exception as e:
+        print(f"Batch pronunciation analysis error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'Batch pronunciation analysis failed'}), 500
+
+@app.route('/api/practice/stream', methods=['POST'])
+@login_required
+def api_start_practice_stream():
+    """Open a streaming recording; chunks are then POSTed as they are recorded"""
+    data = request.get_json() or {}
+    expected_text = (data.get('expected_text') or '').strip()
+
+    if not expected_text:
+        return jsonify({'error': 'Missing expected text'}), 400
+
+    try:
+        stream = speech_streams.create(
+            expected_text,
+            audio_format=data.get('format', 'webm'),
+            owner=current_user.id,
+            max_bytes=app.config['SPEECH_STREAM_MAX_BYTES']
+        )
+    except StreamLimitError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+
+    return jsonify({
+        'stream_id': stream.id,
+        'chunk_url': url_for('api_practice_stream_chunk', stream_id=stream.id),
+        'finish_url': url_for('api_finish_practice_stream', stream_id=stream.id),
+        'close_url': url_for('api_close_practice_stream', stream_id=stream.id)
+    }), 201
+
+@app.route('/api/practice/stream/<stream_id>', methods=['DELETE'])
+@login_required
+def api_close_practice_stream(stream_id):
+    """Abandon a streaming recording, e.g. after falling back to a full upload"""
+    if speech_streams.get(stream_id, owner=current_user.id) is None:
+        return jsonify({'error': 'Stream not found'}), 404
+    speech_streams.close(stream_id)
+    return '', 204
+
+@app.route('/api/practice/stream/<stream_id>/chunk', methods=['POST'])
+@login_required
+def api_practice_stream_chunk(stream_id):
+    """Append one recorded chunk (raw body, ?seq=N) and return the partial transcript"""
+    stream = speech_streams.get(stream_id, owner=current_user.id)
+    if stream is None:
+        return jsonify({'error': 'Stream not found'}), 404
+
+    try:
+        seq = request.args.get('seq', type=int)
+        if stream.add_chunk(request.get_data(), seq):
+            # The chunk is kept even when the pool turns recognition away; the next one catches up
+            _, error_response = audio_job_request(audio_workers.run, stream.recognize)
+            if error_response:
+                return error_response
+        return jsonify(stream.progress())
+    except StreamError as e:
+        return jsonify({'error': str(e), 'next_seq': stream.next_seq}), 409
+    except Exception as e:
+        print(f"Streaming chunk error: {e}")
+        return jsonify({'error': 'Could not process audio chunk'}), 500
+
+@app.route('/api/practice/stream/<stream_id>/finish', methods=['POST'])
+@login_required
+def api_finish_practice_stream(stream_id):
+    """Recognize the rest of the recording, score it and save the practice session"""
+    stream = speech_streams.get(stream_id, owner=current_user.id)
+    if stream is None:
+        return jsonify({'error': 'Stream not found'}), 404
+
+    try:
+        try:
+            recognized_text, error_response = audio_job_request(audio_workers.run, stream.finish)
+        except StreamError as e:
+            speech_streams.close(stream_id)
+            return jsonify({'error': str(e)}), 413
+        if error_response:
+            # After a 429 or 503 the client may retry once Retry-After has passed, so keep the stream
+            if error_response[1] not in (429, 503):
+                speech_streams.close(stream_id)
+            return error_response
+        speech_streams.close(stream_id)
+
+        if not recognized_text:
+            return jsonify({
+                'error': 'Could not recognize speech from audio',
+                'recognized_text': '',
+                'suggestion': 'Please try speaking more clearly or check your microphone'
+            }), 400
+
+        from speech_utils.pronunciation_analyzer import analyze_pronunciation
+
+        result = analyze_pronunciation(stream.expected_text, recognized_text, stream.pcm)
+
+        record_user_activity(current_user.id, practice_scores=[result.get('overall_score', 0)])
+        db.session.add(PracticeSession(**practice_session_row(
+            current_user.id, stream.expected_text, recognized_text, result
+        )))
+        db.session.commit()
+
+        result['recognized_text'] = recognized_text
+        return jsonify(result)
+
+    except Exception as e:
+        speech_streams.close(stream_id)
+        print(f"Streaming pronunciation analysis error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'Pronunciation analysis failed', 'details': str(e)}), 500
+
 @app.route('/api/process-audio', methods=['POST'])
 @login_required
 def api_process_audio():
@@ -314,17 +859,25 @@ def api_process_audio():
         if audio_file.filename == '':
             return jsonify({'error': 'No audio file selected'}), 400
 
+        expected_text = request.form.get('expected_text', '').strip() or None
+
+        from speech_utils.audio_io import AudioLimitError, check_upload_size
+
+        # Oversized uploads are turned away before they are read
+        try:
+            check_upload_size(request.content_length)
+        except AudioLimitError as e:
+            return jsonify({'success': False, 'error': str(e)}), 413
+
         # Read audio data
         audio_data = audio_file.read()
 
-        # Import speech processing functions
-        from speech_utils.pronunciation_analyzer import process_audio_file, process_webm_audio
-
-        # Process audio based on file type
-        if audio_file.filename.endswith('.webm') or audio_file.content_type == 'audio/webm':
-            recognized_text = process_webm_audio(audio_data)
-        else:
-            recognized_text = process_audio_file(audio_data)
+        # Process audio based on file type, on the audio workers
+        is_webm = audio_file.filename.endswith('.webm') or audio_file.content_type == 'audio/webm'
+        upload, error_response = transcribe_upload_request(audio_data, 'webm' if is_webm else None, expected_text)
+        if error_response:
+            return error_response
+        recognized_text = upload['recognized_text']
 
         if not recognized_text:
             return jsonify({
@@ -345,6 +898,21 @@ def api_process_audio():
         traceback.print_exc()
         return jsonify({'error': 'Audio processing failed', 'details': str(e)}), 500
 
+@app.route('/api/activities')
+@login_required
+def api_activities():
+    """Page through the current user's activity history, newest first"""
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), app.config['ACTIVITY_PAGE_MAX'])
+        activities, next_cursor = get_activity_feed(current_user.id, limit, request.args.get('before'))
+        return jsonify({'activities': activities, 'next_cursor': next_cursor})
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Activity feed error: {e}")
+        return jsonify({'error': 'Failed to load activities'}), 500
+
 @app.route('/api/update-profile', methods=['POST'])
 @login_required
 def api_update_profile():
@@ -466,6 +1034,8 @@ def api_delete_account():
         # Delete user's data
         GrammarCheck.query.filter_by(user_id=user_id).delete()
         PracticeSession.query.filter_by(user_id=user_id).delete()
+        UserStats.query.filter_by(user_id=user_id).delete()
+        invalidate_dashboard_on_commit(user_id)
 
         # Delete user account
         db.session.delete(current_user)
@@ -513,6 +1083,8 @@ def api_test_pronunciation():
 @app.route('/api/health', methods=['GET'])
 def api_health():
     """Health check endpoint"""
+    from speech_utils.recognizers import get_recognizer_status
+
     return jsonify({
         'status': 'healthy',
         'message': 'Pronunciation Detector API is running',
@@ -521,7 +1093,8 @@ def api_health():
             'pronunciation_analyzer': True,
             'user_management': True,
             'database': True
-        }
+        },
+        'speech_recognition': get_recognizer_status()
     })
 
 @app.route('/api/stats', methods=['GET'])
@@ -532,216 +1105,371 @@ def api_stats():
         total_grammar_checks = GrammarCheck.query.count()
         total_practice_sessions = PracticeSession.query.count()
 
+        from speech_utils.grammar_checker import get_cache_stats, get_pool_stats
+        from speech_utils.pronunciation_analyzer import get_transcription_cache_stats
+
         return jsonify({
             'total_users': total_users,
             'total_grammar_checks': total_grammar_checks,
             'total_practice_sessions': total_practice_sessions,
+            'grammar_cache': get_cache_stats(),
+            'grammar_pool': get_pool_stats(),
+            'grammar_jobs': grammar_jobs.stats(),
+            'speech_streams': speech_streams.stats(),
+            'audio_workers': audio_workers.stats(),
+            'transcription_cache': get_transcription_cache_stats(),
+            'dashboard_cache': dashboard_cache.stats(),
             'demo_available': True
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Helper Functions
+# Days of the week as numbered by strftime('%w')
+WEEKDAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+# Practice sessions kept in UserStats.recent_scores
+RECENT_SCORES = 5
+# Days of scores kept in UserStats.daily_scores (this week and last)
+DAILY_SCORE_DAYS = 14
+
 def get_user_statistics(user_id):
     """Get comprehensive user statistics for dashboard"""
-    grammar_checks = GrammarCheck.query.filter_by(user_id=user_id).count()
-    practice_sessions = PracticeSession.query.filter_by(user_id=user_id).count()
-
-    # Calculate average scores
-    sessions = PracticeSession.query.filter_by(user_id=user_id).all()
-    avg_score = 0
-    best_score = 0
-    if sessions:
-        scores = [session.overall_score for session in sessions if session.overall_score]
-        if scores:
-            avg_score = round(sum(scores) / len(scores))
-            best_score = round(max(scores))
-
-    # Calculate grammar accuracy
-    grammar_records = GrammarCheck.query.filter_by(user_id=user_id).all()
-    avg_grammar_accuracy = 0
-    if grammar_records:
-        accuracies = [record.accuracy_score for record in grammar_records if record.accuracy_score]
-        if accuracies:
-            avg_grammar_accuracy = round(sum(accuracies) / len(accuracies))
-
-    # Calculate streak and activity patterns
-    streak_days = calculate_streak_days(user_id)
-    most_active_day = get_most_active_day(user_id)
-    improvement_rate = calculate_improvement_rate(user_id)
-
-    # Recent performance trend
-    recent_sessions = PracticeSession.query.filter_by(user_id=user_id)\
-                                          .order_by(PracticeSession.created_at.desc())\
-                                          .limit(5).all()
+    # No row before the user's first activity since the rollup was introduced: compute one
+    # but do not save it from a read. The next activity or `flask rebuild-user-stats` does.
+    stats = db.session.get(UserStats, user_id) or build_user_stats(user_id)
+
+    today = datetime.utcnow().date()
+    weekday_counts = stats.weekday_counts
+
+    # Improvement of this week's average score over last week's
+    weekly = [[0.0, 0], [0.0, 0]]
+    for day, (score_sum, score_count) in stats.daily_scores.items():
+        age = (today - date.fromisoformat(day)).days
+        if 0 <= age < DAILY_SCORE_DAYS:
+            weekly[age // 7][0] += score_sum
+            weekly[age // 7][1] += score_count
+    last_week_avg, prev_week_avg = (total / count if count else None for total, count in weekly)
 
     return {
-        'grammar_checks': grammar_checks,
-        'practice_sessions': practice_sessions,
-        'avg_score': avg_score,
-        'best_score': best_score,
-        'avg_grammar_accuracy': avg_grammar_accuracy,
-        'streak_days': streak_days,
-        'most_active_day': most_active_day,
-        'improvement_rate': improvement_rate,
-        'total_activities': grammar_checks + practice_sessions,
-        'recent_performance': [s.overall_score for s in recent_sessions if s.overall_score]
+        'grammar_checks': stats.grammar_checks,
+        'practice_sessions': stats.practice_sessions,
+        'avg_score': round(stats.score_sum / stats.score_count) if stats.score_count else 0,
+        'best_score': round(stats.best_score) if stats.best_score else 0,
+        'avg_grammar_accuracy': (round(stats.grammar_accuracy_sum / stats.grammar_accuracy_count)
+                                 if stats.grammar_accuracy_count else 0),
+        # A streak only counts while it includes today
+        'streak_days': stats.current_streak if stats.last_active_date == today else 0,
+        'most_active_day': (WEEKDAYS[max(range(7), key=weekday_counts.__getitem__)]
+                            if any(weekday_counts) else "No data yet"),
+        'improvement_rate': format_improvement_rate(last_week_avg, prev_week_avg),
+        'total_activities': stats.grammar_checks + stats.practice_sessions,
+        'recent_performance': [score for score in stats.recent_scores if score]
     }
 
-def get_recent_activities(user_id, limit=5):
-    """Get recent user activities"""
-    activities = []
-    
-    # Get recent grammar checks
-    recent_grammar = GrammarCheck.query.filter_by(user_id=user_id)\
-                                      .order_by(GrammarCheck.created_at.desc())\
-                                      .limit(limit).all()
-    
-    for check in recent_grammar:
-        activities.append({
-            'icon': 'spell-check',
-            'color': 'primary',
-            'description': f'Checked grammar - {check.errors_found} errors found',
-            'timestamp': check.created_at.strftime('%Y-%m-%d %H:%M')
-        })
-    
-    # Get recent practice sessions
-    recent_practice = PracticeSession.query.filter_by(user_id=user_id)\
-                                          .order_by(PracticeSession.created_at.desc())\
-                                          .limit(limit).all()
-    
-    for session in recent_practice:
-        activities.append({
-            'icon': 'microphone',
-            'color': 'success',
-            'description': f'Practice session - {session.overall_score}% score',
-            'timestamp': session.created_at.strftime('%Y-%m-%d %H:%M')
-        })
-    
-    # Sort by timestamp and return limited results
-    activities.sort(key=lambda x: x['timestamp'], reverse=True)
-    return activities[:limit]
-
-def calculate_streak_days(user_id):
-    """Calculate user's current streak days (simplified)"""
-    # This is a simplified implementation
-    # In a real app, you'd track daily activity more precisely
-    recent_activity = db.session.query(
-        db.func.date(GrammarCheck.created_at).label('date')
-    ).filter_by(user_id=user_id).union(
-        db.session.query(
-            db.func.date(PracticeSession.created_at).label('date')
-        ).filter_by(user_id=user_id)
-    ).distinct().order_by(db.text('date DESC')).limit(30).all()
-    
-    if not recent_activity:
-        return 0
-    
-    # Simple streak calculation
-    streak = 0
-    current_date = date.today()
-    
-    for activity_date in recent_activity:
-        if isinstance(activity_date[0], str):
-            activity_date = datetime.strptime(activity_date[0], '%Y-%m-%d').date()
-        else:
-            activity_date = activity_date[0]
-        
-        if activity_date == current_date:
-            streak += 1
-            current_date = current_date.replace(day=current_date.day - 1)
-        else:
-            break
-    
-    return streak
-
-def get_most_active_day(user_id):
-    """Get the most active day of the week for the user"""
-    try:
-        from sqlalchemy import func, extract
-
-        # Get activity by day of week
-        grammar_activity = db.session.query(
-            extract('dow', GrammarCheck.created_at).label('day_of_week'),
-            func.count(GrammarCheck.id).label('count')
-        ).filter_by(user_id=user_id).group_by('day_of_week').all()
-
-        practice_activity = db.session.query(
-            extract('dow', PracticeSession.created_at).label('day_of_week'),
-            func.count(PracticeSession.id).label('count')
-        ).filter_by(user_id=user_id).group_by('day_of_week').all()
-
-        # Combine activities
-        day_counts = {}
-        for day, count in grammar_activity:
-            day_counts[int(day)] = day_counts.get(int(day), 0) + count
+def get_dashboard(user_id):
+    """Statistics and recent activities for /home and /profile, from the dashboard cache"""
+    return dashboard_cache.get_or_compute(user_id, lambda: {
+        'user_stats': get_user_statistics(user_id),
+        'recent_activities': get_recent_activities(user_id)
+    })
 
-        for day, count in practice_activity:
-            day_counts[int(day)] = day_counts.get(int(day), 0) + count
+def invalidate_dashboard_on_commit(user_id):
+    """Drop the user's cached dashboard once the current transaction commits"""
+    db.session.info.setdefault('dashboard_invalidations', set()).add(user_id)
 
-        if not day_counts:
-            return "No data yet"
+@event.listens_for(db.session, 'after_commit')
+def invalidate_committed_dashboards(session):
+    for user_id in session.info.pop('dashboard_invalidations', ()):
+        dashboard_cache.invalidate(user_id)
 
-        # Find most active day
-        most_active_day_num = max(day_counts, key=day_counts.get)
-        days = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_dashboard_invalidations(session, previous_transaction):
+    session.info.pop('dashboard_invalidations', None)
 
-        return days[most_active_day_num]
+def create_user_stats(user_id):
+    """
+    Insert the user's UserStats row, built from their history
 
-    except Exception as e:
-        print(f"Error calculating most active day: {e}")
-        return "No data yet"
+    Safe to run twice: when another request creates the row first, the
+    insert's savepoint is rolled back and that row is kept.
+    """
+    from sqlalchemy.exc import IntegrityError
 
-def calculate_improvement_rate(user_id):
-    """Calculate improvement rate over the last week"""
+    # Pending history rows of the current request must not be counted twice
+    with db.session.no_autoflush:
+        stats = build_user_stats(user_id)
     try:
-        from datetime import datetime, timedelta
-
-        # Get sessions from last two weeks
-        two_weeks_ago = datetime.utcnow() - timedelta(days=14)
-        one_week_ago = datetime.utcnow() - timedelta(days=7)
+        with db.session.begin_nested():
+            db.session.add(stats)
+    except IntegrityError:
+        pass
+
+def record_user_activity(user_id, grammar_scores=(), practice_scores=()):
+    """
+    Fold new history rows into the user's UserStats row
+
+    Call it before adding the rows and commit them together, so the totals
+    never disagree with the history. The user's cached dashboard is dropped
+    when that commit succeeds.
+
+    Counters are incremented in SQL rather than read and written back, so
+    concurrent writers (request threads, grammar job workers) cannot lose
+    each other's updates. That UPDATE also locks the row (the whole
+    database on SQLite) until commit, so the JSON columns read after it
+    cannot change underneath this transaction.
+
+    Args:
+        user_id: Owner of the new rows
+        grammar_scores: accuracy_score of each new GrammarCheck
+        practice_scores: overall_score of each new PracticeSession, oldest first
+    """
+    from sqlalchemy import case, func
+
+    grammar_scores = list(grammar_scores)
+    practice_scores = list(practice_scores)
+    if not grammar_scores and not practice_scores:
+        return
+
+    invalidate_dashboard_on_commit(user_id)
+    now = datetime.utcnow()
+    today = now.date()
+
+    scored_grammar = [score for score in grammar_scores if score]
+    scored = [score for score in practice_scores if score]
+    counters = {
+        'grammar_checks': UserStats.grammar_checks + len(grammar_scores),
+        'grammar_accuracy_sum': UserStats.grammar_accuracy_sum + sum(scored_grammar),
+        'grammar_accuracy_count': UserStats.grammar_accuracy_count + len(scored_grammar),
+        'practice_sessions': UserStats.practice_sessions + len(practice_scores),
+        'score_sum': UserStats.score_sum + sum(scored),
+        'score_count': UserStats.score_count + len(scored),
+        'current_streak': case(
+            (UserStats.last_active_date == today, UserStats.current_streak),
+            (UserStats.last_active_date == today - timedelta(days=1), UserStats.current_streak + 1),
+            else_=1
+        ),
+        'last_active_date': today
+    }
+    if scored:
+        best = max(scored)
+        counters['best_score'] = case(
+            (func.coalesce(UserStats.best_score, 0) < best, best),
+            else_=UserStats.best_score
+        )
 
-        # Last week's sessions
-        last_week_sessions = PracticeSession.query.filter(
+    update_counters = (db.update(UserStats).where(UserStats.user_id == user_id).values(**counters)
+                       .execution_options(synchronize_session=False))
+    if db.session.execute(update_counters).rowcount == 0:
+        # First activity since the rollup was introduced
+        create_user_stats(user_id)
+        db.session.execute(update_counters)
+
+    stats = (UserStats.query.filter_by(user_id=user_id)
+             .with_for_update().populate_existing().one())
+
+    weekday_counts = list(stats.weekday_counts)
+    weekday_counts[int(now.strftime('%w'))] += len(grammar_scores) + len(practice_scores)
+
+    cutoff = today - timedelta(days=DAILY_SCORE_DAYS)
+    daily_scores = {day: totals for day, totals in stats.daily_scores.items()
+                    if date.fromisoformat(day) > cutoff}
+    if scored:
+        score_sum, score_count = daily_scores.get(today.isoformat(), (0.0, 0))
+        daily_scores[today.isoformat()] = [score_sum + sum(scored), score_count + len(scored)]
+
+    db.session.execute(
+        db.update(UserStats).where(UserStats.user_id == user_id).values(
+            weekday_counts=weekday_counts,
+            daily_scores=daily_scores,
+            recent_scores=(practice_scores[::-1] + list(stats.recent_scores))[:RECENT_SCORES]
+        ).execution_options(synchronize_session=False)
+    )
+    # The loaded row is now behind the database; reload it if it is read again
+    db.session.expire(stats)
+
+def build_user_stats(user_id):
+    """UserStats for a user computed from their whole history (not added to the session)"""
+    from sqlalchemy import func, extract, union_all
+
+    stats = UserStats(user_id=user_id)
+
+    score = func.nullif(PracticeSession.overall_score, 0)
+    stats.practice_sessions, stats.score_sum, stats.score_count, stats.best_score = db.session.query(
+        func.count(PracticeSession.id),
+        func.coalesce(func.sum(score), 0.0),
+        func.count(score),
+        func.max(score)
+    ).filter(PracticeSession.user_id == user_id).one()
+
+    accuracy = func.nullif(GrammarCheck.accuracy_score, 0)
+    stats.grammar_checks, stats.grammar_accuracy_sum, stats.grammar_accuracy_count = db.session.query(
+        func.count(GrammarCheck.id),
+        func.coalesce(func.sum(accuracy), 0.0),
+        func.count(accuracy)
+    ).filter(GrammarCheck.user_id == user_id).one()
+
+    # Every activity time, for the weekday counts and the streak
+    activity = union_all(
+        db.select(GrammarCheck.created_at.label('created_at')).where(GrammarCheck.user_id == user_id),
+        db.select(PracticeSession.created_at.label('created_at')).where(PracticeSession.user_id == user_id)
+    ).subquery()
+
+    day_of_week = extract('dow', activity.c.created_at).label('day_of_week')
+    weekday_counts = [0] * 7
+    for day, count in db.session.query(day_of_week, func.count()).group_by(day_of_week):
+        weekday_counts[int(day)] = count
+    stats.weekday_counts = weekday_counts
+
+    # Walk back over active days until the first gap
+    active_day = func.date(activity.c.created_at).label('active_day')
+    stats.current_streak = 0
+    previous = None
+    for day, in db.session.query(active_day).distinct().order_by(active_day.desc()):
+        day = date.fromisoformat(day) if isinstance(day, str) else day
+        if previous is None:
+            stats.last_active_date = day
+        elif previous - day != timedelta(days=1):
+            break
+        stats.current_streak += 1
+        previous = day
+
+    cutoff = datetime.utcnow().date() - timedelta(days=DAILY_SCORE_DAYS)
+    scored_day = func.date(PracticeSession.created_at).label('scored_day')
+    stats.daily_scores = {
+        str(day): [score_sum, score_count]
+        for day, score_sum, score_count in db.session.query(
+            scored_day, func.sum(score), func.count(score)
+        ).filter(
             PracticeSession.user_id == user_id,
-            PracticeSession.created_at >= one_week_ago
-        ).all()
+            PracticeSession.created_at >= datetime.combine(cutoff + timedelta(days=1), datetime.min.time())
+        ).group_by(scored_day)
+        if score_count
+    }
 
-        # Previous week's sessions
-        prev_week_sessions = PracticeSession.query.filter(
-            PracticeSession.user_id == user_id,
-            PracticeSession.created_at >= two_weeks_ago,
-            PracticeSession.created_at < one_week_ago
-        ).all()
+    stats.recent_scores = [score for score, in db.session.query(PracticeSession.overall_score)
+                           .filter_by(user_id=user_id)
+                           .order_by(PracticeSession.created_at.desc())
+                           .limit(RECENT_SCORES)]
+    return stats
+
+def rebuild_user_stats(user_ids=None):
+    """Recompute UserStats rows from history (every user by default) and commit"""
+    if user_ids is None:
+        user_ids = [user_id for user_id, in db.session.query(User.id)]
+    for user_id in user_ids:
+        db.session.merge(build_user_stats(user_id))
+        invalidate_dashboard_on_commit(user_id)
+    db.session.commit()
+    return len(user_ids)
+
+# Activity kinds in the feed, as (kind, model, value column, icon, color)
+ACTIVITY_KINDS = (
+    ('grammar', GrammarCheck, GrammarCheck.errors_found, 'spell-check', 'primary'),
+    ('practice', PracticeSession, PracticeSession.overall_score, 'microphone', 'success')
+)
 
-        # Calculate averages
-        last_week_avg = 0
-        prev_week_avg = 0
+def get_recent_activities(user_id, limit=5):
+    """Get recent user activities"""
+    return get_activity_feed(user_id, limit)[0]
+
+def get_activity_feed(user_id, limit=20, before=None):
+    """
+    A page of the user's grammar checks and practice sessions, newest first
+
+    Both tables are read by one UNION ALL query ordered by (created_at, kind, id),
+    and pages are keyset-paginated on that order, so a deep page costs the same
+    as the first one.
+
+    Args:
+        user_id: Whose activities
+        limit: Activities per page
+        before: next_cursor of the previous page, or None for the newest activities
+
+    Returns:
+        Tuple of the activities and the cursor of the next page (None on the last page)
+
+    Raises:
+        ValueError: When before is not a cursor returned by this function
+    """
+    from sqlalchemy import literal, or_, union_all
+
+    cursor = parse_activity_cursor(before) if before else None
+
+    branches = []
+    for kind, model, value, _, _ in ACTIVITY_KINDS:
+        branch = db.select(
+            literal(kind).label('kind'),
+            model.id.label('id'),
+            model.created_at.label('created_at'),
+            value.label('value')
+        ).where(model.user_id == user_id)
+
+        if cursor is not None:
+            # Rows after the cursor in (created_at, kind, id) DESC order; kind is fixed per branch
+            cursor_time, cursor_kind, cursor_id = cursor
+            if kind < cursor_kind:
+                branch = branch.where(model.created_at <= cursor_time)
+            elif kind > cursor_kind:
+                branch = branch.where(model.created_at < cursor_time)
+            else:
+                # The <= bound lets the index range start at the cursor
+                branch = branch.where(model.created_at <= cursor_time,
+                                      or_(model.created_at < cursor_time, model.id < cursor_id))
 
-        if last_week_sessions:
-            scores = [s.overall_score for s in last_week_sessions if s.overall_score]
-            if scores:
-                last_week_avg = sum(scores) / len(scores)
+        # Each branch stops at the page size too, so neither table is read past the page
+        branches.append(branch.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).subquery().select())
 
-        if prev_week_sessions:
-            scores = [s.overall_score for s in prev_week_sessions if s.overall_score]
-            if scores:
-                prev_week_avg = sum(scores) / len(scores)
+    feed = union_all(*branches).subquery()
+    rows = db.session.execute(
+        db.select(feed).order_by(feed.c.created_at.desc(), feed.c.kind.desc(), feed.c.id.desc()).limit(limit + 1)
+    ).all()
 
-        if prev_week_avg == 0:
-            return "+0"
+    styles = {kind: (icon, color) for kind, _, _, icon, color in ACTIVITY_KINDS}
+    activities = []
+    for kind, activity_id, created_at, value in rows[:limit]:
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        icon, color = styles[kind]
+        activities.append({
+            'type': kind,
+            'id': activity_id,
+            'icon': icon,
+            'color': color,
+            'description': (f'Checked grammar - {value} errors found' if kind == 'grammar'
+                            else f'Practice session - {value}% score'),
+            'timestamp': created_at.strftime('%Y-%m-%d %H:%M'),
+            'created_at': created_at.isoformat()
+        })
 
-        improvement = ((last_week_avg - prev_week_avg) / prev_week_avg) * 100
-        return f"+{improvement:.1f}" if improvement > 0 else f"{improvement:.1f}"
+    next_cursor = None
+    if len(rows) > limit:
+        last = activities[-1]
+        next_cursor = f"{last['created_at']},{last['type']},{last['id']}"
+    return activities, next_cursor
 
-    except Exception as e:
-        print(f"Error calculating improvement rate: {e}")
+def parse_activity_cursor(cursor):
+    """Split an activity feed cursor into (created_at, kind, id)"""
+    try:
+        created_at, kind, activity_id = cursor.split(',')
+        if kind not in {kind for kind, *_ in ACTIVITY_KINDS}:
+            raise ValueError(kind)
+        return datetime.fromisoformat(created_at), kind, int(activity_id)
+    except ValueError:
+        raise ValueError(f'Invalid activity cursor: {cursor}')
+
+def format_improvement_rate(last_week_avg, prev_week_avg):
+    """Percentage change between two weekly average scores, e.g. "+4.2" (None = no sessions)"""
+    if not prev_week_avg:
         return "+0"
 
+    improvement = (((last_week_avg or 0) - prev_week_avg) / prev_week_avg) * 100
+    return f"+{improvement:.1f}" if improvement > 0 else f"{improvement:.1f}"
+
 # Create database tables
 def create_tables():
     with app.app_context():
         db.create_all()
+        migrate_schema()
 
         # Create demo user if it doesn't exist
         demo_user = User.query.filter_by(username='demo').first()
@@ -758,6 +1486,108 @@ def create_tables():
             db.session.commit()
             print("Demo user created: username='demo', password='demo123'")
 
+def migrate_schema():
+    """
+    Bring an existing database up to date with the models
+
+    create_all() only creates missing tables, so indexes added to a model
+    later are created here for databases made before them.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+# Tables whose per-user queries must be served from an index
+HISTORY_TABLES = ('grammar_check', 'practice_session')
+
+def explain_dashboard_queries(user_id):
+    """
+    EXPLAIN QUERY PLAN for every statement the dashboard helpers run for a user
+
+    Returns:
+        List of dicts with the SQL, its plan lines, and 'indexed' - False when
+        a history table is read by a full scan instead of an index search
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        get_user_statistics(user_id)
+        get_recent_activities(user_id)
+        # A later feed page, which adds the keyset bounds
+        get_activity_feed(user_id, before=f"{datetime.utcnow().isoformat()},practice,0")
+        # The history aggregates behind the UserStats rollup (backfill and rebuild)
+        build_user_stats(user_id)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    connection = db.session.connection()
+    plans = []
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith('SELECT'):
+            continue
+        plan = [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+        # Plan lines read e.g. "SEARCH grammar_check USING INDEX ix_... (user_id=?)" or "SCAN grammar_check"
+        scans = [line for line in plan
+                 if line.startswith('SCAN') and 'USING' not in line
+                 and any(table in line.split() for table in HISTORY_TABLES)]
+        plans.append({'statement': statement, 'plan': plan, 'indexed': not scans})
+    return plans
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Show the dashboard query plans and fail if a history table is fully scanned"""
+    demo_user = User.query.filter_by(username='demo').first()
+    plans = explain_dashboard_queries(demo_user.id if demo_user else 0)
+
+    for entry in plans:
+        print(('OK   ' if entry['indexed'] else 'SCAN ') + ' '.join(entry['statement'].split()))
+        for line in entry['plan']:
+            print(f"       {line}")
+
+    unindexed = sum(not entry['indexed'] for entry in plans)
+    print(f"{len(plans) - unindexed} of {len(plans)} dashboard queries use an index")
+    if unindexed:
+        raise SystemExit(1)
+
+@app.cli.command('rescore-sessions')
+def rescore_sessions_command():
+    """Re-score every stored practice session with the current scoring weights"""
+    from speech_utils.pronunciation_analyzer import analyze_pronunciation_batch
+
+    sessions = db.session.query(
+        PracticeSession.id, PracticeSession.expected_text, PracticeSession.recognized_text
+    ).filter(PracticeSession.recognized_text.isnot(None)).all()
+
+    results = analyze_pronunciation_batch(
+        [(expected_text, recognized_text) for _, expected_text, recognized_text in sessions],
+        workers=app.config['PRONUNCIATION_BATCH_WORKERS']
+    )
+
+    db.session.bulk_update_mappings(PracticeSession, [
+        {
+            'id': session_id,
+            'pronunciation_score': result.get('pronunciation_score', 0),
+            'fluency_score': result.get('fluency_score', 0),
+            'completeness_score': result.get('completeness_score', 0),
+            'overall_score': result.get('overall_score', 0)
+        }
+        for (session_id, _, _), result in zip(sessions, results)
+    ])
+    db.session.commit()
+    print(f"Re-scored {len(sessions)} practice sessions")
+
+    # Score sums and best scores in the rollup are now stale
+    rebuild_user_stats()
+
+@app.cli.command('rebuild-user-stats')
+def rebuild_user_stats_command():
+    """Recompute every user's dashboard totals from their history (backfill or repair)"""
+    print(f"Rebuilt statistics for {rebuild_user_stats()} users")
+
 # Error handlers
 @app.errorhandler(404)
 def not_found_error(error):
@@ -771,4 +1601,11 @@ def internal_error(error):
 if __name__ == '__main__':
     # Create tables on startup
     create_tables()
+
+    # Warm the LanguageTool pool in the serving process, not the reloader parent.
+    # Under a WSGI server, call start_language_tool_pool() from the worker init hook.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        import threading
+        threading.Thread(target=start_language_tool_pool, daemon=True).start()
+
     app.run(debug=True, host='0.0.0.0', port=5000)
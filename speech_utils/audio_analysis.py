@@ -0,0 +1,244 @@
+"""
+Audio Analysis Module
+Vectorized frame energy, voice activity detection and speaking-rate timing from PCM audio
+"""
+
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from speech_utils.audio_io import PCMAudio
+
+# Analysis frame length in seconds
+FRAME_SECONDS = 0.02
+# Percentile of frame energies taken as the background noise level
+NOISE_PERCENTILE = 10
+# A frame is voiced when its energy exceeds the noise floor by this factor...
+# (the one speech threshold: the recognition gate and the VAD both use it)
+VOICE_RATIO = 3.0
+# ...and this absolute RMS (int16 scale), so digital silence does not make hiss "speech"
+MIN_VOICE_RMS = 100.0
+# Silences shorter than this are gaps inside speech, not pauses
+MIN_PAUSE_SECONDS = 0.25
+# Pauses at least this long are reported separately
+LONG_PAUSE_SECONDS = 1.0
+# Voiced stretches shorter than this are clicks or breaths
+MIN_SEGMENT_SECONDS = 0.1
+
+# Audio kept either side of the speech when trimming, so soft onsets and word endings survive
+TRIM_PADDING_SECONDS = 0.3
+
+# Speaking rate bands (words per minute)
+REFERENCE_WPM = 150
+SLOW_WPM = 90
+FAST_WPM = 180
+
+def pcm_to_array(pcm: PCMAudio) -> 'np.ndarray':
+    """Samples as float32 on the int16 scale, whatever the sample width"""
+    width = pcm.sample_width
+    data = memoryview(pcm.frame_data).cast('B')
+
+    if width == 1:
+        # 8-bit PCM is unsigned
+        return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    if width == 2:
+        return np.frombuffer(data, dtype='<i2').astype(np.float32)
+    if width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+        return samples.astype(np.float32) / 256.0
+    return np.frombuffer(data, dtype='<i4').astype(np.float32) / 65536.0
+
+def frame_rms(samples: 'np.ndarray', frame_length: int) -> 'np.ndarray':
+    """RMS energy of consecutive non-overlapping frames (a trailing partial frame is dropped)"""
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
+
+def noise_floor(energies: 'np.ndarray', percentile: float = NOISE_PERCENTILE) -> float:
+    """Energy of the quietest frames, used as the background noise level"""
+    if len(energies) == 0:
+        return 0.0
+    return float(np.percentile(energies, percentile))
+
+def speech_threshold(floor: float) -> float:
+    """Frame energy a voiced frame must exceed, given the clip's noise floor"""
+    return max(floor * VOICE_RATIO, MIN_VOICE_RMS)
+
+def _frame_energies(pcm: PCMAudio) -> 'np.ndarray':
+    frame_length = max(1, int(pcm.sample_rate * FRAME_SECONDS))
+    return frame_rms(pcm_to_array(pcm), frame_length)
+
+def estimate_energy_threshold(pcm: PCMAudio) -> float:
+    """
+    Speech threshold of the whole clip, as has_speech applies it
+
+    Stands in for sr.Recognizer.adjust_for_ambient_noise, which consumed the
+    first half second of the recording in a per-buffer Python loop. Nothing
+    is read from a stream here, so the full clip stays available.
+
+    Returns:
+        float: Threshold on the clip's own sample scale, as sr.Recognizer.energy_threshold expects
+    """
+    threshold = speech_threshold(noise_floor(_frame_energies(pcm)))
+    # pcm_to_array works on the int16 scale; sr compares against raw sample RMS
+    return threshold * 2.0 ** (8 * (pcm.sample_width - 2))
+
+def has_speech(pcm: PCMAudio) -> bool:
+    """Whether any frame is voiced, i.e. rises above speech_threshold"""
+    energies = _frame_energies(pcm)
+    if len(energies) == 0:
+        return False
+    return bool(energies.max() > speech_threshold(noise_floor(energies)))
+
+def _runs(mask: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """Start and end (exclusive) indices of the True runs in a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def detect_voice_activity(pcm: PCMAudio, frame_seconds: float = FRAME_SECONDS) -> Dict[str, Any]:
+    """
+    Energy-based voice activity detection
+
+    Returns:
+        Dict with voiced segments as (start, end) seconds, the noise floor and the threshold used
+    """
+    frame_length = max(1, int(pcm.sample_rate * frame_seconds))
+    seconds_per_frame = frame_length / pcm.sample_rate
+    energies = frame_rms(pcm_to_array(pcm), frame_length)
+    floor = noise_floor(energies)
+    threshold = speech_threshold(floor)
+
+    starts, ends = _runs(energies > threshold)
+
+    # Close gaps too short to be pauses, then drop stretches too short to be speech
+    if len(starts) > 1:
+        keep_gap = (starts[1:] - ends[:-1]) * seconds_per_frame >= MIN_PAUSE_SECONDS
+        starts = starts[np.concatenate(([True], keep_gap))]
+        ends = ends[np.concatenate((keep_gap, [True]))]
+    long_enough = (ends - starts) * seconds_per_frame >= MIN_SEGMENT_SECONDS
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    return {
+        'segments': [(round(float(start) * seconds_per_frame, 3), round(float(end) * seconds_per_frame, 3))
+                     for start, end in zip(starts, ends)],
+        'noise_floor': floor,
+        'threshold': threshold
+    }
+
+def measure_speech(pcm: PCMAudio) -> Dict[str, Any]:
+    """
+    Recording length and voiced segments, everything timing analysis needs from the audio
+
+    The result is JSON-serializable so it can be cached alongside a transcript.
+    """
+    return {
+        'duration': pcm.duration,
+        'voiced_segments': detect_voice_activity(pcm)['segments']
+    }
+
+def trim_silence(pcm: PCMAudio, segments: List[Tuple[float, float]] = None,
+                 padding: float = TRIM_PADDING_SECONDS) -> PCMAudio:
+    """
+    The recording without its leading and trailing silence
+
+    Args:
+        pcm: Decoded recording
+        segments: Voiced (start, end) seconds from detect_voice_activity; measured when omitted
+        padding: Seconds of audio kept before the first and after the last voiced segment
+
+    Returns:
+        PCMAudio: A view into the same samples, or pcm itself when there is nothing to trim
+    """
+    if segments is None:
+        segments = detect_voice_activity(pcm)['segments']
+    if not segments:
+        # No speech to keep; the recognizer's no-speech check deals with the clip
+        return pcm
+
+    rate, width = pcm.sample_rate, pcm.sample_width
+    start = max(0, int((segments[0][0] - padding) * rate))
+    end = min(pcm.frame_count, int((segments[-1][1] + padding) * rate))
+    if start == 0 and end == pcm.frame_count:
+        return pcm
+    return PCMAudio(memoryview(pcm.frame_data).cast('B')[start * width:end * width], rate, width)
+
+def analyze_audio_timing(pcm: PCMAudio, expected_words: int, recognized_words: int) -> Dict[str, Any]:
+    """
+    Timing analysis measured from the recording
+
+    Args:
+        pcm: Decoded recording
+        expected_words: Number of words in the expected text
+        recognized_words: Number of words recognized in the recording
+
+    Returns:
+        Dict with durations, pause statistics, words per minute and a pace rating
+    """
+    return analyze_speech_timing(measure_speech(pcm), expected_words, recognized_words)
+
+def analyze_speech_timing(measurements: Dict[str, Any], expected_words: int, recognized_words: int) -> Dict[str, Any]:
+    """
+    Timing analysis from measure_speech() output
+
+    Speaking rate is taken over the span from the first to the last voiced
+    segment, so silence before and after the reading does not count.
+    """
+    duration = measurements['duration']
+    segments = [tuple(segment) for segment in measurements['voiced_segments']]
+
+    if segments:
+        speaking_span = segments[-1][1] - segments[0][0]
+        speech_duration = sum(end - start for start, end in segments)
+    else:
+        speaking_span = speech_duration = 0.0
+
+    pauses = [next_start - end for (_, end), (next_start, _) in zip(segments, segments[1:])]
+    long_pauses = [pause for pause in pauses if pause >= LONG_PAUSE_SECONDS]
+
+    words_per_minute = recognized_words / speaking_span * 60 if speaking_span > 0 else 0.0
+    articulation_rate = recognized_words / speech_duration * 60 if speech_duration > 0 else 0.0
+    estimated_duration = expected_words / REFERENCE_WPM * 60
+
+    # Determine pace rating
+    if not segments:
+        pace_rating = 'no_speech'
+        pace_feedback = 'No speech was detected in the recording.'
+    elif words_per_minute > FAST_WPM:
+        pace_rating = 'too_fast'
+        pace_feedback = 'Try speaking more slowly for better clarity.'
+    elif words_per_minute < SLOW_WPM:
+        pace_rating = 'too_slow'
+        pace_feedback = 'You can speak a bit faster while maintaining clarity.'
+    else:
+        pace_rating = 'good'
+        pace_feedback = 'Your speaking pace is good!'
+
+    if long_pauses and pace_rating != 'no_speech':
+        pace_feedback += f" You paused for over {LONG_PAUSE_SECONDS:g}s {len(long_pauses)} time(s); try to keep the flow going."
+
+    return {
+        'source': 'audio',
+        'estimated_duration': round(estimated_duration, 1),
+        'actual_duration': round(speaking_span, 1),
+        'recording_duration': round(duration, 2),
+        'speech_duration': round(speech_duration, 2),
+        'silence_duration': round(max(0.0, duration - speech_duration), 2),
+        'words_per_minute': round(words_per_minute, 1),
+        'articulation_rate': round(articulation_rate, 1),
+        'pause_count': len(pauses),
+        'long_pause_count': len(long_pauses),
+        'average_pause': round(sum(pauses) / len(pauses), 2) if pauses else 0.0,
+        'longest_pause': round(max(pauses), 2) if pauses else 0.0,
+        'voiced_segments': segments,
+        'pace_rating': pace_rating,
+        'pace_feedback': pace_feedback,
+        'rate_ratio': round(speaking_span / estimated_duration, 2) if estimated_duration > 0 else 1.0
+    }
@@ -0,0 +1,316 @@
+"""
+Audio Ingestion Module
+Decodes uploaded audio straight from memory to a mono 16 kHz PCM buffer for speech recognition
+"""
+
+import audioop
+import struct
+import subprocess
+from typing import Optional, Union
+
+import speech_recognition as sr
+
+try:
+    from pydub import AudioSegment
+    FFMPEG_BINARY = AudioSegment.converter
+except ImportError:
+    FFMPEG_BINARY = 'ffmpeg'
+
+# Frames handed to the recognizer per read, same as sr.AudioFile
+CHUNK_FRAMES = 4096
+
+# Seconds allowed for an ffmpeg decode before it is abandoned
+DECODE_TIMEOUT = 60
+
+# Audio preprocessing configuration (updated through configure_audio)
+AUDIO_CONFIG = {
+    'sample_rate': 16000,
+    'max_bytes': 10 * 1024 * 1024,
+    'max_duration': 120.0,
+    'trim_silence': True
+}
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+class AudioDecodeError(Exception):
+    """Raised when uploaded audio cannot be decoded"""
+
+class AudioLimitError(AudioDecodeError):
+    """Raised when an upload exceeds the configured size or duration limit"""
+
+def configure_audio(**options):
+    """
+    Update the audio preprocessing configuration
+
+    Args:
+        sample_rate (int): Rate recordings are downsampled to before recognition (None keeps the source rate)
+        max_bytes (int): Largest accepted upload in bytes (None = no limit)
+        max_duration (float): Longest accepted recording in seconds (None = no limit)
+        trim_silence (bool): Trim leading and trailing silence before recognition
+    """
+    unknown = set(options) - set(AUDIO_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown audio options: {', '.join(sorted(unknown))}")
+    AUDIO_CONFIG.update(options)
+
+def check_upload_size(size: Optional[int]):
+    """
+    Reject an upload by its byte size, before it is read or decoded
+
+    Raises:
+        AudioLimitError: When size exceeds AUDIO_CONFIG['max_bytes']
+    """
+    max_bytes = AUDIO_CONFIG['max_bytes']
+    if max_bytes and size is not None and size > max_bytes:
+        raise AudioLimitError(f'Audio upload is too large (maximum {max_bytes / (1024 * 1024):g} MB)')
+
+def _check_duration(duration: float):
+    max_duration = AUDIO_CONFIG['max_duration']
+    if max_duration and duration > max_duration:
+        raise AudioLimitError(f'Recording is too long (maximum {max_duration:g} seconds)')
+
+class PCMAudio:
+    """
+    Mono little-endian PCM samples plus their format
+
+    frame_data may be a memoryview into the uploaded bytes, so WAV uploads
+    are used in place without copying the sample data.
+    """
+
+    __slots__ = ('frame_data', 'sample_rate', 'sample_width')
+
+    def __init__(self, frame_data: BytesLike, sample_rate: int, sample_width: int):
+        self.frame_data = frame_data
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frame_data) // self.sample_width
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate if self.sample_rate else 0.0
+
+    def __reduce__(self):
+        # memoryviews cannot be pickled; worker processes get a copy of the samples
+        return (PCMAudio, (bytes(self.frame_data), self.sample_rate, self.sample_width))
+
+    def source(self) -> 'PCMSource':
+        """An in-memory sr.AudioSource over the samples"""
+        return PCMSource(self)
+
+    def to_audio_data(self) -> sr.AudioData:
+        """The samples as an sr.AudioData, ready for a recognize_* call"""
+        return sr.AudioData(bytes(self.frame_data), self.sample_rate, self.sample_width)
+
+class _PCMStream:
+    """Reads frames from a PCM buffer as zero-copy memoryview slices"""
+
+    def __init__(self, pcm: PCMAudio):
+        self._view = memoryview(pcm.frame_data).cast('B')
+        self._frame_width = pcm.sample_width
+        self._position = 0
+
+    def read(self, size: int = -1) -> memoryview:
+        start = self._position
+        end = len(self._view) if size == -1 else min(len(self._view), start + size * self._frame_width)
+        self._position = end
+        return self._view[start:end]
+
+    def close(self):
+        self._view.release()
+
+class PCMSource(sr.AudioSource):
+    """sr.AudioSource over an in-memory PCMAudio, usable wherever sr.AudioFile is"""
+
+    def __init__(self, pcm: PCMAudio):
+        self.pcm = pcm
+        self.SAMPLE_RATE = pcm.sample_rate
+        self.SAMPLE_WIDTH = pcm.sample_width
+        self.CHUNK = CHUNK_FRAMES
+        self.FRAME_COUNT = pcm.frame_count
+        self.DURATION = pcm.duration
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = _PCMStream(self.pcm)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.close()
+        self.stream = None
+
+def sniff_format(data: BytesLike) -> Optional[str]:
+    """Guess the container format from the first bytes of the upload"""
+    header = bytes(data[:12])
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'\x1aE\xdf\xa3':
+        return 'webm'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:4] == b'FORM' and header[8:12] in (b'AIFF', b'AIFC'):
+        return 'aiff'
+    if header[:3] == b'ID3' or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    if header[4:8] == b'ftyp':
+        return 'mp4'
+    return None
+
+def _parse_wav(view: memoryview) -> PCMAudio:
+    """
+    Read a PCM WAV held in memory without copying its sample data
+
+    Streamed WAVs (e.g. ffmpeg writing to a pipe) carry placeholder chunk
+    sizes, so a data chunk that claims more than is present runs to the end.
+    """
+    if len(view) < 12 or bytes(view[:4]) != b'RIFF' or bytes(view[8:12]) != b'WAVE':
+        raise AudioDecodeError('Not a RIFF/WAVE file')
+
+    fmt = None
+    position = 12
+    while position + 8 <= len(view):
+        chunk_id = bytes(view[position:position + 4])
+        chunk_size = struct.unpack_from('<I', view, position + 4)[0]
+        body_start = position + 8
+
+        if chunk_id == b'fmt ':
+            if chunk_size < 16:
+                raise AudioDecodeError('Truncated WAV fmt chunk')
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', view, body_start)
+            if format_tag == 0xFFFE and chunk_size >= 26:
+                # WAVE_FORMAT_EXTENSIBLE keeps the real format in the sub-format GUID
+                format_tag = struct.unpack_from('<H', view, body_start + 24)[0]
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise AudioDecodeError('WAV data chunk before fmt chunk')
+            body_end = body_start + chunk_size
+            if chunk_size in (0, 0xFFFFFFFF) or body_end > len(view):
+                body_end = len(view)
+            return _wav_to_pcm(view[body_start:body_end], *fmt)
+
+        # Chunks are padded to an even size
+        position = body_start + chunk_size + (chunk_size & 1)
+
+    raise AudioDecodeError('WAV file has no data chunk')
+
+def _wav_to_pcm(samples: memoryview, format_tag: int, channels: int, sample_rate: int, bits: int) -> PCMAudio:
+    if format_tag != 1:
+        raise AudioDecodeError(f'Unsupported WAV encoding (format tag {format_tag})')
+
+    sample_width = bits // 8
+    if not 1 <= sample_width <= 4 or channels < 1 or not sample_rate:
+        raise AudioDecodeError('Unsupported WAV sample format')
+
+    # Drop a trailing partial frame
+    frame_width = sample_width * channels
+    usable = len(samples) - len(samples) % frame_width
+    # Checked from the header sizes, before any samples are converted
+    _check_duration(usable / frame_width / sample_rate)
+    if usable != len(samples):
+        samples = samples[:usable]
+
+    if channels == 1:
+        return PCMAudio(samples, sample_rate, sample_width)
+
+    # Downmix the same way sr.AudioFile does
+    frame_data = samples
+    if channels > 2:
+        frame_data = b''.join(
+            bytes(frame_data[offset:offset + sample_width * 2])
+            for offset in range(0, len(frame_data), frame_width)
+        )
+    return PCMAudio(audioop.tomono(frame_data, sample_width, 1, 1), sample_rate, sample_width)
+
+def resample(pcm: PCMAudio, sample_rate: Optional[int]) -> PCMAudio:
+    """
+    Downsample to sample_rate as 16-bit PCM, the format recognizers work in
+
+    Audio already at or below the rate keeps its rate (upsampling adds no
+    information) and is only converted to 16-bit when needed.
+    """
+    frame_data, width, rate = pcm.frame_data, pcm.sample_width, pcm.sample_rate
+    if width == 2 and (not sample_rate or rate <= sample_rate):
+        return pcm
+
+    if width != 2:
+        if width == 1:
+            # 8-bit WAV is unsigned; audioop works on signed samples
+            frame_data = audioop.bias(frame_data, 1, -128)
+        frame_data = audioop.lin2lin(frame_data, width, 2)
+    if sample_rate and rate > sample_rate:
+        frame_data = audioop.ratecv(frame_data, 2, 1, rate, sample_rate, None)[0]
+        rate = sample_rate
+    return PCMAudio(frame_data, rate, 2)
+
+def _decode_with_ffmpeg(data: BytesLike, fmt: Optional[str]) -> PCMAudio:
+    """Decode a compressed upload through one ffmpeg pipe to 16-bit mono WAV at the target rate"""
+    command = [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error']
+    if fmt:
+        command += ['-f', fmt]
+    command += ['-i', 'pipe:0', '-vn', '-ac', '1']
+    if AUDIO_CONFIG['sample_rate']:
+        # ffmpeg resamples during the decode, so full-rate samples never reach Python
+        command += ['-ar', str(AUDIO_CONFIG['sample_rate'])]
+    if AUDIO_CONFIG['max_duration']:
+        # Stop just past the limit so an overlong upload is not decoded in full
+        command += ['-t', str(AUDIO_CONFIG['max_duration'] + 1)]
+    command += ['-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1']
+
+    try:
+        completed = subprocess.run(command, input=data, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, timeout=DECODE_TIMEOUT)
+    except FileNotFoundError:
+        raise AudioDecodeError('ffmpeg is not installed')
+    except subprocess.TimeoutExpired:
+        raise AudioDecodeError('Audio decoding timed out')
+
+    if completed.returncode != 0 or not completed.stdout:
+        raise AudioDecodeError(f"ffmpeg could not decode audio: {completed.stderr.decode(errors='ignore').strip()}")
+
+    return _parse_wav(memoryview(completed.stdout))
+
+def decode_audio(data: BytesLike, fmt: Optional[str] = None) -> PCMAudio:
+    """
+    Decode an uploaded clip held in memory to mono 16-bit PCM at the configured rate
+
+    Size and duration limits are checked as early as possible: the size
+    before decoding, a WAV's duration from its header before any samples
+    are converted, and ffmpeg stops decoding shortly past the limit.
+
+    Args:
+        data: Raw upload bytes (bytes, bytearray or memoryview)
+        fmt: Container format if known ('wav', 'webm', ...); sniffed otherwise
+
+    Returns:
+        PCMAudio: Mono samples; 16-bit WAV input at or below the rate is referenced, not copied
+
+    Raises:
+        AudioLimitError: When the upload exceeds AUDIO_CONFIG's size or duration limit
+        AudioDecodeError: When the audio is empty or cannot be decoded
+    """
+    if hasattr(data, 'read'):
+        data = data.read()
+    if not data:
+        raise AudioDecodeError('No audio data')
+    check_upload_size(len(data))
+
+    pcm = None
+    sniffed = sniff_format(data)
+    if sniffed == 'wav':
+        try:
+            pcm = _parse_wav(memoryview(data))
+        except AudioLimitError:
+            raise
+        except AudioDecodeError as e:
+            # Float or compressed WAV encodings go through ffmpeg
+            print(f"In-memory WAV decode failed ({e}), trying ffmpeg")
+
+    if pcm is None:
+        pcm = _decode_with_ffmpeg(data, sniffed or fmt)
+
+    return resample(pcm, AUDIO_CONFIG['sample_rate'])
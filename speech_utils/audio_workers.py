@@ -0,0 +1,189 @@
+"""
+Audio Worker Pool Module
+Bounded executor for uploaded-audio jobs: decoding and DSP in worker processes, recognizer I/O on threads
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from speech_utils.audio_io import AUDIO_CONFIG
+from speech_utils.job_queue import Job, JobQueue
+from speech_utils.pronunciation_analyzer import prepare_upload, recognize_upload
+
+# How often waiting threads check for cancellation
+POLL_SECONDS = 0.25
+
+class AudioJobTimeout(Exception):
+    """Raised when an audio job does not finish within the pool's timeout"""
+
+class AudioJobCancelled(Exception):
+    """Raised when an audio job is abandoned because its client went away"""
+
+class AudioWorkerPool:
+    """
+    Runs upload transcriptions off the request threads
+
+    Other audio work, such as recognizing a streamed recording, goes
+    through run. Each upload is one JobQueue job, so at most max_workers are processed at
+    once, at most max_queued wait, and one user can have at most
+    max_per_user in flight. The job's thread waits on the recognizer
+    backends (network I/O); decoding, resampling and voice activity
+    detection run in a process pool so they do not compete with request
+    threads for the GIL. With processes=0 that work runs on the job thread.
+
+    A job that outlives timeout, or whose client disconnects, is cancelled:
+    it is dropped if still queued, and otherwise stops at the next stage
+    boundary (a recognizer call already under way ends at its own timeout).
+    """
+
+    def __init__(self, processes: int = 2, max_workers: int = 4, max_queued: int = 8,
+                 max_per_user: Optional[int] = 2, timeout: Optional[float] = 45):
+        self.processes = max(0, int(processes))
+        self.timeout = timeout
+        self.jobs = JobQueue(max_workers, max_queued, result_ttl=60,
+                             name='audio-job', max_per_owner=max_per_user)
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+        self.timeouts = 0
+        self.cancellations = 0
+        self.pool_failures = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned, not forked: a worker forked mid-request would inherit the
+                # open client sockets and keep those connections from closing
+                self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def _reset_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self.pool_failures += 1
+
+    def prepare(self, audio_data: bytes, audio_format: Optional[str], cancel: threading.Event) -> Dict[str, Any]:
+        """
+        Run prepare_upload in a worker process and wait for it
+
+        Raises:
+            AudioJobCancelled: When the job is cancelled before or during the decode
+        """
+        if cancel.is_set():
+            raise AudioJobCancelled('Audio job cancelled before decoding')
+
+        prepared = None
+        if self.processes:
+            try:
+                future = self._get_pool().submit(prepare_upload, audio_data, audio_format, dict(AUDIO_CONFIG))
+                while prepared is None:
+                    try:
+                        prepared = future.result(timeout=POLL_SECONDS)
+                    except FutureTimeoutError:
+                        if cancel.is_set():
+                            future.cancel()
+                            raise AudioJobCancelled('Audio job cancelled while decoding')
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for memory); rebuild the pool for the next job
+                print(f"Audio process pool failed, decoding in-thread: {e}")
+                self._reset_pool()
+
+        if prepared is None:
+            prepared = prepare_upload(audio_data, audio_format)
+
+        # Do not start a recognizer call nobody will wait for
+        if cancel.is_set():
+            raise AudioJobCancelled('Audio job cancelled before recognition')
+        return prepared
+
+    def _transcribe(self, audio_data: bytes, audio_format: Optional[str],
+                    expected_text: Optional[str], cancel: threading.Event) -> Dict[str, Any]:
+        return recognize_upload(audio_data, audio_format, expected_text,
+                                prepare=lambda data, fmt: self.prepare(data, fmt, cancel))
+
+    def transcribe_upload(self, audio_data: bytes, audio_format: str = None, expected_text: str = None,
+                          owner: Any = None, disconnected: Callable[[], bool] = None) -> Dict[str, Any]:
+        """
+        Transcribe an upload on the pool and wait for the result
+
+        Args:
+            audio_data: Raw upload bytes
+            audio_format: Container format hint such as 'webm'
+            expected_text: Text the learner was asked to read
+            owner: Whose upload this is, for the per-user limit
+            disconnected: Returns True once the client has gone away
+
+        Returns:
+            recognize_upload's result
+
+        Raises:
+            OwnerLimitError: When the owner already has max_per_user uploads in flight
+            QueueFullError: When every worker and queue slot is taken
+            AudioJobTimeout: When the job does not finish within timeout
+            AudioJobCancelled: When the client disconnected first
+            AudioLimitError: When the upload exceeds the audio size or duration limit
+        """
+        return self.run(self._transcribe, bytes(audio_data), audio_format, expected_text,
+                        owner=owner, disconnected=disconnected)
+
+    def run(self, func: Callable, *args, owner: Any = None, disconnected: Callable[[], bool] = None) -> Any:
+        """
+        Run func(*args, cancel=event) as a pool job and wait for its result
+
+        func runs on a job thread under the same limits as uploads; cancel is
+        set when the job is abandoned, so it can skip work nobody will wait for.
+
+        Raises:
+            OwnerLimitError: When the owner already has max_per_user jobs in flight
+            QueueFullError: When every worker and queue slot is taken
+            AudioJobTimeout: When the job does not finish within timeout
+            AudioJobCancelled: When the client disconnected first
+            Exception: Whatever func raised
+        """
+        cancel = threading.Event()
+        job = self.jobs.submit(func, *args, cancel=cancel, owner=owner)
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+
+        while not job.wait(POLL_SECONDS):
+            if disconnected is not None and disconnected():
+                self._abandon(job, cancel)
+                self.cancellations += 1
+                raise AudioJobCancelled('Client disconnected')
+            if deadline is not None and time.monotonic() > deadline:
+                self._abandon(job, cancel)
+                self.timeouts += 1
+                raise AudioJobTimeout(f'Audio processing took longer than {self.timeout:g} seconds')
+
+        if job.status == Job.FAILED:
+            raise job.exception
+        return job.result
+
+    def _abandon(self, job: Job, cancel: threading.Event):
+        cancel.set()
+        self.jobs.cancel(job.id)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.jobs.stats()
+        stats.update({
+            'processes': self.processes,
+            'timeout': self.timeout,
+            'timeouts': self.timeouts,
+            'cancellations': self.cancellations,
+            'pool_failures': self.pool_failures
+        })
+        return stats
+
+    def shutdown(self, wait: bool = False):
+        self.jobs.shutdown(wait=wait)
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,201 @@
+"""
+Dashboard Cache Module
+Per-user cache of dashboard data with pluggable backends and invalidation on write
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from speech_utils.result_cache import ResultCache
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+class MemoryBackend:
+    """In-process LRU with TTL (entries are per worker process)"""
+
+    name = 'memory'
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 300, **options):
+        self._cache = ResultCache(max_size, ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any):
+        self._cache.set(key, value)
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        return {'size': stats['size'], 'max_size': stats['max_size'], 'evictions': stats['evictions']}
+
+class RedisBackend:
+    """
+    Redis or any server speaking its protocol (Valkey, KeyDB, a local stand-in)
+
+    Shared by every worker process, so a write in one worker invalidates the
+    entry for all of them. client may be any object with Redis's get, setex,
+    delete and scan_iter methods; otherwise one is created from redis_url.
+    """
+
+    name = 'redis'
+
+    def __init__(self, ttl: Optional[float] = 300, redis_url: str = 'redis://localhost:6379/0',
+                 client: Any = None, prefix: str = 'dashboard:', **options):
+        if client is None:
+            if not HAS_REDIS:
+                raise RuntimeError('redis is not installed')
+            client = redis.Redis.from_url(redis_url, socket_timeout=1)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any):
+        if self.ttl:
+            self.client.setex(self.prefix + key, max(1, int(self.ttl)), json.dumps(value))
+        else:
+            self.client.set(self.prefix + key, json.dumps(value))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'prefix': self.prefix}
+
+BACKENDS = {backend.name: backend for backend in (MemoryBackend, RedisBackend)}
+
+class DashboardCache:
+    """
+    Dashboard data by user id, dropped whenever that user's history changes
+
+    Callers invalidate a user after committing a write. A value computed
+    while an invalidation happened is not stored, so a read racing a write
+    in the same process cannot cache the data from before the write. A
+    backend error counts as a miss, so the dashboard still renders when
+    the cache server is down.
+    """
+
+    def __init__(self, backend: str = 'memory', max_size: int = 1024, ttl: Optional[float] = 300,
+                 redis_url: str = 'redis://localhost:6379/0', client: Any = None):
+        self.enabled = backend != 'off'
+        self.backend = None
+        if self.enabled:
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown dashboard cache backend: {backend} "
+                                 f"(expected off or any of {', '.join(BACKENDS)})")
+            try:
+                self.backend = BACKENDS[backend](max_size=max_size, ttl=ttl, redis_url=redis_url, client=client)
+            except Exception as e:
+                print(f"Dashboard cache backend {backend} unavailable, using memory: {e}")
+                self.backend = MemoryBackend(max_size=max_size, ttl=ttl)
+
+        # Bumped by invalidate (per user) and clear (all users) to spot values computed across a write
+        self._generations: Dict[Any, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def get_or_compute(self, user_id: Any, compute: Callable[[], Any]) -> Any:
+        """
+        The cached dashboard data for a user, computed and stored on a miss
+
+        Args:
+            user_id: Whose dashboard
+            compute: Builds the data; the result must be JSON-serializable
+        """
+        if not self.enabled:
+            return compute()
+
+        key = str(user_id)
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"Dashboard cache read error: {e}")
+            self.errors += 1
+            value = None
+
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = (self._epoch, self._generations.get(user_id, 0))
+
+        value = compute()
+
+        with self._lock:
+            stale = (self._epoch, self._generations.get(user_id, 0)) != generation
+        if not stale:
+            try:
+                self.backend.set(key, value)
+            except Exception as e:
+                print(f"Dashboard cache write error: {e}")
+                self.errors += 1
+        return value
+
+    def invalidate(self, user_id: Any):
+        """Drop a user's cached dashboard; call after the write is committed"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.invalidations += 1
+        try:
+            self.backend.delete(str(user_id))
+        except Exception as e:
+            print(f"Dashboard cache delete error: {e}")
+            self.errors += 1
+
+    def clear(self):
+        """Drop every cached dashboard"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._generations.clear()
+            self._epoch += 1
+        try:
+            self.backend.clear()
+        except Exception as e:
+            print(f"Dashboard cache clear error: {e}")
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and counters for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'backend': self.backend.name if self.enabled else 'off',
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'errors': self.errors,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+        if self.enabled:
+            stats.update(self.backend.stats())
+        return stats
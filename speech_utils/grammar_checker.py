@@ -5,50 +5,204 @@ Uses language_tool_python and spaCy for comprehensive text analysis
 
 import re
 import html
+import threading
+from bisect import bisect_right
 from typing import Dict, List, Any, Tuple
 
+from speech_utils.language_tool_pool import LanguageToolPool
+from speech_utils.result_cache import ResultCache, make_cache_key
+from speech_utils.rule_engine import RuleEngine
+
+# Bump when the shape or content of results changes so stale cache entries are ignored
+CHECKER_VERSION = 3
+
+# spaCy stage modes: full parser pipeline, cheap sentence splitting only, or disabled
+SPACY_MODES = ('full', 'sentences', 'off')
+
+# Checker configuration (see configure_grammar_checker)
+GRAMMAR_CONFIG = {
+    'language': 'en-US',
+    'disabled_rules': [],
+    'spacy_mode': 'full',
+    'spacy_model': 'en_core_web_sm',
+    'spacy_batch_size': 64,
+    'incremental': True,
+    'cache_size': 1024,
+    'cache_ttl': 3600,
+    'cache_path': None,
+    'pool_size': 1,
+    'pool_health_interval': 30.0
+}
+
 # Global variables for lazy loading
 _language_tool = None
-_nlp = None
+_language_tool_lock = threading.Lock()
+_nlp_pipelines = {}
+_result_cache = ResultCache(GRAMMAR_CONFIG['cache_size'], GRAMMAR_CONFIG['cache_ttl'])
+
+def configure_grammar_checker(**options):
+    """
+    Update the checker configuration and rebuild the result cache
+
+    Args:
+        language (str): LanguageTool language code
+        disabled_rules (list): LanguageTool rule ids to switch off
+        spacy_mode (str): Default spaCy stage, one of SPACY_MODES
+        spacy_model (str): spaCy model used by the 'full' stage
+        spacy_batch_size (int): Number of sentences spaCy processes per batch
+        incremental (bool): Check and cache text sentence by sentence
+        cache_size (int): Maximum number of in-memory cached results (0 disables)
+        cache_ttl (float): Seconds before a cached result expires (None = never)
+        cache_path (str): Optional SQLite file so cached results survive restarts
+        pool_size (int): Number of LanguageTool server processes to keep warm
+        pool_health_interval (float): Seconds between pool health checks (0 disables)
+    """
+    global _language_tool, _result_cache
+
+    unknown = set(options) - set(GRAMMAR_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown grammar checker options: {', '.join(sorted(unknown))}")
+
+    if 'spacy_mode' in options:
+        resolve_spacy_mode(options['spacy_mode'])
+    if options.get('spacy_model', GRAMMAR_CONFIG['spacy_model']) != GRAMMAR_CONFIG['spacy_model']:
+        _nlp_pipelines.clear()
+
+    pool_options = ('language', 'disabled_rules', 'pool_size', 'pool_health_interval')
+    if any(name in options and options[name] != GRAMMAR_CONFIG[name] for name in pool_options):
+        # Force the LanguageTool pool to be rebuilt with the new settings
+        with _language_tool_lock:
+            if _language_tool is not None:
+                _language_tool.close()
+            _language_tool = None
+
+    GRAMMAR_CONFIG.update(options)
+    GRAMMAR_CONFIG['disabled_rules'] = list(GRAMMAR_CONFIG['disabled_rules'] or [])
+    _result_cache = ResultCache(
+        GRAMMAR_CONFIG['cache_size'],
+        GRAMMAR_CONFIG['cache_ttl'],
+        GRAMMAR_CONFIG['cache_path'],
+        table='grammar_cache'
+    )
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the grammar result cache"""
+    return _result_cache.stats()
+
+def grammar_cache_key(kind: str, text: str, spacy_mode: str = None) -> str:
+    """
+    Cache key for a checked text under the current checker configuration
+
+    spacy_mode is only given for results that include the spaCy stage.
+    """
+    return make_cache_key(
+        kind,
+        CHECKER_VERSION,
+        GRAMMAR_CONFIG['language'],
+        sorted(GRAMMAR_CONFIG['disabled_rules']),
+        spacy_mode and (spacy_mode, GRAMMAR_CONFIG['spacy_model']),
+        text
+    )
+
+def _create_language_tool():
+    """Start one LanguageTool server configured with the current language and rule set"""
+    import language_tool_python
+    tool = language_tool_python.LanguageTool(GRAMMAR_CONFIG['language'])
+    if GRAMMAR_CONFIG['disabled_rules']:
+        tool.disabled_rules.update(GRAMMAR_CONFIG['disabled_rules'])
+    return tool
 
 def get_language_tool():
-    """Lazy load LanguageTool to avoid startup delays"""
+    """
+    Lazy load the LanguageTool pool to avoid startup delays
+
+    Returns:
+        LanguageToolPool (used like a single LanguageTool instance), or None if unavailable
+    """
     global _language_tool
     if _language_tool is None:
-        try:
-            import language_tool_python
-            _language_tool = language_tool_python.LanguageTool('en-US')
-            print("LanguageTool initialized successfully")
-        except Exception as e:
-            print(f"Error initializing LanguageTool: {e}")
-            _language_tool = None
+        with _language_tool_lock:
+            if _language_tool is None:
+                try:
+                    import language_tool_python  # noqa: F401 - fail fast when not installed
+                    pool = LanguageToolPool(
+                        _create_language_tool,
+                        size=GRAMMAR_CONFIG['pool_size'],
+                        health_check_interval=GRAMMAR_CONFIG['pool_health_interval']
+                    ).start()
+                    if pool.running == 0:
+                        pool.close()
+                        raise RuntimeError('no LanguageTool instance could be started')
+                    _language_tool = pool
+                    print("LanguageTool initialized successfully")
+                except Exception as e:
+                    print(f"Error initializing LanguageTool: {e}")
+                    _language_tool = None
     return _language_tool
 
-def get_nlp():
-    """Lazy load spaCy model to avoid startup delays"""
-    global _nlp
-    if _nlp is None:
+def start_language_tool_pool() -> bool:
+    """Start and warm the LanguageTool pool ahead of the first request"""
+    return get_language_tool() is not None
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Status of the LanguageTool pool"""
+    tool = _language_tool
+    if tool is None or not hasattr(tool, 'stats'):
+        return {'size': GRAMMAR_CONFIG['pool_size'], 'running': 0}
+    return tool.stats()
+
+def resolve_spacy_mode(spacy_mode: str = None) -> str:
+    """Validate a spaCy stage mode, falling back to the configured default"""
+    spacy_mode = spacy_mode or GRAMMAR_CONFIG['spacy_mode']
+    if spacy_mode not in SPACY_MODES:
+        raise ValueError(f"Unknown spaCy mode '{spacy_mode}' (expected one of {', '.join(SPACY_MODES)})")
+    return spacy_mode
+
+def get_nlp(spacy_mode: str = None):
+    """
+    Lazy load the spaCy pipeline for a stage mode to avoid startup delays
+
+    'full' loads the configured model with only the parser (and its tok2vec);
+    NER, lemmatizer and tagger are excluded. 'sentences' needs no model: a
+    blank English tokenizer plus the rule-based sentencizer.
+
+    Returns:
+        spaCy Language object, or None when the mode is 'off' or spaCy is unavailable
+    """
+    spacy_mode = resolve_spacy_mode(spacy_mode)
+    if spacy_mode == 'off':
+        return None
+
+    if spacy_mode not in _nlp_pipelines:
+        nlp = None
+        model = GRAMMAR_CONFIG['spacy_model']
         try:
             import spacy
-            _nlp = spacy.load('en_core_web_sm')
-            print("spaCy model loaded successfully")
+            if spacy_mode == 'full':
+                nlp = spacy.load(model, exclude=['ner', 'lemmatizer', 'tagger', 'attribute_ruler'])
+            else:
+                nlp = spacy.blank('en')
+                nlp.add_pipe('sentencizer')
+            print(f"spaCy '{spacy_mode}' pipeline loaded successfully: {nlp.pipe_names}")
         except OSError:
-            print("spaCy model 'en_core_web_sm' not found. Using basic analysis instead.")
-            _nlp = None
+            print(f"spaCy model '{model}' not found. Using basic analysis instead.")
         except ImportError:
             print("spaCy not installed. Using basic analysis instead.")
-            _nlp = None
         except Exception as e:
             print(f"Error loading spaCy model: {e}")
-            _nlp = None
-    return _nlp
+        # Failures are remembered too, so they are not retried on every request
+        _nlp_pipelines[spacy_mode] = nlp
+
+    return _nlp_pipelines[spacy_mode]
 
-def check_grammar(text: str) -> Dict[str, Any]:
+def check_grammar(text: str, spacy_mode: str = None) -> Dict[str, Any]:
     """
     Comprehensive grammar and spell checking
     
     Args:
         text (str): Text to check
+        spacy_mode (str): spaCy stage for this call ('full', 'sentences' or 'off');
+            defaults to the configured mode
         
     Returns:
         Dict containing errors, corrected text, and statistics
@@ -62,39 +216,58 @@ def check_grammar(text: str) -> Dict[str, Any]:
             'error_count': 0
         }
     
+    spacy_mode = resolve_spacy_mode(spacy_mode)
+
     # Clean the text
     cleaned_text = clean_text(text)
+
+    cache_key = grammar_cache_key('basic', cleaned_text, spacy_mode)
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result, used_language_tool = _check_grammar_uncached(cleaned_text, spacy_mode)
+
+    # Fallback results are not cached so they are replaced once LanguageTool is back
+    if used_language_tool:
+        _result_cache.set(cache_key, result)
+
+    return result
+
+def _check_grammar_uncached(cleaned_text: str, spacy_mode: str) -> Tuple[Dict[str, Any], bool]:
+    """Run the basic check pipeline; returns (result, used_language_tool)"""
+    # Single LanguageTool pass: errors and corrections come from the same matches
+    matches = run_language_tool_check(cleaned_text)
     
+    # Additional spaCy analysis
+    spacy_errors = []
+    nlp = get_nlp(spacy_mode)
+    if nlp:
+        spacy_errors = analyze_with_spacy(cleaned_text, nlp)
+    
+    return build_basic_result(cleaned_text, matches, spacy_errors), matches is not None
+
+def build_basic_result(cleaned_text: str, matches, spacy_errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Assemble a check_grammar result
+
+    Args:
+        cleaned_text: Text that was checked
+        matches: LanguageTool matches, or None to use the regex fallback
+        spacy_errors: Errors found by the spaCy stage
+    """
     # Get word count for accuracy calculation
     word_count = len(cleaned_text.split())
-    
-    # Try LanguageTool first
-    errors = []
-    corrected_text = cleaned_text
-    
-    language_tool = get_language_tool()
-    if language_tool:
-        try:
-            # Check with LanguageTool
-            matches = language_tool.check(cleaned_text)
-            errors = process_language_tool_errors(matches, cleaned_text)
-            corrected_text = language_tool.correct(cleaned_text)
-        except Exception as e:
-            print(f"LanguageTool error: {e}")
-            # Fallback to basic checking
-            errors = perform_basic_grammar_check(cleaned_text)
+
+    if matches is not None:
+        errors = process_language_tool_errors(matches, cleaned_text)
+        corrected_text, _ = apply_corrections(cleaned_text, matches)
     else:
         # Fallback to basic checking
         errors = perform_basic_grammar_check(cleaned_text)
+        corrected_text = cleaned_text
     
-    # Additional spaCy analysis
-    nlp = get_nlp()
-    if nlp:
-        try:
-            spacy_errors = analyze_with_spacy(cleaned_text, nlp)
-            errors.extend(spacy_errors)
-        except Exception as e:
-            print(f"spaCy analysis error: {e}")
+    errors.extend(spacy_errors)
     
     # Remove duplicate errors
     errors = remove_duplicate_errors(errors)
@@ -112,6 +285,191 @@ def check_grammar(text: str) -> Dict[str, Any]:
         'suggestions_count': sum(len(error.get('suggestions', [])) for error in errors)
     }
 
+def run_language_tool_check(text: str):
+    """
+    Run LanguageTool over the text exactly once
+
+    With incremental checking enabled, only sentences without a cached
+    result are sent to LanguageTool (in a single call) and their matches
+    are re-based onto document offsets.
+
+    Returns:
+        List of LanguageTool matches, or None when LanguageTool is unavailable or fails
+    """
+    tool = get_language_tool()
+    if not tool:
+        return None
+
+    try:
+        return check_documents(tool, [text])[0]
+    except Exception as e:
+        print(f"LanguageTool error: {e}")
+        return None
+
+def run_language_tool_batch(texts: List[str]):
+    """
+    Run LanguageTool over many texts, grouping them into as few calls as possible
+
+    Returns:
+        Per-text lists of matches, or None when LanguageTool is unavailable or fails
+    """
+    tool = get_language_tool()
+    if not tool:
+        return None
+
+    try:
+        return check_documents(tool, texts)
+    except Exception as e:
+        print(f"LanguageTool batch error: {e}")
+        return None
+
+# A sentence runs up to terminal punctuation followed by whitespace, a blank line or the end
+_SENTENCE_RE = re.compile(r'\S.*?(?:[.!?]+(?=\s)|(?=\n\s*\n)|$)', re.S)
+
+# Separator used when several segments are checked in one LanguageTool call
+_SEGMENT_SEPARATOR = '\n\n'
+
+# Upper bound on the characters sent to LanguageTool in one call
+_MAX_CHECK_CHARS = 50000
+
+class SentenceMatch:
+    """
+    Serializable stand-in for a LanguageTool match, used for cached sentence results
+
+    LanguageTool's context is not kept: it is a window over the combined
+    request, which may hold other documents' sentences. Callers rebuild it
+    from the document being rendered.
+    """
+
+    __slots__ = ('offset', 'errorLength', 'message', 'category', 'ruleId', 'replacements')
+
+    def __init__(self, offset: int, errorLength: int, message: str, category: str,
+                 ruleId: str, replacements: List[str]):
+        self.offset = offset
+        self.errorLength = errorLength
+        self.message = message
+        self.category = category
+        self.ruleId = ruleId
+        self.replacements = replacements
+
+    @classmethod
+    def from_match(cls, match, offset: int) -> 'SentenceMatch':
+        return cls(offset, match.errorLength, match.message, match.category,
+                   match.ruleId, list(match.replacements))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SentenceMatch':
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def shifted(self, delta: int) -> 'SentenceMatch':
+        """Copy of the match moved by delta characters"""
+        data = self.to_dict()
+        data['offset'] += delta
+        return SentenceMatch(**data)
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """Split text into (start_offset, sentence) pairs"""
+    return [(m.start(), m.group().rstrip()) for m in _SENTENCE_RE.finditer(text)]
+
+def check_segments(tool, segments: List[str]) -> List[List[SentenceMatch]]:
+    """
+    Check several independent text segments with as few LanguageTool calls as possible
+
+    Segments are joined with blank lines into requests of at most
+    _MAX_CHECK_CHARS characters.
+
+    Args:
+        tool: LanguageTool instance
+        segments: Texts to check
+
+    Returns:
+        Per-segment lists of matches with offsets relative to each segment
+    """
+    results = [[] for _ in segments]
+
+    chunk = []
+    chunk_chars = 0
+    for index, segment in enumerate(segments):
+        if chunk and chunk_chars + len(segment) > _MAX_CHECK_CHARS:
+            _check_segment_chunk(tool, segments, chunk, results)
+            chunk, chunk_chars = [], 0
+        chunk.append(index)
+        chunk_chars += len(segment) + len(_SEGMENT_SEPARATOR)
+
+    if chunk:
+        _check_segment_chunk(tool, segments, chunk, results)
+
+    return results
+
+def _check_segment_chunk(tool, segments: List[str], chunk: List[int], results: List[List[SentenceMatch]]):
+    """Check the segments at the given indexes in one call and distribute the matches"""
+    starts = []
+    position = 0
+    for index in chunk:
+        starts.append(position)
+        position += len(segments[index]) + len(_SEGMENT_SEPARATOR)
+
+    combined = _SEGMENT_SEPARATOR.join(segments[index] for index in chunk)
+    for match in tool.check(combined):
+        position = bisect_right(starts, match.offset) - 1
+        index = chunk[position]
+        local_offset = match.offset - starts[position]
+        # Drop anything that straddles the separator between segments
+        if local_offset + match.errorLength <= len(segments[index]):
+            results[index].append(SentenceMatch.from_match(match, local_offset))
+
+def check_documents(tool, texts: List[str]) -> List[List[SentenceMatch]]:
+    """
+    Check documents with LanguageTool, sharing calls across all of them
+
+    With incremental checking enabled, documents are split into sentences;
+    cached sentences are reused and every remaining distinct sentence is
+    checked once, whichever document it came from.
+
+    Returns:
+        Per-document lists of matches with document offsets, sorted by position
+    """
+    incremental = GRAMMAR_CONFIG['incremental']
+
+    # (start, segment, cache_key) pieces for every document
+    documents = []
+    for text in texts:
+        if incremental:
+            documents.append([(start, sentence, grammar_cache_key('sentence', sentence))
+                              for start, sentence in split_sentences(text)])
+        else:
+            documents.append([(0, text, None)])
+
+    resolved = {}
+    pending = {}
+    for pieces in documents:
+        for _, segment, cache_key in pieces:
+            if segment in resolved or segment in pending:
+                continue
+            cached = _result_cache.get(cache_key) if cache_key else None
+            if cached is None:
+                pending[segment] = cache_key
+            else:
+                resolved[segment] = [SentenceMatch.from_dict(m) for m in cached]
+
+    if pending:
+        pending_segments = list(pending)
+        for segment, segment_matches in zip(pending_segments, check_segments(tool, pending_segments)):
+            resolved[segment] = segment_matches
+            if pending[segment]:
+                _result_cache.set(pending[segment], [m.to_dict() for m in segment_matches])
+
+    results = []
+    for pieces in documents:
+        matches = [m.shifted(start) for start, segment, _ in pieces for m in resolved[segment]]
+        matches.sort(key=lambda m: m.offset)
+        results.append(matches)
+
+    return results
+
 def clean_text(text: str) -> str:
     """Clean and normalize text"""
     # Remove extra whitespace
@@ -136,8 +494,8 @@ def process_language_tool_errors(matches, text: str) -> List[Dict[str, Any]]:
             'offset': match.offset,
             'length': match.errorLength,
             'suggestions': match.replacements[:5],  # Limit to 5 suggestions
-            'type': categorize_error(match.ruleId, match.category),
-            'severity': get_error_severity(match.ruleId)
+            'type': categorize_error(match),
+            'severity': get_error_severity(match)
         }
         errors.append(error)
     
@@ -145,13 +503,51 @@ def process_language_tool_errors(matches, text: str) -> List[Dict[str, Any]]:
 
 def analyze_with_spacy(text: str, nlp) -> List[Dict[str, Any]]:
     """Additional analysis using spaCy"""
+    return analyze_texts_with_spacy([text], nlp)[0]
+
+def analyze_texts_with_spacy(texts: List[str], nlp, batch_size: int = None) -> List[List[Dict[str, Any]]]:
+    """
+    Run the spaCy stage over many texts
+
+    Every text is split into sentences and all sentences are streamed through
+    nlp.pipe in batches, so long documents and many documents cost the same
+    per sentence.
+
+    Returns:
+        Per-text lists of errors
+    """
+    batch_size = batch_size or GRAMMAR_CONFIG['spacy_batch_size']
+
+    owners = []
+    sentences = []
+    for index, text in enumerate(texts):
+        for _, sentence in split_sentences(text):
+            owners.append(index)
+            sentences.append(sentence)
+
+    docs = [[] for _ in texts]
+    try:
+        for owner, doc in zip(owners, nlp.pipe(sentences, batch_size=batch_size)):
+            docs[owner].append(doc)
+    except Exception as e:
+        print(f"spaCy analysis error: {e}")
+        return [[] for _ in texts]
+
+    return [analyze_spacy_docs(text_docs) for text_docs in docs]
+
+def analyze_spacy_doc(doc) -> List[Dict[str, Any]]:
+    """Style and repetition checks over an already parsed spaCy Doc"""
+    return analyze_spacy_docs([doc])
+
+def analyze_spacy_docs(docs) -> List[Dict[str, Any]]:
+    """Style and repetition checks over the parsed pieces of one text"""
     errors = []
     
     try:
-        doc = nlp(text)
-        
+        sentences = [sent for doc in docs for sent in doc.sents]
+
         # Check for potential issues
-        for sent in doc.sents:
+        for sent in sentences:
             # Check sentence length (very long sentences might be hard to read)
             if len(sent.text.split()) > 30:
                 errors.append({
@@ -179,86 +575,155 @@ def analyze_with_spacy(text: str, nlp) -> List[Dict[str, Any]]:
                     })
                     break
         
-        # Check for passive voice (simplified)
-        for token in doc:
-            if token.dep_ == 'auxpass':
-                sent = token.sent
-                errors.append({
-                    'rule_id': 'PASSIVE_VOICE',
-                    'category': 'Style',
-                    'message': 'Consider using active voice for clearer writing.',
-                    'context': sent.text,
-                    'suggestions': ['Rewrite in active voice'],
-                    'type': 'style',
-                    'severity': 'low'
-                })
-                break
+        # Check for passive voice (simplified; needs the parser of the 'full' stage)
+        passive = next((token for sent in sentences for token in sent if token.dep_ == 'auxpass'), None)
+        if passive is not None:
+            errors.append({
+                'rule_id': 'PASSIVE_VOICE',
+                'category': 'Style',
+                'message': 'Consider using active voice for clearer writing.',
+                'context': passive.sent.text,
+                'suggestions': ['Rewrite in active voice'],
+                'type': 'style',
+                'severity': 'low'
+            })
     
     except Exception as e:
         print(f"spaCy analysis error: {e}")
     
     return errors
 
+BASIC_GRAMMAR_PATTERNS = [
+    {
+        'pattern': r'\b(there|their|they\'re)\b',
+        'message': 'Check usage of "there", "their", or "they\'re"',
+        'category': 'Grammar',
+        'type': 'word_choice'
+    },
+    {
+        'pattern': r'\b(your|you\'re)\b',
+        'message': 'Check usage of "your" or "you\'re"',
+        'category': 'Grammar',
+        'type': 'word_choice'
+    },
+    {
+        'pattern': r'\b(its|it\'s)\b',
+        'message': 'Check usage of "its" or "it\'s"',
+        'category': 'Grammar',
+        'type': 'word_choice'
+    },
+    {
+        'pattern': r'\b(?P<repeated>\w+)\s+(?P=repeated)\b',
+        'message': 'Possible repeated word',
+        'category': 'Grammar',
+        'type': 'repetition'
+    },
+    {
+        'pattern': r'\b(alot)\b',
+        'message': 'Should be "a lot" (two words)',
+        'category': 'Spelling',
+        'type': 'spelling',
+        'suggestions': ['a lot']
+    },
+    {
+        'pattern': r'\b(recieve)\b',
+        'message': 'Incorrect spelling',
+        'category': 'Spelling',
+        'type': 'spelling',
+        'suggestions': ['receive']
+    }
+]
+
+# Comprehensive error detection patterns for the fallback enhanced check
+# (pattern, replacement, error type)
+FALLBACK_ERROR_PATTERNS = [
+    # Subject-verb disagreement
+    (r"\bShe don't\b", "She doesn't", "grammar"),
+    (r"\bHe don't\b", "He doesn't", "grammar"),
+    (r"\bIt don't\b", "It doesn't", "grammar"),
+    (r"\bdon't\b", "doesn't", "grammar"),  # General case
+    (r"\bI are\b", "I am", "grammar"),
+    (r"\bHe have\b", "He has", "grammar"),
+    (r"\bShe have\b", "She has", "grammar"),
+    (r"\bIt have\b", "It has", "grammar"),
+    (r"\bThey was\b", "They were", "grammar"),
+    (r"\bWe was\b", "We were", "grammar"),
+    (r"\bYou was\b", "You were", "grammar"),
+
+    # Wrong word usage
+    (r"\btheir\b(?=\s+going)", "they're", "grammar"),
+    (r"\bTheir\b(?=\s+going)", "They're", "grammar"),
+    (r"\byour\b(?=\s+going)", "you're", "grammar"),
+    (r"\bYour\b(?=\s+going)", "You're", "grammar"),
+    (r"\bits\b(?=\s+a\b)", "it's", "grammar"),
+    (r"\bIts\b(?=\s+a\b)", "It's", "grammar"),
+
+    # Wrong phrases
+    (r"\bcould of\b", "could have", "grammar"),
+    (r"\bwould of\b", "would have", "grammar"),
+    (r"\bshould of\b", "should have", "grammar"),
+    (r"\bmust of\b", "must have", "grammar"),
+
+    # Wrong pronouns
+    (r"\bBetween you and I\b", "Between you and me", "grammar"),
+    (r"\bbetween you and I\b", "between you and me", "grammar"),
+    (r"\bMe and him\b", "He and I", "grammar"),
+    (r"\bme and him\b", "he and I", "grammar"),
+    (r"\bMe and her\b", "She and I", "grammar"),
+    (r"\bme and her\b", "she and I", "grammar"),
+
+    # Wrong verb forms
+    (r"\bI seen\b", "I saw", "grammar"),
+    (r"\bWe seen\b", "We saw", "grammar"),
+    (r"\bThey seen\b", "They saw", "grammar"),
+    (r"\bhave went\b", "have gone", "grammar"),
+    (r"\bhas went\b", "has gone", "grammar"),
+
+    # Double comparatives
+    (r"\bmore prettier\b", "prettier", "grammar"),
+    (r"\bmore better\b", "better", "grammar"),
+    (r"\bmore worse\b", "worse", "grammar"),
+    (r"\bmost prettiest\b", "prettiest", "grammar"),
+
+    # Common spelling errors
+    (r"\bbeautifull\b", "beautiful", "spelling"),
+    (r"\bgrammer\b", "grammar", "spelling"),
+    (r"\brecieve\b", "receive", "spelling"),
+    (r"\boccured\b", "occurred", "spelling"),
+    (r"\bseperate\b", "separate", "spelling"),
+    (r"\bdefinately\b", "definitely", "spelling"),
+    (r"\baccommodate\b", "accommodate", "spelling"),
+    (r"\bembarrass\b", "embarrass", "spelling"),
+
+    # Additional common errors
+    (r"\ba lot\b", "a lot", "spelling"),  # Catches "alot"
+    (r"\balot\b", "a lot", "spelling"),
+    (r"\bthere\b(?=\s+going)", "they're", "grammar"),
+    (r"\bwhere\b(?=\s+going)", "they're", "grammar"),
+]
+
+# Compiled once at import so the fallback stays cheap under load
+_BASIC_RULES = RuleEngine([(info['pattern'], info) for info in BASIC_GRAMMAR_PATTERNS])
+_FALLBACK_RULES = RuleEngine([(pattern, (replacement, error_type))
+                              for pattern, replacement, error_type in FALLBACK_ERROR_PATTERNS])
+
 def perform_basic_grammar_check(text: str) -> List[Dict[str, Any]]:
     """Basic grammar checking using regex patterns (fallback)"""
     errors = []
     
-    # Common grammar patterns
-    patterns = [
-        {
-            'pattern': r'\b(there|their|they\'re)\b',
-            'message': 'Check usage of "there", "their", or "they\'re"',
-            'category': 'Grammar',
-            'type': 'word_choice'
-        },
-        {
-            'pattern': r'\b(your|you\'re)\b',
-            'message': 'Check usage of "your" or "you\'re"',
-            'category': 'Grammar',
-            'type': 'word_choice'
-        },
-        {
-            'pattern': r'\b(its|it\'s)\b',
-            'message': 'Check usage of "its" or "it\'s"',
-            'category': 'Grammar',
-            'type': 'word_choice'
-        },
-        {
-            'pattern': r'\b(\w+)\s+\1\b',
-            'message': 'Possible repeated word',
-            'category': 'Grammar',
-            'type': 'repetition'
-        },
-        {
-            'pattern': r'\b(alot)\b',
-            'message': 'Should be "a lot" (two words)',
-            'category': 'Spelling',
-            'type': 'spelling',
-            'suggestions': ['a lot']
-        },
-        {
-            'pattern': r'\b(recieve)\b',
-            'message': 'Incorrect spelling',
-            'category': 'Spelling',
-            'type': 'spelling',
-            'suggestions': ['receive']
-        }
-    ]
-    
-    for pattern_info in patterns:
-        matches = re.finditer(pattern_info['pattern'], text, re.IGNORECASE)
-        for match in matches:
-            errors.append({
-                'rule_id': f"BASIC_{pattern_info['type'].upper()}",
-                'category': pattern_info['category'],
-                'message': pattern_info['message'],
-                'context': get_error_context(text, match.start(), match.end() - match.start()),
-                'offset': match.start(),
-                'length': match.end() - match.start(),
-                'suggestions': pattern_info.get('suggestions', []),
-                'type': pattern_info['type'],
-                'severity': 'medium'
-            })
+    for rule, match in _BASIC_RULES.find_all(text):
+        pattern_info = rule.data
+        errors.append({
+            'rule_id': f"BASIC_{pattern_info['type'].upper()}",
+            'category': pattern_info['category'],
+            'message': pattern_info['message'],
+            'context': get_error_context(text, match.start(), match.end() - match.start()),
+            'offset': match.start(),
+            'length': match.end() - match.start(),
+            'suggestions': pattern_info.get('suggestions', []),
+            'type': pattern_info['type'],
+            'severity': 'medium'
+        })
     
     return errors
 
@@ -280,36 +745,6 @@ def get_error_context(text: str, offset: int, length: int, context_size: int = 5
     
     return context.strip()
 
-def categorize_error(rule_id: str, category: str) -> str:
-    """Categorize error type"""
-    rule_id = rule_id.upper()
-    
-    if 'SPELL' in rule_id or 'MORFOLOGIK' in rule_id:
-        return 'spelling'
-    elif 'GRAMMAR' in rule_id or category == 'Grammar':
-        return 'grammar'
-    elif 'PUNCT' in rule_id:
-        return 'punctuation'
-    elif 'STYLE' in rule_id or category == 'Style':
-        return 'style'
-    else:
-        return 'other'
-
-def get_error_severity(rule_id: str) -> str:
-    """Determine error severity"""
-    rule_id = rule_id.upper()
-    
-    # High severity errors
-    if any(keyword in rule_id for keyword in ['SPELL', 'GRAMMAR', 'AGREEMENT']):
-        return 'high'
-    
-    # Medium severity errors
-    if any(keyword in rule_id for keyword in ['PUNCT', 'WORD_ORDER']):
-        return 'medium'
-    
-    # Low severity errors (style suggestions)
-    return 'low'
-
 def remove_duplicate_errors(errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Remove duplicate errors based on position and type"""
     seen = set()
@@ -347,194 +782,185 @@ def test_grammar_checker():
 def check_grammar_enhanced(text: str) -> Dict[str, Any]:
     """
     Enhanced grammar checking with text highlighting and full sentence correction
+
+    LanguageTool is queried once; the error list, corrected text, highlighted
+    HTML and accuracy score are all derived from that single set of matches.
     """
 
-    # Start with basic grammar check
-    basic_result = check_grammar(text)
+    # Offsets and highlighting refer to the exact input, so the raw text is the key
+    cache_key = grammar_cache_key('enhanced', text)
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    # Initialize enhanced result with basic data
+    matches = run_language_tool_check(text)
+    if matches is not None:
+        print(f"LanguageTool found {len(matches)} matches")
+
+    result = _enhanced_result_from_matches(text, matches, cache_key)
+
+    print(f"Enhanced result: errors={result['error_count']}, corrected='{result['corrected_text'][:50]}...'")
+    return result
+
+def _enhanced_result_from_matches(text: str, matches, cache_key: str) -> Dict[str, Any]:
+    """Finish an enhanced result from LanguageTool matches (None means use the fallback)"""
+
+    # Initialize enhanced result
     result = {
         'original_text': text,
         'highlighted_text': '',
         'corrected_text': text,  # Default to original
-        'errors': basic_result.get('errors', []),
-        'error_count': basic_result.get('error_count', 0),
-        'accuracy_score': basic_result.get('accuracy_score', 100),
+        'errors': [],
+        'error_count': 0,
+        'accuracy_score': 100,
         'word_count': len(text.split()),
         'sentence_count': len([s for s in text.split('.') if s.strip()]),
         'corrections_applied': []
     }
 
     try:
-        # Try to get LanguageTool
-        tool = get_language_tool()
-
-        if tool:
-            print(f"Using LanguageTool to check: '{text}'")
-            matches = tool.check(text)
-            print(f"LanguageTool found {len(matches)} matches")
-
-            if matches:
-                # Generate highlighted and corrected text
-                highlighted_html, corrected_text, corrections = generate_highlighted_and_corrected_text(text, matches)
-
-                result['highlighted_text'] = highlighted_html
-                result['corrected_text'] = corrected_text
-                result['corrections_applied'] = corrections
-
-                # Enhanced error details
-                enhanced_errors = []
-                for match in matches:
-                    error_info = {
-                        'offset': match.offset,
-                        'length': match.errorLength,
-                        'message': match.message,
-                        'category': match.category,
-                        'rule_id': match.ruleId,
-                        'context': getattr(match, 'context', ''),
-                        'original_text': text[match.offset:match.offset + match.errorLength],
-                        'suggestions': [r for r in match.replacements[:3]],
-                        'error_type': categorize_error(match),
-                        'severity': get_error_severity(match)
-                    }
-                    enhanced_errors.append(error_info)
-
-                result['errors'] = enhanced_errors
-                result['error_count'] = len(enhanced_errors)
-                result['accuracy_score'] = max(0, 100 - (len(enhanced_errors) * 15))
-            else:
-                # No errors found by LanguageTool
-                result['highlighted_text'] = html.escape(text)
-                result['corrected_text'] = text
-                result['error_count'] = 0
-                result['errors'] = []
-                result['accuracy_score'] = 100
+        if matches is not None:
+            result.update(build_enhanced_result(text, matches))
+            _result_cache.set(cache_key, result)
         else:
             # Fallback: Create basic highlighting and correction
             print("LanguageTool not available, using fallback")
-            result.update(create_fallback_enhanced_result(text, basic_result))
+            result.update(create_fallback_enhanced_result(text))
 
     except Exception as e:
         print(f"Enhanced grammar check error: {e}")
         # Fallback to basic enhanced result
-        result.update(create_fallback_enhanced_result(text, basic_result))
+        result.update(create_fallback_enhanced_result(text))
 
-    print(f"Enhanced result: errors={result['error_count']}, corrected='{result['corrected_text'][:50]}...'")
     return result
 
-def create_fallback_enhanced_result(text: str, basic_result: Dict) -> Dict:
-    """Create enhanced result when LanguageTool is not available"""
+def check_grammar_batch(texts: List[str], enhanced: bool = True, batch_size: int = None,
+                        spacy_mode: str = None) -> List[Dict[str, Any]]:
+    """
+    Check many texts at once
 
-    # Comprehensive error detection patterns
-    error_patterns = [
-        # Subject-verb disagreement
-        (r"\bShe don't\b", "She doesn't", "grammar"),
-        (r"\bHe don't\b", "He doesn't", "grammar"),
-        (r"\bIt don't\b", "It doesn't", "grammar"),
-        (r"\bdon't\b", "doesn't", "grammar"),  # General case
-        (r"\bI are\b", "I am", "grammar"),
-        (r"\bHe have\b", "He has", "grammar"),
-        (r"\bShe have\b", "She has", "grammar"),
-        (r"\bIt have\b", "It has", "grammar"),
-        (r"\bThey was\b", "They were", "grammar"),
-        (r"\bWe was\b", "We were", "grammar"),
-        (r"\bYou was\b", "You were", "grammar"),
-
-        # Wrong word usage
-        (r"\btheir\b(?=\s+going)", "they're", "grammar"),
-        (r"\bTheir\b(?=\s+going)", "They're", "grammar"),
-        (r"\byour\b(?=\s+going)", "you're", "grammar"),
-        (r"\bYour\b(?=\s+going)", "You're", "grammar"),
-        (r"\bits\b(?=\s+a\b)", "it's", "grammar"),
-        (r"\bIts\b(?=\s+a\b)", "It's", "grammar"),
-
-        # Wrong phrases
-        (r"\bcould of\b", "could have", "grammar"),
-        (r"\bwould of\b", "would have", "grammar"),
-        (r"\bshould of\b", "should have", "grammar"),
-        (r"\bmust of\b", "must have", "grammar"),
-
-        # Wrong pronouns
-        (r"\bBetween you and I\b", "Between you and me", "grammar"),
-        (r"\bbetween you and I\b", "between you and me", "grammar"),
-        (r"\bMe and him\b", "He and I", "grammar"),
-        (r"\bme and him\b", "he and I", "grammar"),
-        (r"\bMe and her\b", "She and I", "grammar"),
-        (r"\bme and her\b", "she and I", "grammar"),
-
-        # Wrong verb forms
-        (r"\bI seen\b", "I saw", "grammar"),
-        (r"\bWe seen\b", "We saw", "grammar"),
-        (r"\bThey seen\b", "They saw", "grammar"),
-        (r"\bhave went\b", "have gone", "grammar"),
-        (r"\bhas went\b", "has gone", "grammar"),
-
-        # Double comparatives
-        (r"\bmore prettier\b", "prettier", "grammar"),
-        (r"\bmore better\b", "better", "grammar"),
-        (r"\bmore worse\b", "worse", "grammar"),
-        (r"\bmost prettiest\b", "prettiest", "grammar"),
-
-        # Common spelling errors
-        (r"\bbeautifull\b", "beautiful", "spelling"),
-        (r"\bgrammer\b", "grammar", "spelling"),
-        (r"\brecieve\b", "receive", "spelling"),
-        (r"\boccured\b", "occurred", "spelling"),
-        (r"\bseperate\b", "separate", "spelling"),
-        (r"\bdefinately\b", "definitely", "spelling"),
-        (r"\baccommodate\b", "accommodate", "spelling"),
-        (r"\bembarrass\b", "embarrass", "spelling"),
-
-        # Additional common errors
-        (r"\ba lot\b", "a lot", "spelling"),  # Catches "alot"
-        (r"\balot\b", "a lot", "spelling"),
-        (r"\bthere\b(?=\s+going)", "they're", "grammar"),
-        (r"\bwhere\b(?=\s+going)", "they're", "grammar"),
-    ]
+    Cached texts are answered straight away. The rest share LanguageTool
+    calls (see check_documents) and, for basic results, are parsed together
+    with spaCy's nlp.pipe.
+
+    Args:
+        texts: Texts to check
+        enhanced: Return check_grammar_enhanced-style results, or check_grammar-style ones if False
+        batch_size: Number of sentences spaCy processes per batch
+        spacy_mode: spaCy stage for basic results (defaults to the configured mode)
+
+    Returns:
+        List of results in the same order as texts
+    """
+    kind = 'enhanced' if enhanced else 'basic'
+    spacy_mode = None if enhanced else resolve_spacy_mode(spacy_mode)
+    results = [None] * len(texts)
+    pending = []
+
+    for index, text in enumerate(texts):
+        text = text or ''
+        if not enhanced:
+            if not text.strip():
+                results[index] = check_grammar(text, spacy_mode)
+                continue
+            text = clean_text(text)
+
+        cache_key = grammar_cache_key(kind, text, spacy_mode)
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append((index, text, cache_key))
+
+    if not pending:
+        return results
+
+    pending_texts = [text for _, text, _ in pending]
+    match_lists = run_language_tool_batch(pending_texts)
+    if match_lists is None:
+        match_lists = [None] * len(pending)
+
+    if enhanced:
+        for (index, text, cache_key), matches in zip(pending, match_lists):
+            results[index] = _enhanced_result_from_matches(text, matches, cache_key)
+    else:
+        nlp = get_nlp(spacy_mode)
+        if nlp:
+            spacy_errors = analyze_texts_with_spacy(pending_texts, nlp, batch_size)
+        else:
+            spacy_errors = [[] for _ in pending_texts]
+        for (index, text, cache_key), matches, text_errors in zip(pending, match_lists, spacy_errors):
+            results[index] = build_basic_result(text, matches, text_errors)
+            if matches is not None:
+                _result_cache.set(cache_key, results[index])
+
+    print(f"Batch grammar check: {len(texts)} texts, {len(pending)} not cached")
+    return results
+
+def build_enhanced_result(text: str, matches: List) -> Dict[str, Any]:
+    """Build the enhanced result fields from one set of LanguageTool matches"""
+    if not matches:
+        # No errors found by LanguageTool
+        return {
+            'highlighted_text': html.escape(text),
+            'corrected_text': text,
+            'errors': [],
+            'error_count': 0,
+            'corrections_applied': [],
+            'accuracy_score': 100
+        }
+
+    # Generate highlighted and corrected text
+    highlighted_html, corrected_text, corrections = generate_highlighted_and_corrected_text(text, matches)
+
+    # Enhanced error details
+    enhanced_errors = []
+    for match in matches:
+        error_info = {
+            'offset': match.offset,
+            'length': match.errorLength,
+            'message': match.message,
+            'category': match.category,
+            'rule_id': match.ruleId,
+            'context': get_error_context(text, match.offset, match.errorLength),
+            'original_text': text[match.offset:match.offset + match.errorLength],
+            'suggestions': [r for r in match.replacements[:3]],
+            'error_type': categorize_error(match),
+            'severity': get_error_severity(match)
+        }
+        enhanced_errors.append(error_info)
+
+    return {
+        'highlighted_text': highlighted_html,
+        'corrected_text': corrected_text,
+        'errors': enhanced_errors,
+        'error_count': len(enhanced_errors),
+        'corrections_applied': corrections,
+        'accuracy_score': max(0, 100 - (len(enhanced_errors) * 15))
+    }
+
+def create_fallback_enhanced_result(text: str, basic_result: Dict = None) -> Dict:
+    """Create enhanced result when LanguageTool is not available"""
 
-    corrected_text = text
-    highlighted_text = html.escape(text)
     errors = []
     corrections_applied = []
 
-    # Apply pattern-based corrections and collect matches
-    import re
+    # Precompiled single-pass scan; overlaps resolved in favour of longer matches
     all_matches = []
+    for rule, match in _FALLBACK_RULES.find(text):
+        replacement, error_type = rule.data
+        start, end = match.span()
+        all_matches.append({
+            'start': start,
+            'end': end,
+            'original': match.group(),
+            'replacement': replacement,
+            'error_type': error_type,
+            'pattern': rule.pattern
+        })
 
-    for pattern, replacement, error_type in error_patterns:
-        matches = list(re.finditer(pattern, text, re.IGNORECASE))
-
-        for match in matches:
-            original = match.group()
-            start, end = match.span()
-
-            # Check for overlapping matches and keep the longer one
-            overlaps = False
-            for existing_match in all_matches:
-                if (start < existing_match['end'] and end > existing_match['start']):
-                    # If this match is longer, replace the existing one
-                    if (end - start) > (existing_match['end'] - existing_match['start']):
-                        all_matches.remove(existing_match)
-                    else:
-                        overlaps = True
-                        break
-
-            if not overlaps:
-                all_matches.append({
-                    'start': start,
-                    'end': end,
-                    'original': original,
-                    'replacement': replacement,
-                    'error_type': error_type,
-                    'pattern': pattern
-                })
-
-    # Sort matches by position
-    all_matches.sort(key=lambda x: x['start'])
-
-    # Create errors and corrections from non-overlapping matches
+    # Create errors from non-overlapping matches
     for match in all_matches:
-        # Add error info
         errors.append({
             'offset': match['start'],
             'length': match['end'] - match['start'],
@@ -546,8 +972,21 @@ def create_fallback_enhanced_result(text: str, basic_result: Dict) -> Dict:
             'severity': 'medium'
         })
 
-        # Apply correction
-        corrected_text = corrected_text.replace(match['original'], match['replacement'], 1)
+    # Highlight and correct in a single pass
+    highlighted_text, corrected_text, rendered = render_highlighted_and_corrected(text, [
+        {
+            'start': match['start'],
+            'end': match['end'],
+            'css_class': f"grammar-error-{match['error_type']}",
+            'title': f"Possible {match['error_type']} error",
+            'replacement': match['replacement'],
+            'match': match
+        }
+        for match in all_matches
+    ])
+
+    for span in rendered:
+        match = span['match']
         corrections_applied.append({
             'original': match['original'],
             'correction': match['replacement'],
@@ -556,22 +995,6 @@ def create_fallback_enhanced_result(text: str, basic_result: Dict) -> Dict:
             'message': f"Changed '{match['original']}' to '{match['replacement']}'"
         })
 
-    # Create highlighted text without overlapping spans
-    highlighted_text = html.escape(text)
-
-    # Apply highlighting from right to left to preserve positions
-    for match in reversed(all_matches):
-        original_escaped = html.escape(match['original'])
-        error_class = f"grammar-error-{match['error_type']}"
-        highlighted_span = f'<span class="{error_class}" title="Possible {match["error_type"]} error">{original_escaped}</span>'
-
-        # Find and replace the specific occurrence
-        start_pos = highlighted_text.find(original_escaped, match['start'])
-        if start_pos != -1:
-            highlighted_text = (highlighted_text[:start_pos] +
-                              highlighted_span +
-                              highlighted_text[start_pos + len(original_escaped):])
-
     return {
         'highlighted_text': highlighted_text,
         'corrected_text': corrected_text,
@@ -581,6 +1004,51 @@ def create_fallback_enhanced_result(text: str, basic_result: Dict) -> Dict:
         'accuracy_score': max(0, 100 - (len(errors) * 15))
     }
 
+def render_highlighted_and_corrected(text: str, spans: List[Dict[str, Any]]) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """
+    Render highlighted HTML and corrected text in one left-to-right pass
+
+    Every piece of the original text is escaped on its own, so offsets always
+    refer to the unescaped text. Spans overlapping an earlier span are skipped.
+
+    Args:
+        text: Original (unescaped) text
+        spans: Dicts with start, end, css_class, title and replacement
+               (None leaves the text unchanged); optional extra_attributes
+
+    Returns:
+        Tuple of (highlighted_html, corrected_text, rendered_spans)
+    """
+    html_parts = []
+    corrected_parts = []
+    rendered = []
+    cursor = 0
+
+    for span in sorted(spans, key=lambda s: (s['start'], -s['end'])):
+        start, end = span['start'], span['end']
+        if start < cursor or end > len(text):
+            continue
+
+        between = text[cursor:start]
+        original = text[start:end]
+        html_parts.append(html.escape(between))
+        html_parts.append(
+            f'<span class="{span["css_class"]}" title="{html.escape(span["title"])}"'
+            f'{span.get("extra_attributes", "")}>{html.escape(original)}</span>'
+        )
+
+        replacement = span.get('replacement')
+        corrected_parts.append(between)
+        corrected_parts.append(original if replacement is None else replacement)
+
+        rendered.append(span)
+        cursor = end
+
+    html_parts.append(html.escape(text[cursor:]))
+    corrected_parts.append(text[cursor:])
+
+    return ''.join(html_parts), ''.join(corrected_parts), rendered
+
 def generate_highlighted_and_corrected_text(text: str, matches: List) -> Tuple[str, str, List[Dict]]:
     """
     Generate highlighted HTML and corrected text from LanguageTool matches
@@ -592,75 +1060,49 @@ def generate_highlighted_and_corrected_text(text: str, matches: List) -> Tuple[s
     Returns:
         Tuple of (highlighted_html, corrected_text, corrections_applied)
     """
+    spans = []
+    for match in matches:
+        # Use the first (best) suggestion
+        suggestion = match.replacements[0] if match.replacements else None
+        spans.append({
+            'start': match.offset,
+            'end': match.offset + match.errorLength,
+            'css_class': get_highlight_class(match),
+            'title': f"{match.message} | Suggestion: {suggestion or 'No suggestion'}",
+            'extra_attributes': ' data-toggle="tooltip" data-placement="top"',
+            'replacement': suggestion,
+            'match': match
+        })
 
-    # Sort matches by offset (reverse order for text replacement)
-    sorted_matches = sorted(matches, key=lambda x: x.offset, reverse=True)
+    highlighted_html, corrected_text, rendered = render_highlighted_and_corrected(text, spans)
 
-    # Create corrected text by applying suggestions
-    corrected_text = text
     corrections_applied = []
-
-    for match in sorted_matches:
-        if match.replacements:
-            # Use the first (best) suggestion
-            suggestion = match.replacements[0]
-            original = corrected_text[match.offset:match.offset + match.errorLength]
-
-            # Apply correction
-            corrected_text = (
-                corrected_text[:match.offset] +
-                suggestion +
-                corrected_text[match.offset + match.errorLength:]
-            )
-
+    for span in rendered:
+        if span['replacement'] is not None:
+            match = span['match']
             corrections_applied.append({
-                'original': original,
-                'correction': suggestion,
+                'original': text[span['start']:span['end']],
+                'correction': span['replacement'],
                 'position': match.offset,
                 'rule': match.ruleId,
                 'message': match.message
             })
 
-    # Generate highlighted HTML
-    highlighted_html = html.escape(text)
-
-    # Sort matches by offset (forward order for HTML highlighting)
-    forward_matches = sorted(matches, key=lambda x: x.offset)
-
-    # Apply highlighting (work backwards to maintain offsets)
-    offset_adjustment = 0
-
-    for match in forward_matches:
-        start_pos = match.offset + offset_adjustment
-        end_pos = start_pos + match.errorLength
-
-        # Get error text
-        error_text = highlighted_html[start_pos:end_pos]
-
-        # Determine highlight class based on error type
-        error_class = get_highlight_class(match)
-
-        # Create highlighted span with tooltip
-        suggestion_text = match.replacements[0] if match.replacements else "No suggestion"
-        highlighted_span = (
-            f'<span class="{error_class}" '
-            f'title="{html.escape(match.message)} | Suggestion: {html.escape(suggestion_text)}" '
-            f'data-toggle="tooltip" data-placement="top">'
-            f'{error_text}'
-            f'</span>'
-        )
+    return highlighted_html, corrected_text, corrections_applied
 
-        # Replace in highlighted text
-        highlighted_html = (
-            highlighted_html[:start_pos] +
-            highlighted_span +
-            highlighted_html[end_pos:]
-        )
+def apply_corrections(text: str, matches: List) -> Tuple[str, List[Dict]]:
+    """
+    Apply the best suggestion of every match to the text
 
-        # Adjust offset for next iteration
-        offset_adjustment += len(highlighted_span) - len(error_text)
+    This replaces LanguageTool's own correct(), which would re-check the text.
 
-    return highlighted_html, corrected_text, corrections_applied
+    Returns:
+        Tuple of (corrected_text, corrections_applied)
+    """
+    _, corrected_text, corrections_applied = generate_highlighted_and_corrected_text(
+        text, [match for match in matches if match.replacements]
+    )
+    return corrected_text, corrections_applied
 
 def categorize_error(match) -> str:
     """Categorize error type based on LanguageTool match"""
@@ -710,5 +1152,50 @@ def get_highlight_class(match) -> str:
 
     return class_map.get(error_type, 'grammar-error-other')
 
+def benchmark_rendering(word_count: int = 10000, error_count: int = 500, repeat: int = 5):
+    """Time highlight/correction rendering on a long text with many errors"""
+    import random
+    import time
+
+    random.seed(0)
+    vocabulary = ['the', 'student', 'writes', 'an', 'essay', '&', 'about', '<grammar>', 'rules', 'daily']
+    words = [random.choice(vocabulary) for _ in range(word_count)]
+    text = ' '.join(words)
+
+    # Offsets of every word, then pick error positions among them
+    offsets = []
+    position = 0
+    for word in words:
+        offsets.append((position, len(word)))
+        position += len(word) + 1
+
+    matches = [
+        SentenceMatch(offset, length, 'Possible error', 'Grammar', 'BENCHMARK_RULE', ['fixed'])
+        for offset, length in sorted(random.sample(offsets, error_count))
+    ]
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        generate_highlighted_and_corrected_text(text, matches)
+        timings.append(time.perf_counter() - started)
+    print(f"LanguageTool rendering: {word_count} words, {error_count} errors: "
+          f"best {min(timings) * 1000:.2f} ms over {repeat} runs")
+
+    fallback_text = ' '.join(random.choice(['She', "don't", 'have', 'went', 'beautifull', 'to', 'school'])
+                             for _ in range(word_count))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = create_fallback_enhanced_result(fallback_text)
+        timings.append(time.perf_counter() - started)
+    print(f"Fallback check + rendering: {word_count} words, {result['error_count']} errors: "
+          f"best {min(timings) * 1000:.2f} ms over {repeat} runs")
+
 if __name__ == "__main__":
-    test_grammar_checker()
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        benchmark_rendering()
+    else:
+        test_grammar_checker()
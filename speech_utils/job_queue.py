@@ -0,0 +1,205 @@
+"""
+Job Queue Module
+Bounded background worker pool with job tracking, backpressure and result retention
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while every worker and queue slot is taken"""
+
+class OwnerLimitError(QueueFullError):
+    """Raised when one owner already has max_per_owner jobs in flight"""
+
+class Job:
+    """A unit of work submitted to a JobQueue"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, owner: Any = None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = Job.QUEUED
+        self.result = None
+        self.error = None
+        self.exception = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.error:
+            data['error'] = self.error
+        if include_result and self.status == Job.DONE:
+            data['result'] = self.result
+        return data
+
+class JobQueue:
+    """
+    Runs submitted callables on a fixed number of worker threads
+
+    At most max_workers jobs run at once and at most max_queued wait behind
+    them; submit() raises QueueFullError beyond that so callers can answer
+    with HTTP 429. With max_per_owner set, one owner can have at most that
+    many jobs in flight (OwnerLimitError). Finished jobs are kept for
+    result_ttl seconds so clients can poll for them.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 20,
+                 result_ttl: float = 600, name: str = 'jobs', max_per_owner: Optional[int] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queued = max(0, int(max_queued))
+        self.result_ttl = result_ttl
+        self.name = name
+        self.max_per_owner = max_per_owner
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._active_by_owner: Dict[Any, int] = {}
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, func: Callable, *args, owner: Any = None, **kwargs) -> Job:
+        """
+        Queue func(*args, **kwargs) for a worker
+
+        Raises:
+            OwnerLimitError: When the owner already has max_per_owner jobs in flight
+            QueueFullError: When max_workers + max_queued jobs are already in flight
+        """
+        self._expire_finished()
+
+        with self._lock:
+            if (self.max_per_owner and owner is not None
+                    and self._active_by_owner.get(owner, 0) >= self.max_per_owner):
+                self.rejected += 1
+                raise OwnerLimitError(f"Too many {self.name} jobs in flight for this user")
+            if self._active >= self.max_workers + self.max_queued:
+                self.rejected += 1
+                raise QueueFullError(f"{self.name} queue is full")
+            self._active += 1
+            if owner is not None:
+                self._active_by_owner[owner] = self._active_by_owner.get(owner, 0) + 1
+            self.submitted += 1
+            job = Job(owner)
+            self._jobs[job.id] = job
+
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job: Job, func: Callable, args, kwargs):
+        try:
+            with self._lock:
+                if job.status == Job.CANCELLED:
+                    return
+                job.status = Job.RUNNING
+            job.started_at = time.time()
+            job.result = func(*args, **kwargs)
+            job.status = Job.DONE
+        except Exception as e:
+            print(f"{self.name} job {job.id} failed: {e}")
+            job.error = str(e)
+            job.exception = e
+            job.status = Job.FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._release(job)
+                if job.status == Job.DONE:
+                    self.completed += 1
+                elif job.status == Job.FAILED:
+                    self.failed += 1
+            job._done.set()
+
+    def get(self, job_id: str, owner: Any = None) -> Optional[Job]:
+        """Look a job up; when owner is given, jobs of other owners are not found"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def cancel(self, job_id: str, owner: Any = None) -> bool:
+        """Cancel a job that has not started yet"""
+        job = self.get(job_id, owner)
+        if job is None:
+            return False
+
+        with self._lock:
+            if job.status != Job.QUEUED:
+                return False
+            job.status = Job.CANCELLED
+
+        if job.future is not None and job.future.cancel():
+            # The worker will never pick it up, so release its slot here
+            job.finished_at = time.time()
+            with self._lock:
+                self._release(job)
+            job._done.set()
+        return True
+
+    def _release(self, job: Job):
+        """Free the worker or queue slot of a finished job (lock held)"""
+        self._active -= 1
+        if job.owner is not None:
+            remaining = self._active_by_owner.get(job.owner, 1) - 1
+            if remaining > 0:
+                self._active_by_owner[job.owner] = remaining
+            else:
+                self._active_by_owner.pop(job.owner, None)
+
+    def _expire_finished(self):
+        """Forget finished jobs older than result_ttl"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queued': self.max_queued,
+                'max_per_owner': self.max_per_owner,
+                'in_flight': self._active,
+                'tracked_jobs': len(self._jobs),
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,229 @@
+"""
+LanguageTool Pool Module
+Keeps several warm LanguageTool server processes and spreads checks across them
+"""
+
+import http.client
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+class LanguageToolPool:
+    """
+    Managed pool of LanguageTool instances, each backed by its own JVM server
+
+    Every check borrows an idle instance exclusively, so up to `size` checks
+    run in parallel. A monitor thread probes idle instances periodically and
+    replaces dead ones; instances whose server dies or stops answering
+    during a check are replaced in the background. An error about the
+    request itself (e.g. a rejected text) leaves the instance in the pool.
+    Refills are serialised, so the pool never grows past `size`. The pool
+    exposes check() so it can stand in anywhere a single LanguageTool
+    instance was used.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1,
+                 acquire_timeout: float = 30.0, health_check_interval: float = 30.0):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.Queue()
+        self._instances = []
+        self._lock = threading.Lock()
+        # Held while instances are spawned, so concurrent refills cannot overshoot size
+        self._refill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._monitor = None
+        self._started = False
+
+        self.checks = 0
+        self.failures = 0
+        self.restarts = 0
+
+    def start(self) -> 'LanguageToolPool':
+        """Start every instance (in parallel) and the health monitor"""
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+
+        with self._refill_lock:
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                for tool in executor.map(lambda _: self._spawn(), range(self.size)):
+                    if tool is not None:
+                        self._add(tool)
+
+        if self.health_check_interval:
+            self._monitor = threading.Thread(target=self._monitor_loop, name='languagetool-pool-monitor')
+            self._monitor.daemon = True
+            self._monitor.start()
+
+        print(f"LanguageTool pool started with {self.running}/{self.size} instances")
+        return self
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return len(self._instances)
+
+    def check(self, text: str) -> List:
+        """
+        Check text on the next idle instance
+
+        When the instance's server is dead or unreachable it is replaced and
+        the check retried once on another instance; any other error is about
+        the text and is raised without discarding the instance.
+        """
+        if not self._started:
+            self.start()
+
+        last_error = None
+        for _ in range(2):
+            tool = self._acquire()
+            try:
+                matches = tool.check(text)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                if not self._is_broken(tool, e):
+                    self._idle.put(tool)
+                    raise
+                last_error = e
+                print(f"LanguageTool pool instance failed: {e}")
+                self._discard(tool)
+                self._respawn_in_background()
+                continue
+
+            self._idle.put(tool)
+            with self._lock:
+                self.checks += 1
+            return matches
+
+        raise last_error
+
+    def _acquire(self):
+        if self.running == 0:
+            raise RuntimeError('No LanguageTool instances are running')
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise RuntimeError('Timed out waiting for an idle LanguageTool instance')
+
+    def _spawn(self):
+        """Create and warm up one instance; returns None on failure"""
+        try:
+            tool = self.factory()
+            # The first check loads the rule set, so pay for it here
+            tool.check('Warm up.')
+            return tool
+        except Exception as e:
+            print(f"Error starting LanguageTool instance: {e}")
+            return None
+
+    def _add(self, tool):
+        with self._lock:
+            self._instances.append(tool)
+        self._idle.put(tool)
+
+    def _discard(self, tool):
+        with self._lock:
+            if tool in self._instances:
+                self._instances.remove(tool)
+        try:
+            tool.close()
+        except Exception:
+            pass
+
+    def _refill(self):
+        """Start instances until the pool is back at its configured size"""
+        with self._refill_lock:
+            for _ in range(self.size - self.running):
+                if self._stop.is_set():
+                    break
+                tool = self._spawn()
+                if tool is None:
+                    break
+                self._add(tool)
+                with self._lock:
+                    self.restarts += 1
+
+    def _respawn_in_background(self):
+        thread = threading.Thread(target=self._refill, name='languagetool-pool-respawn')
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def _server_dead(tool) -> bool:
+        # Local servers expose their process; a dead JVM fails fast here
+        is_alive = getattr(tool, '_server_is_alive', None)
+        return is_alive is not None and not getattr(tool, '_remote', False) and not is_alive()
+
+    @classmethod
+    def _is_broken(cls, tool, error: Exception) -> bool:
+        """Whether a failed check means the instance itself is unusable"""
+        if cls._server_dead(tool):
+            return True
+        # language_tool_python wraps connection errors in LanguageToolError; look at the cause
+        while error is not None:
+            if isinstance(error, (OSError, http.client.HTTPException)):
+                return True
+            error = error.__cause__ or error.__context__
+        return False
+
+    @classmethod
+    def _is_healthy(cls, tool) -> bool:
+        if cls._server_dead(tool):
+            return False
+        try:
+            tool.check('Health check.')
+            return True
+        except Exception:
+            return False
+
+    def health_check(self):
+        """Probe idle instances, replace dead ones and refill missing slots"""
+        for _ in range(self._idle.qsize()):
+            try:
+                tool = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            if self._is_healthy(tool):
+                self._idle.put(tool)
+            else:
+                print("LanguageTool pool instance unhealthy, restarting")
+                self._discard(tool)
+
+        self._refill()
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.health_check_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                print(f"LanguageTool pool health check error: {e}")
+
+    def close(self):
+        """Stop the monitor and shut every instance down"""
+        self._stop.set()
+        with self._lock:
+            instances, self._instances = self._instances, []
+        for tool in instances:
+            try:
+                tool.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'running': len(self._instances),
+                'idle': self._idle.qsize(),
+                'checks': self.checks,
+                'failures': self.failures,
+                'restarts': self.restarts
+            }
@@ -0,0 +1,338 @@
+"""
+Phoneme Module
+Pronouncing-dictionary lookup and phoneme-level comparison of expected and recognized words
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from speech_utils.word_alignment import DELETE, INSERT, MATCH, SUBSTITUTE, align_words
+
+# ARPAbet phoneme set used by CMUdict (stress digits are dropped)
+PHONEMES = (
+    'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'B', 'CH', 'D', 'DH', 'EH', 'ER', 'EY',
+    'F', 'G', 'HH', 'IH', 'IY', 'JH', 'K', 'L', 'M', 'N', 'NG', 'OW', 'OY', 'P',
+    'R', 'S', 'SH', 'T', 'TH', 'UH', 'UW', 'V', 'W', 'Y', 'Z', 'ZH'
+)
+PHONEME_IDS = {phoneme: index for index, phoneme in enumerate(PHONEMES)}
+VOWELS = frozenset(('AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY',
+                    'IH', 'IY', 'OW', 'OY', 'UH', 'UW'))
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), 'data', 'lexicon.dict')
+
+# Compiled index layout: magic, slot count, entry count, phoneme blob size, reserved,
+# then the key, offset and length tables and the phoneme blob
+INDEX_MAGIC = b'PHNLEX01'
+INDEX_HEADER = struct.Struct('<8sIIII')
+
+# Phoneme configuration (updated through configure_phonemes)
+PHONEME_CONFIG = {
+    'lexicon_path': DEFAULT_LEXICON_PATH
+}
+
+# Global lexicon (loaded on first use)
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def _word_key(word: str) -> int:
+    """64-bit hash of an upper-cased word; 0 is reserved for empty slots"""
+    digest = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+class PhonemeLexicon:
+    """
+    Word to phoneme sequence lookup over flat arrays
+
+    An open-addressing hash table: keys holds 64-bit word hashes, offsets and
+    lengths point into one blob of phoneme ids. Words themselves are not kept,
+    so a full CMUdict index stays a few MB and can be memory-mapped straight
+    from a file built by save(); lookups touch only the pages they probe.
+    """
+
+    def __init__(self, keys, offsets, lengths, blob, entries: int, source: str = None):
+        self.keys = keys
+        self.offsets = offsets
+        self.lengths = lengths
+        self.blob = blob
+        self.entries = entries
+        self.source = source
+        self._mask = len(keys) - 1
+        self._mmap = None
+
+    def __len__(self) -> int:
+        return self.entries
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, Iterable[str]]], source: str = None) -> 'PhonemeLexicon':
+        """Build a lexicon from (word, phonemes) pairs; the first pronunciation of a word wins"""
+        pronunciations = {}
+        for word, phonemes in entries:
+            key = _word_key(word.upper())
+            if key not in pronunciations:
+                pronunciations[key] = bytes(PHONEME_IDS[phoneme] for phoneme in phonemes)
+
+        # Power-of-two table at most half full keeps probe runs short
+        slots = 8
+        while slots < 2 * len(pronunciations):
+            slots *= 2
+        mask = slots - 1
+
+        keys = array('Q', bytes(8 * slots))
+        offsets = array('I', bytes(4 * slots))
+        lengths = array('B', bytes(slots))
+        blob = bytearray()
+        for key, ids in pronunciations.items():
+            slot = key & mask
+            while keys[slot]:
+                slot = (slot + 1) & mask
+            keys[slot] = key
+            offsets[slot] = len(blob)
+            lengths[slot] = len(ids)
+            blob.extend(ids)
+
+        return cls(keys, offsets, lengths, bytes(blob), len(pronunciations), source)
+
+    @classmethod
+    def load(cls, path: str) -> 'PhonemeLexicon':
+        """
+        Load a CMUdict-format text file, or memory-map an index written by save()
+
+        Raises:
+            OSError: When the file cannot be read
+            ValueError: When a compiled index is truncated
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) == INDEX_MAGIC:
+                return cls._map_index(f, path)
+
+        with open(path, encoding='latin-1') as f:
+            return cls.from_entries(_parse_dictionary(f), source=path)
+
+    @classmethod
+    def _map_index(cls, f, path: str) -> 'PhonemeLexicon':
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, slots, entries, blob_size, _ = INDEX_HEADER.unpack_from(mapped)
+
+        view = memoryview(mapped)
+        position = INDEX_HEADER.size
+        tables = []
+        for code, size in (('Q', 8 * slots), ('I', 4 * slots), ('B', slots), ('B', blob_size)):
+            if position + size > len(mapped):
+                raise ValueError(f"Phoneme index {path} is truncated")
+            tables.append(view[position:position + size].cast(code))
+            position += size
+
+        lexicon = cls(*tables, entries, source=path)
+        lexicon._mmap = mapped
+        return lexicon
+
+    def save(self, path: str):
+        """Write the tables as an index that load() memory-maps"""
+        with open(path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(self.keys), self.entries, len(self.blob), 0))
+            for table in (self.keys, self.offsets, self.lengths, self.blob):
+                f.write(bytes(table))
+
+    def lookup(self, word: str) -> Optional[Tuple[str, ...]]:
+        """Phonemes of a word, or None when it is not in the lexicon"""
+        key = _word_key(word.upper())
+        keys = self.keys
+        mask = self._mask
+        slot = key & mask
+        while True:
+            found = keys[slot]
+            if found == key:
+                offset = self.offsets[slot]
+                return tuple(PHONEMES[i] for i in self.blob[offset:offset + self.lengths[slot]])
+            if not found:
+                return None
+            slot = (slot + 1) & mask
+
+def _parse_dictionary(lines: Iterable[str]):
+    """Yield (word, phonemes) from CMUdict lines, skipping comments and alternate pronunciations"""
+    for line in lines:
+        if not line.strip() or line.startswith(';;;'):
+            continue
+        word, *phonemes = line.split()
+        # "WORD(2)" marks an alternate pronunciation; the first one is kept
+        if word.endswith(')') and '(' in word:
+            continue
+        phonemes = [phoneme.rstrip('012') for phoneme in phonemes]
+        if phonemes and all(phoneme in PHONEME_IDS for phoneme in phonemes):
+            yield word, phonemes
+
+# Letter-to-sound fallback for words missing from the lexicon, longest spelling first
+_LETTER_RULES = sorted({
+    'tion': ('SH', 'AH', 'N'), 'sion': ('ZH', 'AH', 'N'), 'ough': ('AO',), 'augh': ('AO',),
+    'eigh': ('EY',), 'igh': ('AY',), 'tch': ('CH',), 'dge': ('JH',), 'sch': ('S', 'K'),
+    'sh': ('SH',), 'ch': ('CH',), 'th': ('TH',), 'ph': ('F',), 'wh': ('W',), 'ck': ('K',),
+    'ng': ('NG',), 'qu': ('K', 'W'), 'wr': ('R',), 'gh': (), 'ee': ('IY',), 'ea': ('IY',),
+    'oo': ('UW',), 'ou': ('AW',), 'ow': ('OW',), 'oi': ('OY',), 'oy': ('OY',), 'ai': ('EY',),
+    'ay': ('EY',), 'au': ('AO',), 'aw': ('AO',), 'ew': ('UW',), 'ie': ('IY',), 'oa': ('OW',),
+    'er': ('ER',), 'ir': ('ER',), 'ur': ('ER',), 'ar': ('AA', 'R'), 'or': ('AO', 'R'),
+    'a': ('AE',), 'b': ('B',), 'c': ('K',), 'd': ('D',), 'e': ('EH',), 'f': ('F',), 'g': ('G',),
+    'h': ('HH',), 'i': ('IH',), 'j': ('JH',), 'k': ('K',), 'l': ('L',), 'm': ('M',), 'n': ('N',),
+    'o': ('AA',), 'p': ('P',), 'q': ('K',), 'r': ('R',), 's': ('S',), 't': ('T',), 'u': ('AH',),
+    'v': ('V',), 'w': ('W',), 'x': ('K', 'S'), 'y': ('Y',), 'z': ('Z',)
+}.items(), key=lambda rule: -len(rule[0]))
+
+# A vowel letter before consonant + final "e" says its name
+_LONG_VOWELS = {'a': ('EY',), 'e': ('IY',), 'i': ('AY',), 'o': ('OW',), 'u': ('UW',)}
+
+@lru_cache(maxsize=4096)
+def spell_phonemes(word: str) -> Tuple[str, ...]:
+    """Approximate phonemes from spelling alone, for words the lexicon does not know"""
+    word = ''.join(letter for letter in word.lower() if 'a' <= letter <= 'z')
+    magic_e = (len(word) > 3 and word[-1] == 'e' and word[-2] not in 'aeiouy'
+               and word[-3] in _LONG_VOWELS)
+    if magic_e:
+        word = word[:-1]
+
+    phonemes = []
+    position = 0
+    while position < len(word):
+        letter = word[position]
+        # Doubled consonants are one sound
+        if position and letter == word[position - 1] and letter not in 'aeiou':
+            position += 1
+            continue
+        if magic_e and position == len(word) - 2:
+            phonemes.extend(_LONG_VOWELS[letter])
+            position += 1
+            continue
+        if letter == 'c' and word[position + 1:position + 2] in ('e', 'i', 'y'):
+            phonemes.append('S')
+            position += 1
+            continue
+        if letter == 'y' and position:
+            phonemes.append('IY' if position == len(word) - 1 else 'IH')
+            position += 1
+            continue
+        for spelling, sounds in _LETTER_RULES:
+            if word.startswith(spelling, position):
+                phonemes.extend(sounds)
+                position += len(spelling)
+                break
+
+    return tuple(phonemes)
+
+def configure_phonemes(**options):
+    """
+    Update the phoneme configuration; the lexicon is reloaded on next use
+
+    Args:
+        lexicon_path (str): CMUdict-format dictionary, or an index built with
+            `python -m speech_utils.phonemes build`
+    """
+    global _lexicon
+
+    unknown = set(options) - set(PHONEME_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown phoneme options: {', '.join(sorted(unknown))}")
+
+    with _lexicon_lock:
+        PHONEME_CONFIG.update(options)
+        if not PHONEME_CONFIG['lexicon_path']:
+            PHONEME_CONFIG['lexicon_path'] = DEFAULT_LEXICON_PATH
+        _lexicon = None
+        word_phonemes.cache_clear()
+
+def get_lexicon() -> PhonemeLexicon:
+    """Get the configured lexicon, loading it on first use"""
+    global _lexicon
+
+    with _lexicon_lock:
+        if _lexicon is None:
+            path = PHONEME_CONFIG['lexicon_path']
+            try:
+                _lexicon = PhonemeLexicon.load(path)
+            except (OSError, ValueError) as e:
+                print(f"Could not load phoneme lexicon from '{path}': {e}")
+                _lexicon = PhonemeLexicon.from_entries([])
+        return _lexicon
+
+@lru_cache(maxsize=4096)
+def word_phonemes(word: str) -> Tuple[Tuple[str, ...], str]:
+    """
+    Phonemes of a word and where they came from
+
+    Returns:
+        Tuple of the phonemes and 'lexicon' or 'rules' (spelled out when the word is unknown)
+    """
+    phonemes = get_lexicon().lookup(word)
+    if phonemes is not None:
+        return phonemes, 'lexicon'
+    return spell_phonemes(word), 'rules'
+
+def compare_phonemes(expected_word: str, recognized_word: str) -> Dict[str, Any]:
+    """
+    Align the phonemes of an expected word with those of the word recognized in its place
+
+    Args:
+        expected_word: Word from the expected text
+        recognized_word: Word the recognizer returned instead
+
+    Returns:
+        Dict with both phoneme sequences, phoneme_similarity (1 - edit distance over the
+        longer sequence), phoneme_errors and phoneme_source ('lexicon' when both words
+        were found in the dictionary, otherwise 'rules')
+    """
+    expected_phonemes, expected_source = word_phonemes(expected_word)
+    recognized_phonemes, recognized_source = word_phonemes(recognized_word)
+    alignment = align_words(expected_phonemes, recognized_phonemes)
+
+    errors = []
+    position = 0
+    for op, i, j in alignment.ops:
+        if op == MATCH:
+            position = i + 1
+            continue
+        if op == SUBSTITUTE:
+            errors.append({'type': 'substitution', 'expected': expected_phonemes[i],
+                           'recognized': recognized_phonemes[j], 'position': i})
+        elif op == DELETE:
+            errors.append({'type': 'omission', 'expected': expected_phonemes[i],
+                           'recognized': '', 'position': i})
+        elif op == INSERT:
+            errors.append({'type': 'insertion', 'expected': '',
+                           'recognized': recognized_phonemes[j], 'position': position})
+        if i >= 0:
+            position = i + 1
+
+    longest = max(len(expected_phonemes), len(recognized_phonemes))
+    return {
+        'expected_phonemes': list(expected_phonemes),
+        'recognized_phonemes': list(recognized_phonemes),
+        'phoneme_similarity': 1.0 - alignment.distance / longest if longest else 1.0,
+        'phoneme_errors': errors,
+        'phoneme_source': 'lexicon' if expected_source == recognized_source == 'lexicon' else 'rules'
+    }
+
+def describe_phoneme_error(error: Dict[str, Any]) -> str:
+    """One-line description of a phoneme error for feedback"""
+    if error['type'] == 'substitution':
+        return f"the /{error['expected']}/ sound came out as /{error['recognized']}/"
+    if error['type'] == 'omission':
+        return f"the /{error['expected']}/ sound was dropped"
+    return f"an extra /{error['recognized']}/ sound was added"
+
+def build_index(dictionary_path: str, index_path: str) -> PhonemeLexicon:
+    """Compile a CMUdict-format dictionary into a memory-mappable index"""
+    lexicon = PhonemeLexicon.load(dictionary_path)
+    lexicon.save(index_path)
+    return lexicon
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 4 and sys.argv[1] == 'build':
+        lexicon = build_index(sys.argv[2], sys.argv[3])
+        print(f"Wrote {len(lexicon)} pronunciations to {sys.argv[3]}")
+    else:
+        print("Usage: python -m speech_utils.phonemes build <cmudict.dict> <index>")
@@ -2,31 +2,31 @@
 Pronunciation Analysis Module
 Analyzes speech recognition results and provides pronunciation feedback
 Uses advanced metrics including WER, BLEU, and Levenshtein distance
+Word-level metrics come from a single alignment (see word_alignment.py)
+Substituted words are also compared phoneme by phoneme (see phonemes.py)
 """
 
 import re
 import difflib
-from typing import Dict, List, Any, Tuple
+from typing import Callable, Dict, List, Any, Tuple, Sequence, Union
 import speech_recognition as sr
-from io import BytesIO
-import tempfile
 import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from speech_utils.audio_analysis import (
+    HAS_NUMPY, analyze_speech_timing, estimate_energy_threshold, has_speech, measure_speech, trim_silence
+)
+from speech_utils.audio_io import (
+    AUDIO_CONFIG, AudioDecodeError, AudioLimitError, PCMAudio, configure_audio, decode_audio, sniff_format
+)
+from speech_utils.phonemes import PHONEME_CONFIG, compare_phonemes, configure_phonemes, describe_phoneme_error
+from speech_utils.recognizers import recognizer_signature, transcribe
+from speech_utils.result_cache import ResultCache, make_cache_key
+from speech_utils.word_alignment import WordAlignment, align_texts, MATCH, SUBSTITUTE, DELETE
 
 # Try to import advanced libraries with fallbacks
-try:
-    import jiwer
-    HAS_JIWER = True
-except ImportError:
-    HAS_JIWER = False
-    print("jiwer not available, using fallback WER calculation")
-
-try:
-    from pydub import AudioSegment
-    HAS_PYDUB = True
-except ImportError:
-    HAS_PYDUB = False
-    print("pydub not available, audio processing limited")
-
 try:
     import Levenshtein
     HAS_LEVENSHTEIN = True
@@ -34,105 +34,244 @@ except ImportError:
     HAS_LEVENSHTEIN = False
     print("python-Levenshtein not available, using difflib fallback")
 
-def process_audio_file(audio_data: bytes) -> str:
+# Batches smaller than this are scored in-process; forking workers costs more
+BATCH_PARALLEL_THRESHOLD = 64
+
+# Worker processes for batch scoring (created on first use)
+_batch_pool = None
+_batch_pool_workers = 0
+_batch_pool_lock = threading.Lock()
+
+# Bump when the shape of cached transcription entries changes
+TRANSCRIPTION_CACHE_VERSION = 1
+
+# Transcription cache configuration (see configure_transcription_cache)
+TRANSCRIPTION_CONFIG = {
+    'cache_size': 512,
+    'cache_ttl': 3600,
+    'cache_path': None
+}
+
+_transcription_cache = ResultCache(TRANSCRIPTION_CONFIG['cache_size'], TRANSCRIPTION_CONFIG['cache_ttl'])
+
+def configure_transcription_cache(**options):
     """
-    Process audio data and convert to text using speech recognition
+    Update the transcription cache configuration and rebuild the cache
 
     Args:
-        audio_data (bytes): Raw audio data
+        cache_size (int): Maximum number of in-memory cached transcriptions (0 disables)
+        cache_ttl (float): Seconds before a cached transcription expires (None = never)
+        cache_path (str): Optional SQLite file so cached transcriptions survive restarts
+    """
+    global _transcription_cache
+
+    unknown = set(options) - set(TRANSCRIPTION_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown transcription cache options: {', '.join(sorted(unknown))}")
+
+    TRANSCRIPTION_CONFIG.update(options)
+    _transcription_cache = ResultCache(
+        TRANSCRIPTION_CONFIG['cache_size'],
+        TRANSCRIPTION_CONFIG['cache_ttl'],
+        TRANSCRIPTION_CONFIG['cache_path'],
+        table='transcription_cache'
+    )
+
+def get_transcription_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the transcription cache"""
+    return _transcription_cache.stats()
+
+def recognize_audio(pcm: PCMAudio, expected_text: str = None) -> str:
+    """
+    Convert decoded audio to text using speech recognition
+
+    Args:
+        pcm (PCMAudio): Decoded mono audio
+        expected_text (str): Text the learner was asked to read, passed to the backends as a hint
 
     Returns:
         str: Recognized text from speech
     """
+    # Calibrate against the quietest frames of the whole clip (no speech is
+    # discarded) and skip the recognizer when nothing rises above the noise
+    if HAS_NUMPY and not has_speech(pcm):
+        print("Speech recognition skipped: no speech above the noise floor")
+        return ""
+
+    # Recognize speech with the first backend that is available
+    return transcribe(pcm.to_audio_data(), hint=expected_text)
+
+def prepare_upload(audio_data: bytes, audio_format: str = None, audio_config: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Decode and analyse an upload, the CPU-bound half of recognize_upload
+
+    Top-level and returning only picklable values, so the audio worker pool
+    can run it in a separate process.
+
+    Args:
+        audio_data (bytes): Raw audio data
+        audio_format (str): Container format hint such as 'webm'; sniffed when omitted
+        audio_config (dict): AUDIO_CONFIG to apply first, for worker processes that do not share it
+
+    Returns:
+        Dict with 'speech' (the PCMAudio to recognize, None when the clip is
+        undecodable or silent) and 'measurements' (see measure_speech)
+
+    Raises:
+        AudioLimitError: When the upload exceeds the configured size or duration limit
+    """
+    if audio_config:
+        configure_audio(**audio_config)
+
+    # Decode the upload to mono 16 kHz PCM; uploads over the limits are rejected
     try:
-        # Initialize recognizer
-        recognizer = sr.Recognizer()
+        pcm = decode_audio(audio_data, audio_format)
+    except AudioLimitError:
+        raise
+    except AudioDecodeError as e:
+        print(f"Error decoding audio: {e}")
+        return {'speech': None, 'measurements': None}
+
+    # Timing is measured on the whole recording; the recognizer only gets the speech
+    measurements = measure_speech(pcm) if HAS_NUMPY else None
+    speech = pcm
+    if measurements is not None and AUDIO_CONFIG['trim_silence']:
+        speech = trim_silence(pcm, measurements['voiced_segments'])
+
+    if HAS_NUMPY and not has_speech(pcm):
+        print("Speech recognition skipped: no speech above the noise floor")
+        speech = None
+
+    return {'speech': speech, 'measurements': measurements}
+
+def recognize_upload(audio_data: bytes, audio_format: str = None, expected_text: str = None,
+                     prepare: Callable[[bytes, str], Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Decode and recognize an uploaded clip, reusing the result for a clip seen before
 
-        # Create temporary file for audio processing
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_file_path = temp_file.name
+    Identical uploads (a double submit, a network retry, or the same clip
+    sent to /api/process-audio and then /api/analyze-pronunciation) are
+    served from the cache without decoding or recognizing again. The key
+    hashes the raw bytes together with the recognizer configuration.
 
-        try:
-            # Load audio file
-            with sr.AudioFile(temp_file_path) as source:
-                # Adjust for ambient noise
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                # Record the audio
-                audio = recognizer.record(source)
-
-            # Recognize speech using Google Speech Recognition
-            try:
-                text = recognizer.recognize_google(audio)
-                print(f"Speech recognition successful: {text}")
-                return text
-            except sr.UnknownValueError:
-                print("Speech recognition could not understand audio")
-                return ""
-            except sr.RequestError as e:
-                print(f"Could not request results from speech recognition service: {e}")
-                # Fallback to offline recognition if available
-                try:
-                    text = recognizer.recognize_sphinx(audio)
-                    print(f"Offline recognition successful: {text}")
-                    return text
-                except:
-                    return ""
-
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+    Args:
+        audio_data (bytes): Raw audio data (bytes, bytearray or memoryview)
+        audio_format (str): Container format hint such as 'webm'; sniffed when omitted
+        expected_text (str): Text the learner was asked to read, passed to the backends as a hint
+        prepare (callable): Runs prepare_upload(audio_data, audio_format) somewhere else,
+            e.g. in a worker process; prepare_upload is called directly when omitted
 
+    Returns:
+        Dict with 'recognized_text' and 'measurements' (see measure_speech; None
+        when the clip could not be decoded or numpy is unavailable)
+
+    Raises:
+        AudioLimitError: When the upload exceeds the configured size or duration limit
+    """
+    if hasattr(audio_data, 'read'):
+        audio_data = audio_data.read()
+
+    cache_key = make_cache_key(
+        'transcription',
+        TRANSCRIPTION_CACHE_VERSION,
+        # Same format decode_audio will use, so a missing hint on a sniffable upload still hits
+        sniff_format(audio_data) or audio_format,
+        AUDIO_CONFIG['sample_rate'],
+        AUDIO_CONFIG['trim_silence'],
+        recognizer_signature(expected_text),
+        audio_data
+    )
+    cached = _transcription_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    prepared = (prepare or prepare_upload)(audio_data, audio_format)
+    speech = prepared['speech']
+
+    # Recognize speech with the first backend that is available
+    result = {
+        'recognized_text': transcribe(speech.to_audio_data(), hint=expected_text) if speech is not None else '',
+        'measurements': prepared['measurements']
+    }
+
+    # An empty transcript can mean every backend was unreachable, so it is not cached
+    if result['recognized_text']:
+        _transcription_cache.set(cache_key, result)
+    return result
+
+def process_audio_file(audio_data: bytes, audio_format: str = None, expected_text: str = None) -> str:
+    """
+    Process audio data and convert to text using speech recognition
+
+    The upload is decoded in memory; nothing is written to disk. Recognition
+    goes through the configured backend chain (see recognizers.py), and
+    repeated uploads are answered from the transcription cache.
+
+    Args:
+        audio_data (bytes): Raw audio data (bytes, bytearray or memoryview)
+        audio_format (str): Container format hint such as 'webm'; sniffed when omitted
+        expected_text (str): Text the learner was asked to read, passed to the backends as a hint
+
+    Returns:
+        str: Recognized text from speech
+
+    Raises:
+        AudioLimitError: When the upload exceeds the configured size or duration limit
+    """
+    try:
+        return recognize_upload(audio_data, audio_format, expected_text)['recognized_text']
+
+    except AudioLimitError:
+        raise
     except Exception as e:
         print(f"Error processing audio: {e}")
         return ""
 
-def process_webm_audio(audio_data: bytes) -> str:
+def process_webm_audio(audio_data: bytes, expected_text: str = None) -> str:
     """
     Process WebM audio data from browser recording
 
     Args:
         audio_data (bytes): WebM audio data
+        expected_text (str): Text the learner was asked to read
 
     Returns:
         str: Recognized text from speech
     """
-    if not HAS_PYDUB:
-        print("pydub not available, cannot process WebM audio")
-        return ""
+    # ffmpeg decodes the WebM straight to PCM; there is no intermediate WAV export
+    return process_audio_file(audio_data, 'webm', expected_text)
 
-    try:
-        # Convert WebM to WAV using pydub
-        audio_segment = AudioSegment.from_file(BytesIO(audio_data), format="webm")
-
-        # Convert to WAV format for speech recognition
-        wav_data = BytesIO()
-        audio_segment.export(wav_data, format="wav")
-        wav_data.seek(0)
-
-        # Process the WAV data
-        return process_audio_file(wav_data.read())
-
-    except Exception as e:
-        print(f"Error processing WebM audio: {e}")
-        return ""
-
-def analyze_pronunciation(expected_text: str, recognized_text: str, audio_data: bytes = None) -> Dict[str, Any]:
+def analyze_pronunciation(expected_text: str, recognized_text: str, audio_data: Union[bytes, PCMAudio] = None,
+                          audio_measurements: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Comprehensive pronunciation analysis with advanced metrics
 
     Args:
         expected_text (str): The text that should have been spoken
         recognized_text (str): The text that was actually recognized
-        audio_data (bytes): Optional raw audio data for processing
+        audio_data (bytes | PCMAudio): Optional recording, raw or already decoded;
+            used for recognition when recognized_text is empty and for timing analysis
+        audio_measurements (dict): measure_speech() output for the recording, e.g. from
+            recognize_upload; used for timing analysis instead of measuring audio_data
 
     Returns:
         Dict containing detailed pronunciation scores and feedback
     """
+    pcm = None
+    if audio_data is not None and not isinstance(audio_data, PCMAudio):
+        try:
+            pcm = decode_audio(audio_data)
+        except AudioDecodeError as e:
+            print(f"Error decoding audio for analysis: {e}")
+    elif audio_data is not None:
+        pcm = audio_data
+
     # If audio data is provided, process it to get recognized text
-    if audio_data and not recognized_text:
-        recognized_text = process_audio_file(audio_data)
+    if pcm is not None and not recognized_text:
+        try:
+            recognized_text = recognize_audio(pcm, expected_text)
+        except Exception as e:
+            print(f"Error processing audio: {e}")
 
     if not expected_text or not recognized_text:
         return {
@@ -153,8 +292,11 @@ def analyze_pronunciation(expected_text: str, recognized_text: str, audio_data:
     expected_normalized = normalize_text(expected_text)
     recognized_normalized = normalize_text(recognized_text)
 
+    # Align the two texts once; every word-level metric below is derived from it
+    alignment = align_texts(expected_normalized, recognized_normalized)
+
     # Calculate advanced metrics
-    advanced_metrics = calculate_advanced_metrics(expected_normalized, recognized_normalized)
+    advanced_metrics = calculate_advanced_metrics(expected_normalized, recognized_normalized, alignment)
 
     # Calculate individual scores using advanced metrics
     pronunciation_score = calculate_pronunciation_score_advanced(expected_normalized, recognized_normalized, advanced_metrics)
@@ -168,13 +310,18 @@ def analyze_pronunciation(expected_text: str, recognized_text: str, audio_data:
     feedback = generate_comprehensive_feedback(pronunciation_score, fluency_score, completeness_score, advanced_metrics)
 
     # Word-level analysis with error detection
-    word_analysis = analyze_words_advanced(expected_normalized, recognized_normalized)
+    word_analysis = analyze_words_advanced(expected_normalized, recognized_normalized, alignment)
 
     # Error details for specific feedback
     error_details = generate_error_details(expected_normalized, recognized_normalized, word_analysis)
 
-    # Timing analysis
-    timing_analysis = analyze_timing_advanced(expected_normalized, recognized_normalized)
+    # Timing analysis, measured from the recording when there is one
+    if audio_measurements is None and pcm is not None and HAS_NUMPY:
+        audio_measurements = measure_speech(pcm)
+    if audio_measurements is not None:
+        timing_analysis = analyze_speech_timing(audio_measurements, len(alignment.expected_words), len(alignment.recognized_words))
+    else:
+        timing_analysis = analyze_timing_advanced(expected_normalized, recognized_normalized)
 
     return {
         'pronunciation_score': round(pronunciation_score, 1),
@@ -190,11 +337,80 @@ def analyze_pronunciation(expected_text: str, recognized_text: str, audio_data:
         'timing_analysis': timing_analysis,
         'advanced_metrics': advanced_metrics,
         'error_details': error_details,
-        'expected_words': len(expected_normalized.split()),
-        'recognized_words': len(recognized_normalized.split()),
+        'expected_words': len(alignment.expected_words),
+        'recognized_words': len(alignment.recognized_words),
         'accuracy_percentage': round((1 - advanced_metrics['wer']) * 100, 1)
     }
 
+def _analyze_pair(pair: Tuple[str, str]) -> Dict[str, Any]:
+    """Score one (expected, recognized) pair; top-level so worker processes can run it"""
+    expected_text, recognized_text = pair
+    return analyze_pronunciation(expected_text, recognized_text)
+
+def _init_batch_worker(phoneme_config: Dict[str, Any]):
+    configure_phonemes(**phoneme_config)
+
+def get_batch_pool(workers: int = None) -> ProcessPoolExecutor:
+    """Get the shared batch-scoring process pool, (re)creating it for a new worker count"""
+    global _batch_pool, _batch_pool_workers
+
+    workers = workers or os.cpu_count() or 1
+    with _batch_pool_lock:
+        if _batch_pool is None or _batch_pool_workers != workers:
+            if _batch_pool is not None:
+                _batch_pool.shutdown(wait=False)
+            # Spawned, not forked: forking this multithreaded server could copy held locks,
+            # and the workers would inherit open client sockets. Spawned workers start from
+            # a fresh import, so they are given the phoneme configuration.
+            _batch_pool = ProcessPoolExecutor(max_workers=workers,
+                                              mp_context=multiprocessing.get_context('spawn'),
+                                              initializer=_init_batch_worker,
+                                              initargs=(dict(PHONEME_CONFIG),))
+            _batch_pool_workers = workers
+        return _batch_pool
+
+def _reset_batch_pool():
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is not None:
+            _batch_pool.shutdown(wait=False, cancel_futures=True)
+        _batch_pool = None
+
+def analyze_pronunciation_batch(pairs: Sequence[Tuple[str, str]], workers: int = None) -> List[Dict[str, Any]]:
+    """
+    Score many (expected, recognized) text pairs, e.g. to re-score stored sessions
+
+    Identical pairs are scored once. Large batches are spread over a pool of
+    worker processes; small ones (or workers=1) run in the calling process.
+
+    Args:
+        pairs: (expected_text, recognized_text) tuples
+        workers: Number of worker processes (defaults to the CPU count)
+
+    Returns:
+        List of analyze_pronunciation results in input order
+    """
+    pairs = [(expected or '', recognized or '') for expected, recognized in pairs]
+    unique_pairs = list(dict.fromkeys(pairs))
+
+    workers = workers or os.cpu_count() or 1
+    scored = None
+
+    if workers > 1 and len(unique_pairs) >= BATCH_PARALLEL_THRESHOLD:
+        try:
+            pool = get_batch_pool(workers)
+            chunk_size = max(1, len(unique_pairs) // (workers * 4))
+            scored = list(pool.map(_analyze_pair, unique_pairs, chunksize=chunk_size))
+        except Exception as e:
+            print(f"Batch scoring process pool failed, scoring in-process: {e}")
+            _reset_batch_pool()
+
+    if scored is None:
+        scored = [_analyze_pair(pair) for pair in unique_pairs]
+
+    results = dict(zip(unique_pairs, scored))
+    return [results[pair] for pair in pairs]
+
 def normalize_text(text: str) -> str:
     """Normalize text for comparison"""
     # Convert to lowercase
@@ -298,54 +514,28 @@ def calculate_completeness_score(expected: str, recognized: str) -> float:
     
     return min(100.0, completeness)
 
-def calculate_word_error_rate(expected: str, recognized: str) -> float:
-    """Calculate Word Error Rate (WER) using jiwer if available"""
+def calculate_word_error_rate(expected: str, recognized: str, alignment: WordAlignment = None) -> float:
+    """Calculate Word Error Rate (WER) from the word alignment"""
     if not expected.strip() or not recognized.strip():
         return 1.0 if expected.strip() else 0.0
 
-    if HAS_JIWER:
-        try:
-            # Use jiwer for more accurate WER calculation
-            wer = jiwer.wer(expected, recognized)
-            return wer
-        except Exception as e:
-            print(f"jiwer WER calculation failed: {e}")
-            # Fall back to manual calculation
-
-    # Fallback manual WER calculation
-    expected_words = expected.split()
-    recognized_words = recognized.split()
-
-    if not expected_words:
-        return 0.0 if not recognized_words else 1.0
-
-    # Use dynamic programming to calculate edit distance
-    d = [[0] * (len(recognized_words) + 1) for _ in range(len(expected_words) + 1)]
-
-    for i in range(len(expected_words) + 1):
-        d[i][0] = i
-    for j in range(len(recognized_words) + 1):
-        d[0][j] = j
-
-    for i in range(1, len(expected_words) + 1):
-        for j in range(1, len(recognized_words) + 1):
-            if expected_words[i-1] == recognized_words[j-1]:
-                d[i][j] = d[i-1][j-1]
-            else:
-                d[i][j] = min(
-                    d[i-1][j] + 1,      # deletion
-                    d[i][j-1] + 1,      # insertion
-                    d[i-1][j-1] + 1     # substitution
-                )
+    if alignment is None:
+        alignment = align_texts(expected, recognized)
 
-    return d[len(expected_words)][len(recognized_words)] / len(expected_words)
+    return alignment.wer
 
-def calculate_advanced_metrics(expected: str, recognized: str) -> Dict[str, float]:
+def calculate_advanced_metrics(expected: str, recognized: str, alignment: WordAlignment = None) -> Dict[str, float]:
     """Calculate advanced pronunciation metrics"""
     metrics = {}
 
+    if alignment is None:
+        alignment = align_texts(expected, recognized)
+
     # Word Error Rate
-    metrics['wer'] = calculate_word_error_rate(expected, recognized)
+    metrics['wer'] = calculate_word_error_rate(expected, recognized, alignment)
+    metrics['substitutions'] = alignment.substitutions
+    metrics['deletions'] = alignment.deletions
+    metrics['insertions'] = alignment.insertions
 
     # Character Error Rate
     if HAS_LEVENSHTEIN:
@@ -357,16 +547,8 @@ def calculate_advanced_metrics(expected: str, recognized: str) -> Dict[str, floa
     else:
         metrics['cer'] = 1.0 - difflib.SequenceMatcher(None, expected, recognized).ratio()
 
-    # BLEU-like score (simplified)
-    if HAS_JIWER:
-        try:
-            # Calculate BLEU score using jiwer
-            bleu = jiwer.compute_measures(expected, recognized)
-            metrics['bleu'] = 1.0 - bleu['wer']  # Simplified BLEU approximation
-        except:
-            metrics['bleu'] = 1.0 - metrics['wer']
-    else:
-        metrics['bleu'] = 1.0 - metrics['wer']
+    # BLEU-like score (simplified approximation from the same alignment)
+    metrics['bleu'] = 1.0 - metrics['wer']
 
     # Semantic similarity (word overlap)
     expected_words = set(expected.lower().split())
@@ -449,74 +631,80 @@ def calculate_completeness_score_advanced(expected: str, recognized: str, metric
 
     return min(100.0, max(0.0, completeness_score))
 
-def analyze_words_advanced(expected: str, recognized: str) -> List[Dict[str, Any]]:
+def analyze_words_advanced(expected: str, recognized: str, alignment: WordAlignment = None) -> List[Dict[str, Any]]:
     """Advanced word-by-word analysis with error classification"""
-    expected_words = expected.split()
-    recognized_words = recognized.split()
+    if alignment is None:
+        alignment = align_texts(expected, recognized)
 
     word_analysis = []
 
-    # Use sequence matching for alignment
-    matcher = difflib.SequenceMatcher(None, expected_words, recognized_words)
-
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        if tag == 'equal':
+    for op, exp_word, rec_word in alignment.pairs():
+        if op == MATCH:
             # Perfect matches
-            for k in range(i2 - i1):
-                word_analysis.append({
-                    'expected': expected_words[i1 + k],
-                    'recognized': recognized_words[j1 + k],
-                    'status': 'correct',
-                    'similarity': 1.0,
-                    'error_type': None
-                })
-        elif tag == 'replace':
+            word_analysis.append({
+                'expected': exp_word,
+                'recognized': rec_word,
+                'status': 'correct',
+                'similarity': 1.0,
+                'error_type': None
+            })
+        elif op == SUBSTITUTE:
             # Substitutions with similarity analysis
-            for k in range(max(i2 - i1, j2 - j1)):
-                exp_word = expected_words[i1 + k] if i1 + k < i2 else ''
-                rec_word = recognized_words[j1 + k] if j1 + k < j2 else ''
+            if HAS_LEVENSHTEIN:
+                similarity = 1.0 - (Levenshtein.distance(exp_word, rec_word) / max(len(exp_word), len(rec_word)))
+            else:
+                similarity = difflib.SequenceMatcher(None, exp_word, rec_word).ratio()
 
-                if exp_word and rec_word:
-                    if HAS_LEVENSHTEIN:
-                        similarity = 1.0 - (Levenshtein.distance(exp_word, rec_word) / max(len(exp_word), len(rec_word)))
-                    else:
-                        similarity = difflib.SequenceMatcher(None, exp_word, rec_word).ratio()
+            # Compare the words' sounds, not just their spelling
+            phonemes = compare_phonemes(exp_word, rec_word)
 
-                    # Classify error type
-                    error_type = classify_word_error(exp_word, rec_word, similarity)
+            # Classify error type
+            error_type = classify_word_error(exp_word, rec_word, similarity, phonemes['phoneme_similarity'])
 
-                    word_analysis.append({
-                        'expected': exp_word,
-                        'recognized': rec_word,
-                        'status': 'substituted',
-                        'similarity': similarity,
-                        'error_type': error_type
-                    })
-        elif tag == 'delete':
+            analysis = {
+                'expected': exp_word,
+                'recognized': rec_word,
+                'status': 'substituted',
+                'similarity': similarity,
+                'error_type': error_type
+            }
+            analysis.update(phonemes)
+            word_analysis.append(analysis)
+        elif op == DELETE:
             # Omitted words
-            for k in range(i2 - i1):
-                word_analysis.append({
-                    'expected': expected_words[i1 + k],
-                    'recognized': '',
-                    'status': 'omitted',
-                    'similarity': 0.0,
-                    'error_type': 'omission'
-                })
-        elif tag == 'insert':
+            word_analysis.append({
+                'expected': exp_word,
+                'recognized': '',
+                'status': 'omitted',
+                'similarity': 0.0,
+                'error_type': 'omission'
+            })
+        else:
             # Extra words
-            for k in range(j2 - j1):
-                word_analysis.append({
-                    'expected': '',
-                    'recognized': recognized_words[j1 + k],
-                    'status': 'extra',
-                    'similarity': 0.0,
-                    'error_type': 'insertion'
-                })
+            word_analysis.append({
+                'expected': '',
+                'recognized': rec_word,
+                'status': 'extra',
+                'similarity': 0.0,
+                'error_type': 'insertion'
+            })
 
     return word_analysis
 
-def classify_word_error(expected: str, recognized: str, similarity: float) -> str:
-    """Classify the type of pronunciation error"""
+def classify_word_error(expected: str, recognized: str, similarity: float,
+                        phoneme_similarity: float = None) -> str:
+    """
+    Classify the type of pronunciation error
+
+    When phoneme_similarity is given it decides the class, since words can be
+    spelled alike but sound different (and the reverse). Words that sound
+    identical are homophones: the recognizer picked the other spelling.
+    """
+    if phoneme_similarity is not None:
+        if phoneme_similarity >= 1.0:
+            return 'homophone'
+        similarity = phoneme_similarity
+
     if similarity > 0.8:
         return 'minor_mispronunciation'
     elif similarity > 0.5:
@@ -539,6 +727,8 @@ def generate_error_details(expected: str, recognized: str, word_analysis: List[D
                 'similarity': analysis['similarity'],
                 'suggestion': generate_word_suggestion(analysis)
             }
+            if analysis.get('phoneme_errors'):
+                error_detail['phoneme_errors'] = analysis['phoneme_errors']
             error_details.append(error_detail)
 
     return error_details
@@ -549,21 +739,27 @@ def generate_word_suggestion(word_analysis: Dict[str, Any]) -> str:
     expected = word_analysis['expected']
     recognized = word_analysis['recognized']
 
+    # Name the first sound that went wrong, when the phonemes were compared
+    phoneme_errors = word_analysis.get('phoneme_errors')
+    detail = f" In '{expected}', {describe_phoneme_error(phoneme_errors[0])}." if phoneme_errors else ''
+
     if error_type == 'omission':
         return f"Don't skip the word '{expected}'. Practice saying it slowly."
     elif error_type == 'insertion':
         return f"Avoid adding extra words like '{recognized}'. Stick to the text."
+    elif error_type == 'homophone':
+        return f"'{recognized}' sounds just like '{expected}', so your pronunciation was right."
     elif error_type == 'minor_mispronunciation':
-        return f"Good attempt at '{expected}'! Try to pronounce it more clearly."
+        return f"Good attempt at '{expected}'! Try to pronounce it more clearly.{detail}"
     elif error_type == 'moderate_mispronunciation':
-        return f"Practice the pronunciation of '{expected}'. You said '{recognized}'."
+        return f"Practice the pronunciation of '{expected}'. You said '{recognized}'.{detail}"
     elif error_type == 'major_mispronunciation':
-        return f"Focus on '{expected}' - break it into syllables and practice slowly."
+        return f"Focus on '{expected}' - break it into syllables and practice slowly.{detail}"
     else:
         return f"Try to say '{expected}' instead of '{recognized}'."
 
 def analyze_timing_advanced(expected: str, recognized: str) -> Dict[str, Any]:
-    """Advanced timing analysis"""
+    """Timing estimate from word counts, used when there is no recording to measure"""
     expected_words = expected.split()
     recognized_words = recognized.split()
 
@@ -589,6 +785,7 @@ def analyze_timing_advanced(expected: str, recognized: str) -> Dict[str, Any]:
         pace_feedback = 'Your speaking pace is good!'
 
     return {
+        'source': 'estimate',
         'estimated_duration': round(estimated_duration, 1),
         'actual_duration': round(actual_duration, 1),
         'words_per_minute': round((len(recognized_words) / actual_duration) * 60, 1) if actual_duration > 0 else 0,
@@ -805,6 +1002,7 @@ def get_pronunciation_tips(word_analysis: List[Dict[str, Any]]) -> List[str]:
     difficult_words = [
         analysis for analysis in word_analysis 
         if analysis['status'] in ['substituted', 'omitted'] and analysis['similarity'] < 0.7
+        and analysis['error_type'] != 'homophone'
     ]
     
     if difficult_words:
@@ -814,3 +1012,95 @@ def get_pronunciation_tips(word_analysis: List[Dict[str, Any]]) -> List[str]:
                 tips.append(f"• Practice saying '{word_info['expected']}' clearly")
     
     return tips
+
+def _synthetic_fixtures() -> List[Tuple[str, bytes, str]]:
+    """Speech-like tone bursts over noise, for benchmarking without a fixture directory"""
+    import numpy as np
+    import wave
+    from io import BytesIO
+
+    rate = 16000
+    rng = np.random.default_rng(0)
+    fixtures = []
+    for seconds, noise_level in ((2, 30), (5, 150), (15, 600)):
+        t = np.arange(int(seconds * rate)) / rate
+        # 4 Hz syllable envelope over a 180 Hz voice, starting right at 0 s
+        envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (t < seconds - 0.4)
+        samples = 8000 * envelope * np.sin(2 * np.pi * 180 * t) + rng.normal(0, noise_level, len(t))
+
+        buffer = BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(np.clip(samples, -32768, 32767).astype('<i2').tobytes())
+        fixtures.append((f"synthetic-{seconds}s-noise{noise_level}", buffer.getvalue(), None))
+    return fixtures
+
+def benchmark_noise_calibration(fixture_dir: str = None, repeat: int = 5):
+    """
+    Compare sr's adjust_for_ambient_noise calibration with the vectorized speech gate
+
+    The vectorized threshold is the one has_speech and the VAD apply.
+
+    Fixtures are the *.wav files in fixture_dir; a .txt file with the same
+    name holds the reference transcript, and when present both variants are
+    recognized through the configured backends and scored by WER. Without a
+    directory, synthetic clips are used and only CPU time and discarded audio
+    are reported.
+    """
+    import glob
+    import time
+
+    if fixture_dir:
+        fixtures = []
+        for path in sorted(glob.glob(os.path.join(fixture_dir, '*.wav'))):
+            with open(path, 'rb') as f:
+                data = f.read()
+            transcript_path = os.path.splitext(path)[0] + '.txt'
+            transcript = None
+            if os.path.exists(transcript_path):
+                with open(transcript_path) as f:
+                    transcript = f.read().strip()
+            fixtures.append((os.path.basename(path), data, transcript))
+    else:
+        fixtures = _synthetic_fixtures()
+
+    def legacy(pcm):
+        recognizer = sr.Recognizer()
+        with pcm.source() as source:
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            return recognizer.record(source), recognizer.energy_threshold
+
+    def vectorized(pcm):
+        has_speech(pcm)
+        return pcm.to_audio_data(), estimate_energy_threshold(pcm)
+
+    def best_cpu_time(func, pcm):
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            result = func(pcm)
+            timings.append(time.process_time() - started)
+        return min(timings), result
+
+    def word_error_rate(reference, audio):
+        return align_texts(normalize_text(reference), normalize_text(transcribe(audio))).wer
+
+    for name, data, transcript in fixtures:
+        pcm = decode_audio(data)
+        line = f"{name} ({pcm.duration:.1f}s):"
+        for label, func in (('adjust_for_ambient_noise', legacy), ('vectorized', vectorized)):
+            cpu_time, (audio, threshold) = best_cpu_time(func, pcm)
+            kept = len(audio.frame_data) / (audio.sample_width * audio.sample_rate)
+            line += (f"\n  {label:<25} cpu {cpu_time * 1000:7.2f} ms  threshold {threshold:8.1f}"
+                     f"  discarded {pcm.duration - kept:.2f}s")
+            if transcript:
+                line += f"  WER {word_error_rate(transcript, audio):.3f}"
+        print(line)
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark-noise':
+        benchmark_noise_calibration(sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,314 @@
+"""
+Speech Recognizer Backends Module
+Pluggable speech-to-text backends tried in configured order, with per-backend timeouts
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+import speech_recognition as sr
+
+# Recognizer configuration (updated through configure_recognizers)
+SPEECH_CONFIG = {
+    'backends': ['google', 'sphinx'],
+    'offline': False,
+    'language': 'en-US',
+    'timeout': 15.0,
+    'timeouts': {},
+    'vosk_model_path': 'model',
+    'whisper_model': 'base',
+    'stub_transcript': None
+}
+
+# Global backend chain (built on first use)
+_backends = None
+_backends_lock = threading.Lock()
+
+# Threads per backend that run its calls, so a slow call can be abandoned at the timeout
+BACKEND_THREADS = 4
+# A backend with this many abandoned calls still running is skipped until some finish
+MAX_HUNG_CALLS = 4
+
+class RecognizerBackend:
+    """
+    Base class for a speech-to-text backend
+
+    recognize() returns the transcript, raises sr.UnknownValueError when the
+    speech was unintelligible and sr.RequestError when the backend could not
+    be used (missing package or model, network failure, timeout). A
+    RequestError moves on to the next backend in the chain.
+
+    Calls with a timeout run on the backend's own threads. A call that
+    times out cannot be stopped; its executor is replaced so later calls
+    do not queue behind it, and while MAX_HUNG_CALLS of them are still
+    running the backend is skipped.
+    """
+
+    name = 'base'
+    requires_network = False
+    # Whether the transcript depends on the hint as well as the audio
+    uses_hint = False
+
+    def __init__(self, language: str = 'en-US', timeout: Optional[float] = None, **options):
+        self.language = language
+        self.timeout = timeout
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.abandoned_calls = 0
+        self.hung_calls = 0
+
+    def recognize(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    def recognize_with_timeout(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        """recognize(), abandoned with a RequestError once the timeout passes"""
+        if not self.timeout:
+            return self.recognize(audio, hint)
+
+        with self._executor_lock:
+            if self.hung_calls >= MAX_HUNG_CALLS:
+                raise sr.RequestError(f"{self.name} has {self.hung_calls} timed-out calls still running")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=BACKEND_THREADS,
+                                                    thread_name_prefix=f'recognizer-{self.name}')
+            executor = self._executor
+
+        future = executor.submit(self.recognize, audio, hint)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                # Never started: it was queued behind calls that are still running
+                raise sr.RequestError(f"{self.name} was busy for {self.timeout}s")
+            with self._executor_lock:
+                self.abandoned_calls += 1
+                self.hung_calls += 1
+                # Its thread stays busy until the call returns; new calls get fresh threads
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            future.add_done_callback(self._hung_call_done)
+            raise sr.RequestError(f"{self.name} timed out after {self.timeout}s")
+
+    def _hung_call_done(self, future):
+        with self._executor_lock:
+            self.hung_calls -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._executor_lock:
+            return {'abandoned_calls': self.abandoned_calls, 'hung_calls': self.hung_calls}
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API (network)"""
+
+    name = 'google'
+    requires_network = True
+
+    def recognize(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.timeout
+        return recognizer.recognize_google(audio, language=self.language)
+
+class SphinxBackend(RecognizerBackend):
+    """CMU PocketSphinx (offline, needs the pocketsphinx package)"""
+
+    name = 'sphinx'
+
+    def recognize(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        return sr.Recognizer().recognize_sphinx(audio, language=self.language)
+
+class VoskBackend(RecognizerBackend):
+    """Vosk/Kaldi (offline, needs the vosk package and a model directory)"""
+
+    name = 'vosk'
+    sample_rate = 16000
+
+    def __init__(self, vosk_model_path: str = 'model', **options):
+        super().__init__(**options)
+        self.model_path = vosk_model_path
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _get_model(self):
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from vosk import Model, SetLogLevel
+                except ImportError:
+                    raise sr.RequestError('vosk is not installed')
+                SetLogLevel(-1)
+                try:
+                    self._model = Model(self.model_path)
+                except Exception as e:
+                    raise sr.RequestError(f"Could not load Vosk model from '{self.model_path}': {e}")
+            return self._model
+
+    def recognize(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        from vosk import KaldiRecognizer
+
+        recognizer = KaldiRecognizer(self._get_model(), self.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+class WhisperBackend(RecognizerBackend):
+    """OpenAI Whisper run locally (offline, needs the openai-whisper package)"""
+
+    name = 'whisper'
+
+    def __init__(self, whisper_model: str = 'base', **options):
+        super().__init__(**options)
+        self.model = whisper_model
+
+    def recognize(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        try:
+            # Whisper takes a bare language code ('en'), not a locale ('en-US')
+            language = self.language.split('-')[0].lower()
+            text = sr.Recognizer().recognize_whisper(audio, model=self.model, language=language)
+        except ImportError as e:
+            raise sr.RequestError(f"whisper is unavailable: {e}")
+        text = text.strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+class StubBackend(RecognizerBackend):
+    """
+    Deterministic local stand-in for tests and benchmarks
+
+    Returns the configured stub transcript, or else the hint (the expected
+    text) so the full pronunciation path runs with a perfect reading.
+    """
+
+    name = 'stub'
+
+    def __init__(self, stub_transcript: Optional[str] = None, **options):
+        super().__init__(**options)
+        self.transcript = stub_transcript
+        self.uses_hint = stub_transcript is None
+        # Nothing to wait on, so skip the timeout thread
+        self.timeout = None
+
+    def recognize(self, audio: sr.AudioData, hint: Optional[str] = None) -> str:
+        text = self.transcript if self.transcript is not None else hint
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (GoogleBackend, SphinxBackend, VoskBackend, WhisperBackend, StubBackend)
+}
+
+def configure_recognizers(**options):
+    """
+    Update the recognizer configuration; the backend chain is rebuilt on next use
+
+    Args:
+        backends (list): Backend names tried in order, from BACKENDS
+        offline (bool): Drop backends that need the network
+        language (str): Recognition language code
+        timeout (float): Default seconds allowed per backend call (None = no limit)
+        timeouts (dict): Per-backend timeout overrides, by backend name
+        vosk_model_path (str): Directory of the Vosk model
+        whisper_model (str): Whisper model size, e.g. 'base'
+        stub_transcript (str): Fixed transcript for the stub backend
+    """
+    global _backends
+
+    unknown = set(options) - set(SPEECH_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown recognizer options: {', '.join(sorted(unknown))}")
+
+    names = options.get('backends', SPEECH_CONFIG['backends'])
+    invalid = [name for name in names if name not in BACKENDS]
+    if invalid:
+        raise ValueError(f"Unknown recognizer backends: {', '.join(invalid)} (expected any of {', '.join(BACKENDS)})")
+
+    with _backends_lock:
+        SPEECH_CONFIG.update(options)
+        SPEECH_CONFIG['backends'] = list(names)
+        SPEECH_CONFIG['timeouts'] = dict(SPEECH_CONFIG['timeouts'] or {})
+        _backends = None
+
+def get_backends() -> List[RecognizerBackend]:
+    """Get the configured backend chain, building it on first use"""
+    global _backends
+
+    with _backends_lock:
+        if _backends is None:
+            names = SPEECH_CONFIG['backends']
+            if SPEECH_CONFIG['offline']:
+                names = [name for name in names if not BACKENDS[name].requires_network]
+                if not names:
+                    print("Offline mode left no recognizer backends, using the stub backend")
+                    names = ['stub']
+
+            _backends = [
+                BACKENDS[name](
+                    language=SPEECH_CONFIG['language'],
+                    timeout=SPEECH_CONFIG['timeouts'].get(name, SPEECH_CONFIG['timeout']),
+                    vosk_model_path=SPEECH_CONFIG['vosk_model_path'],
+                    whisper_model=SPEECH_CONFIG['whisper_model'],
+                    stub_transcript=SPEECH_CONFIG['stub_transcript']
+                )
+                for name in names
+            ]
+        return _backends
+
+def transcribe(audio: sr.AudioData, hint: Optional[str] = None) -> str:
+    """
+    Convert recorded audio to text with the first backend that can serve it
+
+    Args:
+        audio: Recorded speech
+        hint: Text the speaker was expected to say (used by the stub backend)
+
+    Returns:
+        str: Recognized text, or an empty string when nothing was understood
+    """
+    for backend in get_backends():
+        try:
+            text = backend.recognize_with_timeout(audio, hint)
+            print(f"Speech recognition successful ({backend.name}): {text}")
+            return text
+        except sr.UnknownValueError:
+            print(f"Speech recognition ({backend.name}) could not understand audio")
+            return ""
+        except Exception as e:
+            print(f"Speech recognition backend {backend.name} unavailable: {e}")
+
+    return ""
+
+def recognizer_signature(hint: Optional[str] = None) -> List[Any]:
+    """
+    Everything besides the audio that decides what transcribe() returns
+
+    Used in transcription cache keys, so a result is never reused across a
+    change of backend chain, language or model. The hint only counts when a
+    backend in the chain actually uses it.
+    """
+    backends = get_backends()
+    return [
+        [backend.name for backend in backends],
+        SPEECH_CONFIG['language'],
+        SPEECH_CONFIG['vosk_model_path'],
+        SPEECH_CONFIG['whisper_model'],
+        SPEECH_CONFIG['stub_transcript'],
+        hint if any(backend.uses_hint for backend in backends) else None
+    ]
+
+def get_recognizer_status() -> Dict[str, Any]:
+    """Backend chain and settings, for health and stats endpoints"""
+    return {
+        'backends': [backend.name for backend in get_backends()],
+        'offline': SPEECH_CONFIG['offline'],
+        'language': SPEECH_CONFIG['language'],
+        'timeout': SPEECH_CONFIG['timeout'],
+        'calls': {backend.name: backend.stats() for backend in get_backends()}
+    }
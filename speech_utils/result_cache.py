@@ -0,0 +1,225 @@
+"""
+Result Cache Module
+Content-addressed LRU cache with TTL expiry and an optional SQLite backing store
+"""
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a content-addressed cache key
+
+    Args:
+        *parts: Strings, bytes or JSON-serializable values that identify the result
+
+    Returns:
+        str: SHA-256 hex digest of all parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(bytes(part))
+        elif isinstance(part, str):
+            digest.update(part.encode('utf-8'))
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        # Separator so ('ab', 'c') and ('a', 'bc') hash differently
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with TTL expiry
+
+    Entries live in an in-memory OrderedDict bounded by max_size. When db_path
+    is given, entries are also written to a SQLite table so they survive
+    worker restarts; memory misses fall through to disk and are promoted.
+    Values must be JSON-serializable when the disk tier is enabled.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 3600,
+                 db_path: Optional[str] = None, table: str = 'result_cache'):
+        self.max_size = max(0, int(max_size))
+        self.ttl = ttl
+        self.db_path = db_path
+        self.table = table
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if db_path:
+            self._open_db()
+
+    def _open_db(self):
+        """Open (and create if needed) the SQLite backing table"""
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"Result cache disk tier unavailable ({self.db_path}): {e}")
+            self._db = None
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._is_expired(created_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+                self.expirations += 1
+
+            value = self._get_from_disk(key, now)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                return copy.deepcopy(value)
+
+            self.misses += 1
+            return None
+
+    def _get_from_disk(self, key: str, now: float) -> Optional[Any]:
+        """Look a key up in the SQLite tier and promote it to memory (lock held)"""
+        if self._db is None:
+            return None
+
+        try:
+            row = self._db.execute(
+                f'SELECT value, created_at FROM {self.table} WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value_json, created_at = row
+            if self._is_expired(created_at, now):
+                self._db.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                self._db.commit()
+                self.expirations += 1
+                return None
+
+            value = json.loads(value_json)
+            self._store_in_memory(key, value, created_at)
+            return value
+        except Exception as e:
+            print(f"Result cache disk read error: {e}")
+            return None
+
+    def set(self, key: str, value: Any):
+        """Store a copy of the value under the key"""
+        now = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store_in_memory(key, value, now)
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        f'INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)',
+                        (key, json.dumps(value), now)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    print(f"Result cache disk write error: {e}")
+
+    def _store_in_memory(self, key: str, value: Any, created_at: float):
+        """Insert into the LRU and evict the oldest entries (lock held)"""
+        if self.max_size == 0:
+            return
+
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        """Remove a single key from every tier"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._db is not None:
+                try:
+                    self._db.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                    self._db.commit()
+                except Exception as e:
+                    print(f"Result cache disk delete error: {e}")
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute(f'DELETE FROM {self.table}')
+                    self._db.commit()
+                except Exception as e:
+                    print(f"Result cache disk clear error: {e}")
+            self.hits = self.misses = self.disk_hits = 0
+            self.evictions = self.expirations = 0
+
+    def prune(self) -> int:
+        """Remove expired entries from both tiers; returns the number removed"""
+        if self.ttl is None:
+            return 0
+
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key in [k for k, (created_at, _) in self._entries.items()
+                        if self._is_expired(created_at, now)]:
+                del self._entries[key]
+                removed += 1
+
+            if self._db is not None:
+                try:
+                    cursor = self._db.execute(
+                        f'DELETE FROM {self.table} WHERE created_at < ?', (now - self.ttl,)
+                    )
+                    self._db.commit()
+                    removed += cursor.rowcount
+                except Exception as e:
+                    print(f"Result cache disk prune error: {e}")
+
+            self.expirations += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizing information"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'disk_backed': self._db is not None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,146 @@
+"""
+Rule Engine Module
+Precompiled regex rule sets with a word-trigger prefilter and interval-based overlap resolution
+"""
+
+import re
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Words in the checked text; a \b-anchored rule can start at any of them, even after an apostrophe
+_TOKEN_RE = re.compile(r"\w+")
+
+# A word with its apostrophe suffixes ("they're's"), for triggers that contain apostrophes
+_WORD_CHAIN_RE = re.compile(r"\w+(?:'\w+)+")
+
+# A pattern that starts with a literal word, e.g. \bShe don't\b or \bits\b(?=\s+a\b)
+_LEADING_WORD_RE = re.compile(r"\\b((?:\w|\\?')+)(?=\\b|\\s| |\(\?=|$)")
+
+# A pattern that starts with a group of literal words, e.g. \b(there|their|they\'re)\b
+_LEADING_GROUP_RE = re.compile(r"\\b\(((?:(?:\w|\\?')+\|)*(?:\w|\\?')+)\)(?=\\b)")
+
+def leading_literals(pattern: str) -> Optional[List[str]]:
+    """
+    Literal words one of which must start every match of the pattern
+
+    Returns:
+        Lowercased trigger words, or None when the pattern has no literal anchor
+    """
+    match = _LEADING_GROUP_RE.match(pattern)
+    if match:
+        words = match.group(1).split('|')
+    else:
+        match = _LEADING_WORD_RE.match(pattern)
+        if not match:
+            return None
+        words = [match.group(1)]
+
+    return [word.replace("\\'", "'").lower() for word in words]
+
+class Rule:
+    """A compiled pattern together with whatever data the caller attached to it"""
+
+    __slots__ = ('index', 'pattern', 'regex', 'data')
+
+    def __init__(self, index: int, pattern: str, regex, data: Any):
+        self.index = index
+        self.pattern = pattern
+        self.regex = regex
+        self.data = data
+
+class RuleEngine:
+    """
+    A set of regex rules compiled once and applied in a single pass
+
+    Rules that start with literal words are indexed by those words; the text
+    is tokenised once and each word is looked up in the index, so only rules
+    that can possibly match are tried (anchored at that word). A word
+    followed by apostrophe suffixes is also looked up with each of them
+    ("they're's" as "they", "they're" and "they're's"). Rules without a
+    literal anchor fall back to their own finditer scan.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, Any]], flags: int = re.IGNORECASE):
+        self.rules = []
+        self._by_trigger: Dict[str, List[Rule]] = {}
+        self._unanchored: List[Rule] = []
+
+        for index, (pattern, data) in enumerate(rules):
+            rule = Rule(index, pattern, re.compile(pattern, flags), data)
+            self.rules.append(rule)
+
+            triggers = leading_literals(pattern)
+            if triggers:
+                for trigger in triggers:
+                    self._by_trigger.setdefault(trigger, []).append(rule)
+            else:
+                self._unanchored.append(rule)
+
+    def find_all(self, text: str) -> List[Tuple[Rule, Any]]:
+        """
+        Every (rule, match) pair in the text; matches of different rules may overlap
+
+        Returns:
+            Pairs ordered by rule, then by position
+        """
+        found = []
+        by_trigger = self._by_trigger
+
+        for token in _TOKEN_RE.finditer(text):
+            start = token.start()
+            chain = _WORD_CHAIN_RE.match(text, start) if text.startswith("'", token.end()) else None
+            if chain is None:
+                candidates = by_trigger.get(token.group().lower())
+            else:
+                # A rule triggered by several of the prefixes is still tried once
+                parts = chain.group().lower().split("'")
+                candidates = list(dict.fromkeys(
+                    rule for end in range(1, len(parts) + 1)
+                    for rule in by_trigger.get("'".join(parts[:end]), ())
+                ))
+            if candidates:
+                for rule in candidates:
+                    match = rule.regex.match(text, start)
+                    if match:
+                        found.append((rule, match))
+
+        for rule in self._unanchored:
+            found.extend((rule, match) for match in rule.regex.finditer(text))
+
+        found.sort(key=lambda pair: (pair[0].index, pair[1].start()))
+        return found
+
+    def find(self, text: str) -> List[Tuple[Rule, Any]]:
+        """
+        Non-overlapping (rule, match) pairs ordered by position
+
+        Overlaps are resolved in favour of the longer match, then the earlier
+        rule, then the earlier position.
+        """
+        return select_non_overlapping(self.find_all(text))
+
+def select_non_overlapping(pairs: List[Tuple[Rule, Any]]) -> List[Tuple[Rule, Any]]:
+    """
+    Greedy interval selection over (rule, match) pairs
+
+    Sorting is O(n log n) and each lookup a bisect, but list.insert makes
+    the worst case O(n^2); with the few matches a text produces, the
+    inserts are cheap memmoves.
+    """
+    ranked = sorted(pairs, key=lambda pair: (pair[1].start() - pair[1].end(), pair[0].index, pair[1].start()))
+
+    starts = []
+    ends = []
+    selected = []
+    for rule, match in ranked:
+        start, end = match.span()
+        position = bisect_right(starts, start)
+        if position > 0 and ends[position - 1] > start:
+            continue
+        if position < len(starts) and starts[position] < end:
+            continue
+        starts.insert(position, start)
+        ends.insert(position, end)
+        selected.insert(position, (rule, match))
+
+    return selected
@@ -0,0 +1,504 @@
+"""
+Streaming Recognition Module
+Recognizes a recording incrementally while its chunks are still being uploaded
+"""
+
+import audioop
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from speech_utils.audio_io import (AUDIO_CONFIG, DECODE_TIMEOUT, FFMPEG_BINARY, AudioDecodeError,
+                                   AudioLimitError, PCMAudio, decode_audio)
+from speech_utils.pronunciation_analyzer import normalize_text
+from speech_utils.recognizers import transcribe
+from speech_utils.word_alignment import MATCH, SUBSTITUTE, align_words
+
+# Pending audio shorter than this is not recognized until more arrives
+MIN_SEGMENT_SECONDS = 1.5
+# Pending audio longer than this is recognized even without a pause
+MAX_SEGMENT_SECONDS = 10.0
+# Window used when looking for a pause to cut a segment at
+PAUSE_WINDOW_SECONDS = 0.03
+# RMS energy below which a window counts as a pause (SpeechRecognition's default threshold)
+PAUSE_ENERGY = 300
+# Without ffmpeg, the recording is decoded again only once it has grown by this fraction...
+REDECODE_GROWTH = 0.25
+# ...and by at least this many bytes, so total decode work stays linear in its length
+REDECODE_MIN_BYTES = 32 * 1024
+# Rate the stream decoder resamples to when AUDIO_CONFIG keeps the source rate (Opus is 48 kHz)
+STREAM_SAMPLE_RATE = 48000
+
+class StreamError(Exception):
+    """Raised for a chunk that cannot be accepted (out of order, too large, already finished)"""
+
+class StreamLimitError(Exception):
+    """Raised when the maximum number of open streams is reached"""
+
+def find_segment_end(pcm: PCMAudio, start: int, final: bool = False) -> Optional[int]:
+    """
+    Frame index to recognize up to, or None to wait for more audio
+
+    Segments are cut in the last pause so words are not split between two
+    recognition calls; a long stretch without a pause is cut at its end.
+    """
+    end = pcm.frame_count
+    if final:
+        return end if end > start else None
+
+    rate = pcm.sample_rate
+    if end - start < MIN_SEGMENT_SECONDS * rate:
+        return None
+
+    width = pcm.sample_width
+    window = max(1, int(PAUSE_WINDOW_SECONDS * rate))
+    earliest = start + int(MIN_SEGMENT_SECONDS * rate)
+    view = memoryview(pcm.frame_data).cast('B')
+
+    position = end - window
+    while position >= earliest:
+        if audioop.rms(view[position * width:(position + window) * width], width) < PAUSE_ENERGY:
+            return position + window // 2
+        position -= window
+
+    if end - start >= MAX_SEGMENT_SECONDS * rate:
+        return end
+    return None
+
+def reading_progress(expected_text: str, transcript: str) -> Dict[str, Any]:
+    """
+    How far through the expected text the transcript has got, word by word
+
+    Expected words after the last one that was read are 'pending' rather
+    than omitted, since the learner may simply not have reached them yet.
+    """
+    expected_words = normalize_text(expected_text).split()
+    alignment = align_words(expected_words, normalize_text(transcript).split())
+
+    statuses = ['pending'] * len(expected_words)
+    words_read = 0
+    for op, i, j in alignment.ops:
+        if i < 0:
+            continue
+        if op == MATCH:
+            statuses[i] = 'correct'
+        elif op == SUBSTITUTE:
+            statuses[i] = 'substituted'
+        else:
+            statuses[i] = 'omitted'
+        if j >= 0:
+            words_read = i + 1
+
+    for i in range(words_read, len(expected_words)):
+        statuses[i] = 'pending'
+
+    return {
+        'words_expected': len(expected_words),
+        'words_read': words_read,
+        'words_correct': statuses.count('correct'),
+        'words': [{'word': word, 'status': status} for word, status in zip(expected_words, statuses)]
+    }
+
+class StreamDecoder:
+    """
+    One ffmpeg process decoding a recording while it is uploaded
+
+    Container bytes are written to ffmpeg's stdin as they arrive and a
+    reader thread collects the 16-bit mono PCM it writes to stdout, so each
+    chunk is decoded once however long the recording gets.
+
+    Raises:
+        AudioDecodeError: When ffmpeg is not installed
+    """
+
+    def __init__(self, audio_format: Optional[str] = None):
+        self.sample_rate = AUDIO_CONFIG['sample_rate'] or STREAM_SAMPLE_RATE
+        self.sample_width = 2
+
+        command = [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error']
+        if audio_format:
+            command += ['-f', audio_format]
+        command += ['-i', 'pipe:0', '-vn', '-ac', '1', '-ar', str(self.sample_rate)]
+        if AUDIO_CONFIG['max_duration']:
+            # Stop just past the limit so an overlong recording is not decoded in full
+            command += ['-t', str(AUDIO_CONFIG['max_duration'] + 1)]
+        command += ['-acodec', 'pcm_s16le', '-f', 's16le', 'pipe:1']
+
+        # A file, not a pipe: nobody reads stderr until the end, and a full pipe would stall ffmpeg
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=self._stderr)
+        except FileNotFoundError:
+            self._stderr.close()
+            raise AudioDecodeError('ffmpeg is not installed')
+
+        self._samples = bytearray()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name='stream-decoder', daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            data = self.process.stdout.read1(65536)
+            if not data:
+                break
+            with self._lock:
+                self._samples.extend(data)
+
+    @property
+    def frame_count(self) -> int:
+        with self._lock:
+            return len(self._samples) // self.sample_width
+
+    def feed(self, data: bytes) -> bool:
+        """Write container bytes to ffmpeg; False once it has stopped reading (ended or failed)"""
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+            return True
+        except (BrokenPipeError, ValueError):
+            return False
+
+    def samples(self, start: int = 0) -> PCMAudio:
+        """A copy of the samples decoded so far, from frame start on"""
+        with self._lock:
+            end = len(self._samples) - len(self._samples) % self.sample_width
+            frame_data = bytes(self._samples[start * self.sample_width:end])
+        return PCMAudio(frame_data, self.sample_rate, self.sample_width)
+
+    def finish(self):
+        """
+        End the input and wait for ffmpeg to decode the rest
+
+        Raises:
+            AudioDecodeError: When ffmpeg fails or times out
+        """
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            returncode = self.process.wait(timeout=DECODE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.close()
+            raise AudioDecodeError('Audio decoding timed out')
+        self._reader.join()
+
+        self._stderr.seek(0)
+        errors = self._stderr.read().decode(errors='ignore').strip()
+        self._stderr.close()
+        if returncode != 0 and not self.frame_count:
+            raise AudioDecodeError(f'ffmpeg could not decode audio: {errors}')
+
+    def close(self):
+        """Stop ffmpeg without waiting for its output"""
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self._reader.join()
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                pipe.close()
+            except (BrokenPipeError, ValueError):
+                pass
+        self._stderr.close()
+
+class StreamingRecognition:
+    """
+    One recording arriving in chunks
+
+    Chunks of a MediaRecorder stream are not decodable on their own, so
+    they are fed to one StreamDecoder that decodes the container as it
+    grows; only audio after the last recognized segment is sent to the
+    recognizer. By the time the recording stops, everything up to the last
+    pause has been transcribed. Without ffmpeg, the recording received so
+    far is decoded again each time it has grown by REDECODE_GROWTH.
+
+    add_chunk only buffers; recognize and finish decode and call the
+    recognizer, so callers run them on the audio worker pool.
+    """
+
+    def __init__(self, expected_text: str, audio_format: str = 'webm',
+                 owner: Any = None, max_bytes: int = 10 * 1024 * 1024):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.expected_text = expected_text
+        self.audio_format = audio_format
+        self.max_bytes = max_bytes
+
+        self.audio = bytearray()
+        self.next_seq = 0
+        self.segments: List[str] = []
+        self.recognized_frames = 0
+        self.pcm = None
+        self.finished = False
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+
+        self.decoder: Optional[StreamDecoder] = None
+        self.discarded = False
+        self.redecode = False
+        # Bytes of self.audio written to the decoder, or covered by the last full decode
+        self.decoded_bytes = 0
+
+    @property
+    def transcript(self) -> str:
+        return ' '.join(segment for segment in self.segments if segment)
+
+    def add_chunk(self, data: bytes, seq: Optional[int] = None) -> bool:
+        """
+        Append a chunk; recognize is called separately, off the request thread
+
+        Returns:
+            False for a retried chunk that already arrived, which is acknowledged, not appended twice
+
+        Raises:
+            StreamError: When the stream is finished, the chunk is out of order, or the
+                recording grows past the size limit
+        """
+        with self.lock:
+            if self.finished:
+                raise StreamError('Stream is already finished')
+
+            if seq is not None and seq < self.next_seq:
+                return False
+            if seq is not None and seq > self.next_seq:
+                raise StreamError(f'Expected chunk {self.next_seq}, got {seq}')
+            if len(self.audio) + len(data) > self.max_bytes:
+                raise StreamError('Recording is too large')
+
+            self.audio.extend(data)
+            self.next_seq += 1
+            self.updated_at = time.time()
+            return True
+
+    def recognize(self, cancel: threading.Event = None):
+        """
+        Decode the chunks received so far and recognize any complete segment
+
+        Raises:
+            StreamError: When the recording grows past the duration limit
+        """
+        with self.lock:
+            if not self.finished:
+                self._recognize(final=False, cancel=cancel)
+        self._close_if_discarded()
+
+    def finish(self, cancel: threading.Event = None) -> str:
+        """
+        Recognize the remaining audio and return the full transcript
+
+        Raises:
+            StreamError: When the recording is longer than the duration limit
+        """
+        try:
+            with self.lock:
+                if not self.finished:
+                    self._recognize(final=True, cancel=cancel)
+                    self._close_decoder()
+                    self.finished = True
+                    self.updated_at = time.time()
+                return self.transcript
+        finally:
+            self._close_if_discarded()
+
+    def close(self):
+        """
+        Stop decoding a stream that is being discarded
+
+        Does not wait for a recognition under way (its job may have been
+        abandoned mid recognizer call); that recognition closes the stream
+        when it ends instead.
+        """
+        self.discarded = True
+        if self.lock.acquire(blocking=False):
+            try:
+                self._close_decoder()
+                self.finished = True
+            finally:
+                self.lock.release()
+
+    def _close_if_discarded(self):
+        if self.discarded:
+            self.close()
+
+    def _close_decoder(self):
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+
+    def _recognize(self, final: bool, cancel: threading.Event = None):
+        if not self.audio:
+            return
+
+        pending = self._decode(final)
+        if pending is None:
+            return
+
+        end = find_segment_end(pending, 0, final)
+        if end is None:
+            return
+
+        segment = PCMAudio(
+            memoryview(pending.frame_data)[:end * pending.sample_width],
+            pending.sample_rate, pending.sample_width
+        )
+        # Do not start a recognizer call nobody will wait for; the audio stays pending
+        if cancel is not None and cancel.is_set():
+            return
+
+        # The stub backend echoes its hint, so only offer it once for the whole recording
+        hint = self.expected_text if final and not self.transcript else None
+        self.segments.append(transcribe(segment.to_audio_data(), hint=hint))
+        self.recognized_frames += end
+
+    def _decode(self, final: bool) -> Optional[PCMAudio]:
+        """
+        The samples after the last recognized segment, or None when there is nothing new yet
+
+        Once final, self.pcm holds the whole recording, for timing analysis.
+        """
+        if self.decoder is None and not self.redecode:
+            try:
+                self.decoder = StreamDecoder(self.audio_format)
+            except AudioDecodeError as e:
+                print(f"Streaming decoder unavailable, decoding the recording as it grows: {e}")
+                self.redecode = True
+
+        if self.redecode:
+            return self._redecode(final)
+
+        if self.decoded_bytes < len(self.audio):
+            # After a failure or past the duration cut-off ffmpeg stops reading; finish reports which
+            self.decoder.feed(bytes(self.audio[self.decoded_bytes:]))
+            self.decoded_bytes = len(self.audio)
+
+        if final:
+            try:
+                self.decoder.finish()
+            except AudioDecodeError as e:
+                print(f"Streaming decode error: {e}")
+                return None
+            self.pcm = self.decoder.samples()
+
+        self._check_duration(self.decoder.frame_count / self.decoder.sample_rate)
+        return self.decoder.samples(self.recognized_frames)
+
+    def _redecode(self, final: bool) -> Optional[PCMAudio]:
+        growth = len(self.audio) - self.decoded_bytes
+        if not final and growth < max(REDECODE_MIN_BYTES, self.decoded_bytes * REDECODE_GROWTH):
+            return None
+
+        if growth or self.pcm is None:
+            try:
+                # Decode a snapshot: a WAV decode would otherwise pin the growing buffer
+                self.pcm = decode_audio(bytes(self.audio), self.audio_format)
+            except AudioLimitError as e:
+                raise StreamError(str(e))
+            except Exception as e:
+                # The tail of a partial upload may not decode yet; the next attempt will
+                if final:
+                    print(f"Streaming decode error: {e}")
+                return None
+            self.decoded_bytes = len(self.audio)
+
+        pcm = self.pcm
+        self._check_duration(pcm.duration)
+        width = pcm.sample_width
+        return PCMAudio(memoryview(pcm.frame_data)[self.recognized_frames * width:], pcm.sample_rate, width)
+
+    def _check_duration(self, duration: float):
+        max_duration = AUDIO_CONFIG['max_duration']
+        if max_duration and duration > max_duration:
+            raise StreamError(f'Recording is too long (maximum {max_duration:g} seconds)')
+
+    def progress(self) -> Dict[str, Any]:
+        with self.lock:
+            transcript = self.transcript
+            progress = {
+                'stream_id': self.id,
+                'partial_transcript': transcript,
+                'chunks_received': self.next_seq,
+                'finished': self.finished
+            }
+        progress.update(reading_progress(self.expected_text, transcript))
+        return progress
+
+class StreamingSessions:
+    """
+    Open streams by id, expired after idle_timeout seconds without a chunk
+
+    At most max_streams are open at once, and with max_per_owner set one
+    owner can have at most that many of them. Idle streams are expired on
+    every lookup and by a sweeper thread (started with the first stream),
+    so an abandoned stream's decoder is stopped even when no other stream
+    is opened.
+    """
+
+    def __init__(self, max_streams: int = 50, idle_timeout: float = 120, max_per_owner: Optional[int] = None):
+        self.max_streams = max_streams
+        self.idle_timeout = idle_timeout
+        self.max_per_owner = max_per_owner
+        self._streams: Dict[str, StreamingRecognition] = {}
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    def create(self, expected_text: str, audio_format: str = 'webm',
+               owner: Any = None, max_bytes: int = 10 * 1024 * 1024) -> StreamingRecognition:
+        """
+        Open a new stream
+
+        Raises:
+            StreamLimitError: When max_streams streams, or max_per_owner of the owner's, are already open
+        """
+        self._expire()
+        with self._lock:
+            if self._sweeper is None and self.idle_timeout:
+                self._sweeper = threading.Thread(target=self._sweep, name='stream-sweeper', daemon=True)
+                self._sweeper.start()
+            if self.max_per_owner and owner is not None:
+                open_streams = sum(1 for stream in self._streams.values() if stream.owner == owner)
+                if open_streams >= self.max_per_owner:
+                    raise StreamLimitError('Too many open recording streams for this user')
+            if len(self._streams) >= self.max_streams:
+                raise StreamLimitError('Too many open recording streams')
+            stream = StreamingRecognition(expected_text, audio_format, owner, max_bytes)
+            self._streams[stream.id] = stream
+            return stream
+
+    def get(self, stream_id: str, owner: Any = None) -> Optional[StreamingRecognition]:
+        self._expire()
+        with self._lock:
+            stream = self._streams.get(stream_id)
+        if stream is None or (owner is not None and stream.owner != owner):
+            return None
+        return stream
+
+    def close(self, stream_id: str):
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+        if stream is not None:
+            stream.close()
+
+    def _sweep(self):
+        while True:
+            time.sleep(self.idle_timeout / 2)
+            self._expire()
+
+    def _expire(self):
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            expired = [stream for stream in self._streams.values() if stream.updated_at < cutoff]
+            for stream in expired:
+                del self._streams[stream.id]
+        for stream in expired:
+            stream.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'open_streams': len(self._streams), 'max_streams': self.max_streams,
+                    'max_per_owner': self.max_per_owner}
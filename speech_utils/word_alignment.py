@@ -0,0 +1,176 @@
+"""
+Word Alignment Module
+Single word-level edit alignment from which WER, edit counts and per-word results are derived
+"""
+
+from array import array
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Edit operations in an alignment
+MATCH = 'equal'
+SUBSTITUTE = 'substitute'
+DELETE = 'delete'
+INSERT = 'insert'
+
+# Below this many table cells the pure-Python DP beats NumPy's per-row overhead
+NUMPY_MIN_CELLS = 1024
+
+class WordAlignment:
+    """
+    Minimum edit alignment between an expected and a recognized word sequence
+
+    ops holds (operation, expected_index, recognized_index) tuples in text
+    order; the index is -1 on the side an insertion or deletion has no word.
+    """
+
+    __slots__ = ('expected_words', 'recognized_words', 'ops',
+                 'hits', 'substitutions', 'deletions', 'insertions')
+
+    def __init__(self, expected_words: List[str], recognized_words: List[str],
+                 ops: List[Tuple[str, int, int]]):
+        self.expected_words = expected_words
+        self.recognized_words = recognized_words
+        self.ops = ops
+
+        self.hits = self.substitutions = self.deletions = self.insertions = 0
+        for op, _, _ in ops:
+            if op == MATCH:
+                self.hits += 1
+            elif op == SUBSTITUTE:
+                self.substitutions += 1
+            elif op == DELETE:
+                self.deletions += 1
+            else:
+                self.insertions += 1
+
+    @property
+    def distance(self) -> int:
+        return self.substitutions + self.deletions + self.insertions
+
+    @property
+    def wer(self) -> float:
+        """Word error rate relative to the expected text"""
+        if not self.expected_words:
+            return 0.0 if not self.recognized_words else 1.0
+        return self.distance / len(self.expected_words)
+
+    def pairs(self):
+        """Yield (operation, expected_word, recognized_word) with '' for a missing side"""
+        expected_words = self.expected_words
+        recognized_words = self.recognized_words
+        for op, i, j in self.ops:
+            yield (op,
+                   expected_words[i] if i >= 0 else '',
+                   recognized_words[j] if j >= 0 else '')
+
+    def counts(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'substitutions': self.substitutions,
+            'deletions': self.deletions,
+            'insertions': self.insertions,
+            'distance': self.distance
+        }
+
+def _encode(expected_words: Sequence[str], recognized_words: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """Map words to integer ids so the DP compares ints instead of strings"""
+    vocabulary = {}
+    expected_ids = [vocabulary.setdefault(word, len(vocabulary)) for word in expected_words]
+    recognized_ids = [vocabulary.setdefault(word, len(vocabulary)) for word in recognized_words]
+    return expected_ids, recognized_ids
+
+def _cost_table_numpy(expected_ids: List[int], recognized_ids: List[int]):
+    """
+    Full edit-distance table, one vectorised row at a time
+
+    Within a row the insertion term depends on the cell to its left, which
+    unrolls to a running minimum: d[j] = j + min(k <= j) (t[k] - k).
+    """
+    n, m = len(expected_ids), len(recognized_ids)
+    recognized = np.asarray(recognized_ids, dtype=np.int32)
+    offsets = np.arange(m + 1, dtype=np.int32)
+
+    table = np.empty((n + 1, m + 1), dtype=np.int32)
+    table[0] = offsets
+    for i in range(1, n + 1):
+        previous = table[i - 1]
+        candidate = np.empty(m + 1, dtype=np.int32)
+        candidate[0] = i
+        # Deletion from above, match/substitution from the diagonal
+        np.minimum(previous[1:] + 1, previous[:-1] + (recognized != expected_ids[i - 1]), out=candidate[1:])
+        table[i] = np.minimum.accumulate(candidate - offsets) + offsets
+    return table
+
+def _cost_table_python(expected_ids: List[int], recognized_ids: List[int]) -> List[array]:
+    """Full edit-distance table as compact int arrays (used without NumPy)"""
+    m = len(recognized_ids)
+    previous = array('i', range(m + 1))
+    table = [previous]
+    for i, expected_id in enumerate(expected_ids, 1):
+        row = array('i', [i]) * (m + 1)
+        left = i
+        for j, recognized_id in enumerate(recognized_ids, 1):
+            cost = previous[j - 1] + (expected_id != recognized_id)
+            deletion = previous[j] + 1
+            if deletion < cost:
+                cost = deletion
+            if left + 1 < cost:
+                cost = left + 1
+            row[j] = left = cost
+        table.append(row)
+        previous = row
+    return table
+
+def align_words(expected_words: Sequence[str], recognized_words: Sequence[str]) -> WordAlignment:
+    """
+    Compute one minimum edit alignment between two word sequences
+
+    Args:
+        expected_words: Reference words
+        recognized_words: Hypothesis words
+
+    Returns:
+        WordAlignment: Operations in text order plus hit/substitution/deletion/insertion counts
+    """
+    expected_words = list(expected_words)
+    recognized_words = list(recognized_words)
+    expected_ids, recognized_ids = _encode(expected_words, recognized_words)
+
+    if HAS_NUMPY and len(expected_ids) * len(recognized_ids) >= NUMPY_MIN_CELLS:
+        # The backtrace only reads O(n + m) cells, so keep the table as an array
+        table = _cost_table_numpy(expected_ids, recognized_ids)
+    else:
+        table = _cost_table_python(expected_ids, recognized_ids)
+
+    # Walk back from the bottom-right corner, preferring diagonal moves so
+    # that differing words pair up as substitutions rather than delete+insert
+    ops = []
+    i, j = len(expected_ids), len(recognized_ids)
+    while i > 0 or j > 0:
+        current = table[i][j]
+        if i > 0 and j > 0:
+            same = expected_ids[i - 1] == recognized_ids[j - 1]
+            if current == table[i - 1][j - 1] + (not same):
+                ops.append((MATCH if same else SUBSTITUTE, i - 1, j - 1))
+                i -= 1
+                j -= 1
+                continue
+        if i > 0 and current == table[i - 1][j] + 1:
+            ops.append((DELETE, i - 1, -1))
+            i -= 1
+        else:
+            ops.append((INSERT, -1, j - 1))
+            j -= 1
+
+    ops.reverse()
+    return WordAlignment(expected_words, recognized_words, ops)
+
+def align_texts(expected: str, recognized: str) -> WordAlignment:
+    """Align two whitespace-tokenised texts"""
+    return align_words(expected.split(), recognized.split())
@@ -15,6 +15,11 @@ let analyser = null;
 let microphone = null;
 let dataArray = null;
 
+// Streaming upload: chunks are sent while recording so the server can recognize as we go
+const STREAM_CHUNK_MS = 1000;
+let practiceStream = null;
+let streamResultPromise = null;
+
 // Practice texts by category and type
 const practiceTexts = {
     beginner: {
@@ -311,9 +316,16 @@ async function startRecording() {
         mediaRecorder = new MediaRecorder(stream, options);
         audioChunks = [];
 
+        // Open a streaming session when recording WebM/Opus; otherwise upload after stopping
+        streamResultPromise = null;
+        practiceStream = options.mimeType.startsWith('audio/webm') ? await openPracticeStream('webm') : null;
+
         mediaRecorder.ondataavailable = function(event) {
             if (event.data.size > 0) {
                 audioChunks.push(event.data);
+                if (practiceStream) {
+                    sendStreamChunk(practiceStream, event.data);
+                }
             }
         };
 
@@ -321,12 +333,17 @@ async function startRecording() {
             audioBlob = new Blob(audioChunks, { type: mediaRecorder.mimeType });
             console.log('Recording stopped, audio blob created:', audioBlob.size, 'bytes');
 
+            // Most of the recording is already recognized; fetch the final result now
+            if (practiceStream) {
+                streamResultPromise = finishPracticeStream(practiceStream);
+            }
+
             // Stop all tracks to release microphone
             stream.getTracks().forEach(track => track.stop());
         };
 
         // Start recording
-        mediaRecorder.start(100); // Collect data every 100ms
+        mediaRecorder.start(practiceStream ? STREAM_CHUNK_MS : 100); // Collect data every 100ms (1s chunks when streaming)
         isRecording = true;
 
         // Start speech recognition for real-time feedback
@@ -383,6 +400,106 @@ function stopRecording() {
     showNotification('Recording stopped! Click "Analyze Pronunciation" to get feedback.', 'success');
 }
 
+// Open a streaming session; returns null if streaming is unavailable
+async function openPracticeStream(format) {
+    try {
+        const response = await fetch('/api/practice/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                expected_text: currentText,
+                format: format
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const data = await response.json();
+        return {
+            chunkUrl: data.chunk_url,
+            finishUrl: data.finish_url,
+            closeUrl: data.close_url,
+            seq: 0,
+            uploads: Promise.resolve(),
+            failed: false
+        };
+    } catch (error) {
+        console.warn('Streaming unavailable, audio will be uploaded after recording:', error);
+        return null;
+    }
+}
+
+// Upload one recorded chunk; chunks must arrive in order, so each waits for the previous one
+function sendStreamChunk(stream, chunk) {
+    const seq = stream.seq++;
+
+    stream.uploads = stream.uploads.then(async () => {
+        if (stream.failed) return;
+
+        try {
+            const response = await fetch(`${stream.chunkUrl}?seq=${seq}`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                },
+                body: chunk
+            });
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            updateStreamProgress(await response.json());
+        } catch (error) {
+            console.warn('Streaming chunk failed, audio will be uploaded after recording:', error);
+            stream.failed = true;
+            closePracticeStream(stream);
+        }
+    });
+}
+
+// Tell the server a stream is abandoned so it stops decoding it
+function closePracticeStream(stream) {
+    fetch(stream.closeUrl, { method: 'DELETE' }).catch(() => {});
+}
+
+// Wait for the last chunks, then get the scored result; null means fall back to a full upload
+async function finishPracticeStream(stream) {
+    await stream.uploads;
+    if (stream.failed) return null;
+
+    try {
+        let response = await fetch(stream.finishUrl, { method: 'POST' });
+        // The server keeps the stream when it is busy; retry once after the advertised delay
+        if (response.status === 429 || response.status === 503) {
+            const delay = parseInt(response.headers.get('Retry-After') || '5', 10);
+            await new Promise(resolve => setTimeout(resolve, delay * 1000));
+            response = await fetch(stream.finishUrl, { method: 'POST' });
+        }
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.warn('Streaming finish failed, audio will be uploaded after recording:', error);
+        closePracticeStream(stream);
+        return null;
+    }
+}
+
+// Show how far through the text the server has heard
+function updateStreamProgress(progress) {
+    if (!isRecording || !progress.words_expected) return;
+
+    statusText.textContent = `Recording... heard ${progress.words_read} of ${progress.words_expected} words ` +
+        `(${progress.words_correct} correct)`;
+    console.log('📝 Partial transcript:', progress.partial_transcript);
+}
+
 // Update recording UI
 function updateRecordingUI(recording) {
     if (recording) {
@@ -528,7 +645,7 @@ async function analyzePronunciation() {
     if (!recognizedText) console.warn('⚠️ No recognizedText found');
 
     // Show warning if nothing is available to analyze
-    if (!audioBlob && !recognizedText) {
+    if (!audioBlob && !recognizedText && !streamResultPromise) {
         showNotification('No audio recorded or speech recognized. Please try recording again.', 'warning');
         return;
     }
@@ -538,9 +655,12 @@ async function analyzePronunciation() {
     analyzeBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Analyzing...';
 
     try {
-        let result;
+        // Use the streamed result when the recording was recognized while it was uploaded
+        let result = streamResultPromise ? await streamResultPromise : null;
 
-        if (audioBlob) {
+        if (result) {
+            console.log('Using streamed analysis result');
+        } else if (audioBlob) {
             // Send audio file for processing
             const formData = new FormData();
             formData.append('audio', audioBlob, 'recording.webm');
@@ -551,6 +671,11 @@ async function analyzePronunciation() {
                 body: formData
             });
 
+            if (response.status === 429 || response.status === 503) {
+                const retryAfter = response.headers.get('Retry-After') || 10;
+                throw new Error(`Server busy, retry after ${retryAfter}s`);
+            }
+
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
@@ -590,6 +715,8 @@ async function analyzePronunciation() {
         // Show error details to user
         if (error.message.includes('Could not recognize speech')) {
             showNotification('Could not recognize speech from audio. Please try speaking more clearly.', 'warning');
+        } else if (error.message.includes('Server busy')) {
+            showNotification('The server is busy processing recordings. Please try again in a few seconds.', 'warning');
         } else {
             showNotification('Analysis failed. Using offline analysis.', 'warning');
             // Fallback to client-side analysis
@@ -797,8 +924,16 @@ function displayWordAnalysis(wordAnalysis) {
                 break;
         }
 
+        // Sounds that went wrong, e.g. "TH→T", shown on hover
+        let title = analysis.error_type || analysis.status;
+        if (analysis.phoneme_errors && analysis.phoneme_errors.length) {
+            title += ': ' + analysis.phoneme_errors
+                .map(error => `${error.expected || '∅'}→${error.recognized || '∅'}`)
+                .join(', ');
+        }
+
         analysisHtml += `
-            <span class="word-analysis-item badge bg-light text-dark me-1 mb-1" title="${analysis.error_type || analysis.status}">
+            <span class="word-analysis-item badge bg-light text-dark me-1 mb-1" title="${title}">
                 <i class="${statusIcon} ${statusClass} me-1"></i>
                 ${analysis.expected || analysis.recognized}
                 ${analysis.similarity !== undefined ? `(${(analysis.similarity * 100).toFixed(0)}%)` : ''}
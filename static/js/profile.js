@@ -4,6 +4,8 @@
 let profileForm, passwordForm, deleteConfirmation, confirmDelete;
 let ratingStars, submitFeedback, exportData;
 let progressChart, chartInstance;
+let activityList, loadMoreActivities;
+let activityCursor = null;
 
 // Initialize when DOM is loaded
 document.addEventListener('DOMContentLoaded', function() {
@@ -24,6 +26,9 @@ function initializeProfile() {
     // Initialize rating stars
     initializeRatingStars();
     
+    // Load the first page of activity history
+    loadActivities();
+    
     console.log('Profile page initialized');
 }
 
@@ -37,6 +42,8 @@ function getDOMElements() {
     submitFeedback = document.getElementById('submitFeedback');
     exportData = document.getElementById('exportData');
     progressChart = document.getElementById('progressChart');
+    activityList = document.getElementById('activityList');
+    loadMoreActivities = document.getElementById('loadMoreActivities');
 }
 
 // Add event listeners
@@ -51,6 +58,11 @@ function addEventListeners() {
         passwordForm.addEventListener('submit', handlePasswordChange);
     }
     
+    // Activity history paging
+    if (loadMoreActivities) {
+        loadMoreActivities.addEventListener('click', loadActivities);
+    }
+    
     // Cancel button
     const cancelBtn = document.getElementById('cancelBtn');
     if (cancelBtn) {
@@ -421,6 +433,49 @@ async function handleDataExport() {
     }
 }
 
+// Load the next page of activity history
+async function loadActivities() {
+    if (!activityList) return;
+    
+    loadMoreActivities.disabled = true;
+    
+    try {
+        const params = new URLSearchParams({ limit: 10 });
+        if (activityCursor) {
+            params.set('before', activityCursor);
+        }
+        
+        const response = await fetch(`/api/activities?${params}`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        const data = await response.json();
+        data.activities.forEach(activity => {
+            const item = document.createElement('div');
+            item.className = 'list-group-item d-flex justify-content-between align-items-center border-0';
+            item.innerHTML = `
+                <div class="d-flex align-items-center">
+                    <i class="fas fa-${activity.icon} text-${activity.color} me-3"></i>
+                    <span>${activity.description}</span>
+                </div>
+                <small class="text-muted">${activity.timestamp}</small>
+            `;
+            activityList.appendChild(item);
+        });
+        
+        activityCursor = data.next_cursor;
+        loadMoreActivities.classList.toggle('d-none', !activityCursor);
+        document.getElementById('activityEmpty').classList.toggle('d-none', activityList.children.length > 0);
+        
+    } catch (error) {
+        console.error('Activity history error:', error);
+        showNotification('Error loading activity history.', 'error');
+    } finally {
+        loadMoreActivities.disabled = false;
+    }
+}
+
 // Initialize progress chart
 function initializeProgressChart() {
     if (!progressChart) return;
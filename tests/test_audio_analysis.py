@@ -0,0 +1,40 @@
+"""
+The recognition gate and the voice activity detector must agree on what counts as speech
+"""
+
+import numpy as np
+import pytest
+
+from speech_utils.audio_analysis import (
+    MIN_VOICE_RMS, VOICE_RATIO, detect_voice_activity, estimate_energy_threshold, has_speech
+)
+from speech_utils.audio_io import PCMAudio
+
+RATE = 16000
+
+def make_pcm(samples):
+    return PCMAudio(np.clip(samples, -32768, 32767).astype('<i2').tobytes(), RATE, 2)
+
+def noisy_clip(tone_level, noise_level=200.0, seconds=2.0, seed=3):
+    """Noise throughout, with a 440 Hz tone in the middle second"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(RATE * seconds)) / RATE
+    samples = rng.normal(0, noise_level, len(t))
+    middle = (t >= seconds / 4) & (t < seconds * 3 / 4)
+    samples[middle] += tone_level * np.sin(2 * np.pi * 440 * t[middle])
+    return make_pcm(samples)
+
+# Tone peaks either side of the old 1.5x gate and the 3x VAD threshold
+@pytest.mark.parametrize('tone_level', [0, 150, 300, 450, 600, 900, 3000])
+def test_gate_matches_voice_activity(tone_level):
+    pcm = noisy_clip(tone_level)
+    assert has_speech(pcm) == bool(detect_voice_activity(pcm)['segments'])
+
+def test_estimated_threshold_is_the_vad_threshold():
+    pcm = noisy_clip(3000)
+    vad = detect_voice_activity(pcm)
+    assert estimate_energy_threshold(pcm) == pytest.approx(vad['threshold'])
+    assert vad['threshold'] == pytest.approx(max(vad['noise_floor'] * VOICE_RATIO, MIN_VOICE_RMS))
+
+def test_digital_silence_is_not_speech():
+    assert not has_speech(make_pcm(np.zeros(RATE)))
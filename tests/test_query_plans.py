@@ -0,0 +1,63 @@
+"""
+Dashboard and activity feed queries must read the history tables through the (user_id, created_at) indexes
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# The engine is created when app is imported, so point it at a scratch database first
+_db_dir = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir.name, 'query_plans.db')}"
+
+import app as application  # noqa: E402
+
+HISTORY_INDEXES = {
+    'grammar_check': 'ix_grammar_check_user_id_created_at',
+    'practice_session': 'ix_practice_session_user_id_created_at',
+}
+
+@pytest.fixture(scope='module')
+def plans():
+    with application.app.app_context():
+        application.db.create_all()
+
+        user = application.User(username='plans', email='plans@example.com', password_hash='x')
+        application.db.session.add(user)
+        application.db.session.flush()
+        now = datetime.utcnow()
+        for day in range(20):
+            application.db.session.add(application.GrammarCheck(
+                user_id=user.id, original_text='text', corrected_text='text',
+                errors_found=1, accuracy_score=90, created_at=now - timedelta(days=day)
+            ))
+            application.db.session.add(application.PracticeSession(
+                user_id=user.id, expected_text='text', recognized_text='text',
+                overall_score=80, created_at=now - timedelta(days=day)
+            ))
+        application.db.session.commit()
+
+        yield application.explain_dashboard_queries(user.id)
+
+        application.db.session.remove()
+        application.db.drop_all()
+
+def history_tables(statement):
+    words = set(statement.replace('(', ' ').replace(')', ' ').replace(',', ' ').split())
+    return [table for table in HISTORY_INDEXES if table in words]
+
+def test_dashboard_queries_were_captured(plans):
+    assert sum(1 for entry in plans if history_tables(entry['statement'])) >= 5
+
+def test_history_queries_use_the_composite_indexes(plans):
+    for entry in plans:
+        tables = history_tables(entry['statement'])
+        if not tables:
+            continue
+        plan = '\n'.join(entry['plan'])
+        for table in tables:
+            assert HISTORY_INDEXES[table] in plan, f"{entry['statement']}\n{plan}"
+            assert not any(line.startswith(f'SCAN {table}') for line in entry['plan']), plan
+        assert entry['indexed'], plan
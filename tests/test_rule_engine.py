@@ -0,0 +1,61 @@
+"""
+The rule engine's prefilter must find exactly what scanning each pattern with finditer finds
+"""
+
+import random
+import re
+
+import pytest
+
+from speech_utils.grammar_checker import BASIC_GRAMMAR_PATTERNS, FALLBACK_ERROR_PATTERNS
+from speech_utils.rule_engine import RuleEngine
+
+PATTERN_SETS = {
+    'basic': [info['pattern'] for info in BASIC_GRAMMAR_PATTERNS],
+    'fallback': [pattern for pattern, _, _ in FALLBACK_ERROR_PATTERNS],
+}
+
+# Contractions and possessives, where a trigger is followed by an apostrophe suffix
+APOSTROPHE_TEXTS = [
+    "There's a cat and their dog's bone.",
+    "Your's truly",
+    "they're's",
+    "It's its own fault, isn't it's?",
+    "She don't's, don't't, and don't.",
+    "They're going, their going, there going.",
+    "The the cat's cat's toy.",
+]
+
+VOCABULARY = (
+    "the a there their they're there's their's they're's your you're your's you're's its it's "
+    "it's's don't don't's she he it I we they you was are have seen went could would of "
+    "between and me him her more better prettier alot recieve grammer going cat dog's"
+).split()
+
+def reference(patterns, text):
+    """(rule index, span) of every match, scanning each pattern on its own"""
+    return [(index, match.span())
+            for index, pattern in enumerate(patterns)
+            for match in re.finditer(pattern, text, re.IGNORECASE)]
+
+def engine_matches(patterns, text):
+    return [(rule.index, match.span()) for rule, match in RuleEngine([(p, None) for p in patterns]).find_all(text)]
+
+def random_texts(count=500, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(1, 12))]
+        words = [word.capitalize() if rng.random() < 0.2 else word for word in words]
+        yield rng.choice([' ', '  ', ', ']).join(words) + rng.choice(['', '.', '?', "'s"])
+
+@pytest.mark.parametrize('name', sorted(PATTERN_SETS))
+@pytest.mark.parametrize('text', APOSTROPHE_TEXTS)
+def test_apostrophe_cases_match_finditer(name, text):
+    patterns = PATTERN_SETS[name]
+    assert engine_matches(patterns, text) == reference(patterns, text)
+
+@pytest.mark.parametrize('name', sorted(PATTERN_SETS))
+def test_random_texts_match_finditer(name):
+    patterns = PATTERN_SETS[name]
+    for text in random_texts():
+        assert engine_matches(patterns, text) == reference(patterns, text), text